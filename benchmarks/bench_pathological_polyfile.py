@@ -0,0 +1,92 @@
+"""Benchmark the recovery of read_polyfile on corrupt regions of increasing size.
+
+Each input consists of a valid block, a corrupt region and another valid block.
+The time per corrupt line should not grow with the size of the region. The
+benchmark exits with 1 if it grows by more than --max-growth between the
+smallest and largest region, or if the valid block following the region is
+not recovered.
+
+Usage:
+    python benchmarks/bench_pathological_polyfile.py
+    python benchmarks/bench_pathological_polyfile.py --n-lines 1000 2000 4000 8000 16000 32000
+"""
+import argparse
+import io
+import sys
+import time
+from typing import Callable, Dict, List
+
+from plain_model_inspector.io.polyfile import iter_polyfile
+
+
+# Corrupt regions, generated from the index of the line.
+CORRUPT_REGIONS: Dict[str, Callable[[int], str]] = {
+    # Text which is neither a name nor a point.
+    "garbage": lambda i: f"corrupt line {i} ### ???\n",
+    # Name lines which are never followed by a dimensions line.
+    "names": lambda i: f"candidate name {i}\n" if i % 2 else "* comment\n",
+    # Alternating text and point-like lines, which form many small invalid blocks.
+    "interleaved": lambda i: f"corrupt_{i}\n" if i % 2 else f"{i}.0\n",
+    # Lines consisting of whitespace runs around the text.
+    "whitespace": lambda i: f"   \t corrupt \t {i}   \t\n",
+}
+
+
+def write_pathological_polyfile(kind: str, n_lines: int) -> str:
+    region = "".join(CORRUPT_REGIONS[kind](i) for i in range(n_lines))
+    return "first\n2 2\n1.0 2.0\n3.0 4.0\n" + region + "last\n1 2\n5.0 6.0\n"
+
+
+def time_read(text: str, fast_path: bool, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = list(iter_polyfile(io.StringIO(text), fast_path=fast_path))
+        timings.append(time.perf_counter() - start)
+
+    (last_object, _) = result[-1]
+    if last_object is None or last_object.metadata.name != "last":
+        raise AssertionError("The block following the corrupt region is not recovered.")
+
+    return min(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n-lines", type=int, nargs="+", default=[1000, 4000, 16000],
+                        help="The sizes of the corrupt regions.")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="The maximum allowed growth of the time per corrupt line.")
+    args = parser.parse_args()
+
+    n_lines: List[int] = sorted(args.n_lines)
+    failed = False
+
+    for kind in CORRUPT_REGIONS:
+        for fast_path in (True, False):
+            per_line = []
+            for n in n_lines:
+                try:
+                    duration = time_read(write_pathological_polyfile(kind, n), fast_path, args.repeat)
+                except AssertionError as e:
+                    print(f"{kind} (fast_path={fast_path}), {n} lines: {e}")
+                    failed = True
+                    break
+                per_line.append(duration / n)
+
+            if len(per_line) < len(n_lines):
+                continue
+
+            growth = per_line[-1] / per_line[0]
+            timings = ", ".join(f"{n}: {t * 1e6:.2f} us/line" for (n, t) in zip(n_lines, per_line))
+            print(f"{kind} (fast_path={fast_path}): {timings}, growth {growth:.2f}")
+
+            if growth > args.max_growth:
+                failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark the throughput of read_polyfile.
+
+Usage:
+    python benchmarks/bench_read_polyfile.py --size-mb 200
+    python benchmarks/bench_read_polyfile.py --path some/model/dike.pliz --has-z-value
+    python benchmarks/bench_read_polyfile.py --size-mb 20 --no-fast-path --tree --trace-memory
+    python benchmarks/bench_read_polyfile.py --size-mb 200 --memory-map
+    python benchmarks/bench_read_polyfile.py --size-mb 2000 --n-workers 8
+    python benchmarks/bench_read_polyfile.py --size-mb 200 --binary
+    python benchmarks/bench_read_polyfile.py --size-mb 200 --headers-only
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from plain_model_inspector.io.polyfile import read_polyfile
+from plain_model_inspector.io.polyfile_binary import read_polyfile_binary, write_polyfile_binary
+from plain_model_inspector.io.polyfile_headers import scan_polyfile_headers
+from plain_model_inspector.io.polyfile_parallel import read_polyfile_parallel
+
+
+def write_synthetic_polyfile(path: Path, size_bytes: int, n_rows: int=1000, n_columns: int=2, seed: int=42) -> None:
+    """Write a well-formed polyfile of approximately size_bytes to path.
+
+    Args:
+        path (Path): The path to write the polyfile to.
+        size_bytes (int): The approximate size of the resulting file.
+        n_rows (int, optional): The number of points per block. Defaults to 1000.
+        n_columns (int, optional): The number of columns per point. Defaults to 2.
+        seed (int, optional): The seed of the generated values. Defaults to 42.
+    """
+    rng = random.Random(seed)
+    written = 0
+    block_index = 0
+
+    with path.open("w", newline="") as f:
+        while written < size_bytes:
+            lines = [f"* Synthetic block {block_index}\n",
+                     f"block_{block_index}\n",
+                     f"{n_rows}    {n_columns}\n"]
+            lines.extend("    ".join(f"{rng.uniform(-1e5, 1e5):.6E}" for _ in range(n_columns)) + "\n"
+                         for _ in range(n_rows))
+            block = "".join(lines)
+
+            f.write(block)
+            written += len(block)
+            block_index += 1
+
+
+def benchmark(path: Path, 
+              has_z_value: bool, 
+              repeat: int, 
+              fast_path: bool=True, 
+              inline: bool=True, 
+              memory_map: bool=False,
+              n_workers: int=0,
+              binary: bool=False,
+              headers_only: bool=False,
+              trace_memory: bool=False) -> None:
+    size_mb = path.stat().st_size / 1e6
+    timings = []
+
+    if binary:
+        binary_path = path.with_name(path.name + ".pmib")
+        write_polyfile_binary(binary_path, read_polyfile(path, has_z_value=has_z_value)[0])
+
+    def read():
+        if headers_only:
+            return scan_polyfile_headers(path)
+        if binary:
+            # The values are touched to include reading them from disk.
+            objects = read_polyfile_binary(binary_path, memory_map=memory_map)
+            sum(float(o.values.sum()) for o in objects)
+            return objects, []
+        if n_workers:
+            return read_polyfile_parallel(path, has_z_value=has_z_value, n_workers=n_workers,
+                                          fast_path=fast_path, inline=inline)
+        return read_polyfile(path, has_z_value=has_z_value, fast_path=fast_path, inline=inline,
+                             memory_map=memory_map)
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        objects, msgs = read()
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    print(f"{path.name}: {size_mb:.1f} MB, {len(objects)} blocks, {len(msgs)} messages")
+    print(f"best of {repeat}: {best:.3f} s, {size_mb / best:.2f} MB/s")
+
+    if trace_memory:
+        del objects, msgs
+        tracemalloc.start()
+        read()
+        (_, peak) = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"peak traced memory: {peak / 1e6:.1f} MB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, help="Existing polyfile to benchmark.")
+    parser.add_argument("--size-mb", type=float, default=200.0, 
+                        help="Size of the generated polyfile if no path is given.")
+    parser.add_argument("--n-columns", type=int, default=2)
+    parser.add_argument("--has-z-value", action="store_true")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-fast-path", action="store_true", 
+                        help="Parse every block with the polyfile_grammar.")
+    parser.add_argument("--tree", action="store_true",
+                        help="Interpret a parse tree instead of converting blocks inline.")
+    parser.add_argument("--memory-map", action="store_true",
+                        help="Read the polyfile through a mmap.")
+    parser.add_argument("--n-workers", type=int, default=0,
+                        help="Read the polyfile in chunks on a process pool with this many workers.")
+    parser.add_argument("--binary", action="store_true",
+                        help="Read the polyfile from its binary format, written before the benchmark.")
+    parser.add_argument("--headers-only", action="store_true",
+                        help="Only scan the headers of the blocks, skipping their points.")
+    parser.add_argument("--trace-memory", action="store_true", 
+                        help="Report the peak memory traced during an additional run.")
+    args = parser.parse_args()
+
+    options = dict(fast_path=not args.no_fast_path, inline=not args.tree, 
+                   memory_map=args.memory_map, n_workers=args.n_workers, 
+                   binary=args.binary, headers_only=args.headers_only, trace_memory=args.trace_memory)
+
+    if args.path:
+        benchmark(args.path, args.has_z_value, args.repeat, **options)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "synthetic.pli"
+        write_synthetic_polyfile(path, int(args.size_mb * 1e6), n_columns=args.n_columns)
+        benchmark(path, args.has_z_value, args.repeat, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Run the polyfile benchmark suite on the synthetic corpus and store the results as JSON.
+
+Every corpus of polyfile_corpus is read with every variant of read_polyfile. Each
+benchmark runs in a fresh process, such that its peak RSS is not affected by the
+other benchmarks. The throughput is computed from the median of the repeats.
+
+Usage:
+    python benchmarks/bench_suite.py --output results.json
+    python benchmarks/bench_suite.py --size-mb 20 --repeat 7 --corpora typical noisy --output results.json
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    # The peak RSS is not reported on platforms without the resource module.
+    resource = None  # type: ignore
+
+from polyfile_corpus import CORPORA, write_corpus
+from plain_model_inspector.io.polyfile import read_polyfile
+
+
+RESULTS_FORMAT_VERSION = 1
+
+# The keyword arguments of read_polyfile of each variant.
+VARIANTS: Dict[str, Dict[str, Any]] = {
+    "default": {},
+    "memory_map": {"memory_map": True},
+    "grammar": {"fast_path": False},
+}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux, but in bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def run_benchmark(path: Path, has_z_value: bool, variant: str, repeat: int) -> Dict[str, Any]:
+    """Read the polyfile repeatedly with the given variant of read_polyfile.
+
+    Args:
+        path (Path): The polyfile to read.
+        has_z_value (bool): Whether the third column of each point contains the z-value.
+        variant (str): The name of the variant, one of VARIANTS.
+        repeat (int): The number of times the polyfile is read.
+
+    Returns:
+        Dict[str, Any]: The timings, peak RSS and message counts of the benchmark.
+    """
+    kwargs = VARIANTS[variant]
+
+    # The parsers are constructed before the RSS is sampled.
+    read_polyfile(path.with_name("warmup.pli"), **kwargs)
+    rss_before = _peak_rss_mb()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        (objects, msgs) = read_polyfile(path, has_z_value=has_z_value, **kwargs)
+        timings.append(time.perf_counter() - start)
+
+    rss_after = _peak_rss_mb()
+    msgs_by_level: Dict[str, int] = {}
+    for msg in msgs:
+        msgs_by_level[msg.level.name] = msgs_by_level.get(msg.level.name, 0) + 1
+
+    size_mb = path.stat().st_size / 1e6
+    median = statistics.median(timings)
+
+    return {"timings_s": timings,
+            "median_s": median,
+            "throughput_mb_s": size_mb / median,
+            "peak_rss_mb": rss_after,
+            "peak_rss_increase_mb": rss_after - rss_before if rss_after is not None else None,
+            "n_objects": len(objects),
+            "n_msgs": len(msgs),
+            "msgs_by_level": msgs_by_level}
+
+
+def run_suite(directory: Path,
+              corpora: List[str],
+              variants: List[str],
+              size_mb: float,
+              repeat: int,
+              seed: int=42) -> Dict[str, Any]:
+    """Generate the corpora in the directory and run every variant on each of them.
+
+    Returns:
+        Dict[str, Any]: The results of the suite, see RESULTS_FORMAT_VERSION.
+    """
+    directory.joinpath("warmup.pli").write_text("warmup\n1 2\n1.0 2.0\n")
+    results = []
+
+    # A fresh process per benchmark, rather than a fork of this process, such
+    # that its peak RSS only includes the benchmark.
+    context = multiprocessing.get_context("spawn")
+
+    for name in corpora:
+        path = write_corpus(name, directory, int(size_mb * 1024 * 1024), seed)
+        has_z_value = CORPORA[name].has_z_value
+
+        for variant in variants:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                result = executor.submit(run_benchmark, path, has_z_value, variant, repeat).result()
+
+            result = {"name": f"{name}/{variant}",
+                      "corpus": name,
+                      "variant": variant,
+                      "size_bytes": path.stat().st_size,
+                      **result}
+            results.append(result)
+            print(f"{result['name']}: {result['throughput_mb_s']:.2f} MB/s, "
+                  f"median {result['median_s']:.3f} s, {result['n_msgs']} messages", flush=True)
+
+    return {"version": RESULTS_FORMAT_VERSION,
+            "created": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size_mb": size_mb,
+            "repeat": repeat,
+            "seed": seed,
+            "results": results}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", type=Path, default=None, help="The JSON file to write the results to.")
+    parser.add_argument("--size-mb", type=float, default=2.0, help="The approximate size of each polyfile.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        suite = run_suite(Path(tmp_dir), args.corpora, args.variants, args.size_mb, args.repeat, args.seed)
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(suite, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Microbenchmark of the per-token cost of PolyFileLiteralTransformer.
+
+Compares the current TokenData record with the previous pydantic based
+TokenData for NAME, INT and FLOAT tokens.
+
+Usage:
+    python benchmarks/bench_token_data.py
+"""
+import timeit
+from typing import Any
+
+from lark.lexer import Token
+from pydantic import BaseModel
+
+from plain_model_inspector.io.polyfile import PolyFileLiteralTransformer, TokenData
+
+
+# The definition of TokenData prior to the slotted record.
+class PydanticTokenData(BaseModel):
+    token: Token
+    data: Any
+
+
+tokens = {
+    "NAME": Token("NAME", "some dike name", 0, 1, 1),
+    "INT": Token("INT", "1024", 0, 1, 1),
+    "FLOAT": Token("FLOAT", "-1.234567E+05", 0, 1, 1),
+}
+
+conversions = {
+    "NAME": str,
+    "INT": lambda t: int(str(t)),
+    "FLOAT": str,
+}
+
+
+def main(number: int=200_000) -> None:
+    transformer = PolyFileLiteralTransformer()
+
+    print(f"{'token':<8}{'pydantic (ns)':>16}{'slotted (ns)':>16}{'speed-up':>10}")
+    for name, token in tokens.items():
+        convert = conversions[name]
+        method = getattr(transformer, name)
+
+        before = min(timeit.repeat(lambda: PydanticTokenData(token=token, data=convert(token)), 
+                                   number=number, repeat=5)) / number * 1e9
+        after = min(timeit.repeat(lambda: method(token), number=number, repeat=5)) / number * 1e9
+
+        assert isinstance(method(token), TokenData)
+        print(f"{name:<8}{before:>16.0f}{after:>16.0f}{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Compare the results of the benchmark suite against the committed baseline.
+
+The suite is run with the corpus size, repeat and seed of the baseline, unless
+existing results are given. A benchmark regresses if its median time exceeds the
+baseline median by more than --tolerance, and its fastest run is slower than the
+slowest run of the baseline, such that overlapping noisy runs are not reported.
+Its peak RSS increase regresses if it exceeds the baseline by more than
+--rss-tolerance and at least --rss-floor-mb. The script exits with 1 on any
+regression.
+
+The baseline is machine dependent, update it on the reference machine with
+--update-baseline after an intended change in performance.
+
+Usage:
+    python benchmarks/check_regressions.py
+    python benchmarks/check_regressions.py --results results.json --tolerance 0.2
+    python benchmarks/check_regressions.py --update-baseline
+"""
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from bench_suite import RESULTS_FORMAT_VERSION, VARIANTS, run_suite
+from plain_model_inspector.io.polyfile_instrumentation import format_table
+from polyfile_corpus import CORPORA
+
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+
+
+def _load(path: Path) -> Dict[str, Any]:
+    suite = json.loads(path.read_text())
+    if suite.get("version") != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"{path} has results format version {suite.get('version')}, "
+                         f"expected {RESULTS_FORMAT_VERSION}.")
+    return suite
+
+
+def _regressed_time(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> bool:
+    return (current["median_s"] > baseline["median_s"] * (1 + tolerance) and
+            min(current["timings_s"]) > max(baseline["timings_s"]))
+
+
+def _regressed_rss(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float, floor_mb: float) -> bool:
+    (base, cur) = (baseline.get("peak_rss_increase_mb"), current.get("peak_rss_increase_mb"))
+    if base is None or cur is None:
+        return False
+    return cur > base * (1 + tolerance) and cur - base >= floor_mb
+
+
+def _format_mb(value: Optional[float]) -> str:
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def compare(baseline: Dict[str, Any],
+            current: Dict[str, Any],
+            tolerance: float,
+            rss_tolerance: float,
+            rss_floor_mb: float) -> Tuple[List[List[str]], int]:
+    """Compare the current results of the suite with the baseline per benchmark.
+
+    Returns:
+        Tuple[List[List[str]], int]: The rows of the diff table and the number of regressions.
+    """
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    current_results = {result["name"]: result for result in current["results"]}
+    rows = []
+    n_regressions = 0
+
+    for name in list(baseline_results) + [name for name in current_results if name not in baseline_results]:
+        base = baseline_results.get(name)
+        cur = current_results.get(name)
+
+        if base is None or cur is None:
+            rows.append([name,
+                         f"{base['median_s']:.3f}" if base else "-",
+                         f"{cur['median_s']:.3f}" if cur else "-",
+                         "-", "-", "-",
+                         "new" if base is None else "missing"])
+            continue
+
+        statuses = []
+        if _regressed_time(base, cur, tolerance):
+            statuses.append("SLOWER")
+        if _regressed_rss(base, cur, rss_tolerance, rss_floor_mb):
+            statuses.append("MORE MEMORY")
+        if statuses:
+            n_regressions += 1
+        if cur["n_msgs"] != base["n_msgs"]:
+            statuses.append(f"messages {base['n_msgs']} -> {cur['n_msgs']}")
+
+        rows.append([name,
+                     f"{base['median_s']:.3f}",
+                     f"{cur['median_s']:.3f}",
+                     f"{100 * (cur['median_s'] / base['median_s'] - 1):+.1f}",
+                     _format_mb(base.get("peak_rss_increase_mb")),
+                     _format_mb(cur.get("peak_rss_increase_mb")),
+                     ", ".join(statuses) if statuses else "ok"])
+
+    return (rows, n_regressions)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--results", type=Path, default=None,
+                        help="The results to compare, instead of running the suite.")
+    parser.add_argument("--tolerance", type=float, default=0.1,
+                        help="The allowed relative increase of the median time.")
+    parser.add_argument("--rss-tolerance", type=float, default=0.25,
+                        help="The allowed relative increase of the peak RSS increase.")
+    parser.add_argument("--rss-floor-mb", type=float, default=5.0,
+                        help="The absolute increase of the peak RSS increase below which it is not reported.")
+    parser.add_argument("--repeat", type=int, default=None, help="Defaults to the repeat of the baseline.")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Run the suite and write its results to the baseline.")
+    parser.add_argument("--size-mb", type=float, default=2.0,
+                        help="The approximate size of each polyfile of an updated baseline.")
+    args = parser.parse_args()
+
+    if args.update_baseline:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            suite = run_suite(Path(tmp_dir), list(CORPORA), list(VARIANTS), args.size_mb, args.repeat or 5)
+        args.baseline.write_text(json.dumps(suite, indent=2) + "\n")
+        return
+
+    baseline = _load(args.baseline)
+
+    if args.results is not None:
+        current = _load(args.results)
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            current = run_suite(Path(tmp_dir),
+                                corpora=list(dict.fromkeys(result["corpus"] for result in baseline["results"])),
+                                variants=list(dict.fromkeys(result["variant"] for result in baseline["results"])),
+                                size_mb=baseline["size_mb"],
+                                repeat=args.repeat or baseline["repeat"],
+                                seed=baseline["seed"])
+
+    (rows, n_regressions) = compare(baseline, current, args.tolerance, args.rss_tolerance, args.rss_floor_mb)
+
+    header = ["benchmark", "baseline (s)", "current (s)", "change (%)",
+              "baseline RSS (MB)", "current RSS (MB)", "status"]
+    print(format_table(header, rows))
+    print(f"\n{n_regressions} of {len(rows)} benchmarks regressed.")
+    sys.exit(1 if n_regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""Generate a synthetic corpus of realistic and pathological polyfiles.
+
+Every corpus is generated deterministically from its seed, such that benchmark
+runs on different machines read identical files.
+
+Usage:
+    python benchmarks/polyfile_corpus.py corpus_dir
+    python benchmarks/polyfile_corpus.py corpus_dir --size-mb 20 --corpora tiny_blocks noisy
+"""
+import argparse
+import random
+from pathlib import Path
+from typing import Callable, Dict, Iterator, NamedTuple, Optional, Sequence
+
+from bench_read_polyfile import write_synthetic_polyfile
+
+
+def _point(rng: random.Random, n_columns: int) -> str:
+    return "    ".join(f"{rng.uniform(-1e5, 1e5):.6E}" for _ in range(n_columns))
+
+
+def _block(rng: random.Random, name: str, n_rows: int, n_columns: int, comments: Sequence[str]=()) -> str:
+    lines = [f"* {comment}\n" for comment in comments]
+    lines.append(f"{name}\n")
+    lines.append(f"{n_rows}    {n_columns}\n")
+    lines.extend(f"    {_point(rng, n_columns)}\n" for _ in range(n_rows))
+    return "".join(lines)
+
+
+def _tiny_blocks(rng: random.Random) -> Iterator[str]:
+    # Many blocks of a few points, e.g. cross sections or observation points.
+    i = 0
+    while True:
+        yield _block(rng, f"tiny_{i}", rng.randint(1, 4), 2)
+        i += 1
+
+
+def _huge_blocks(rng: random.Random) -> Iterator[str]:
+    # A few blocks of many points, e.g. a detailed coastline.
+    i = 0
+    while True:
+        yield _block(rng, f"huge_{i}", 50000, 2)
+        i += 1
+
+
+def _wide_pliz(rng: random.Random) -> Iterator[str]:
+    # Points with a z-value and many data columns, as in a .pliz with dike data.
+    i = 0
+    while True:
+        yield _block(rng, f"dike_{i}", rng.randint(50, 500), 11, [f"dike section {i}", "x y z crest width ..."])
+        i += 1
+
+
+def _noisy(rng: random.Random) -> Iterator[str]:
+    # Blocks surrounded by whitespace and empty lines, which the fast path rejects.
+    i = 0
+    while True:
+        n_rows = rng.randint(10, 100)
+        lines = ["\n" * rng.randint(0, 2),
+                 f"  noisy name_{i}  \n",
+                 f"  {n_rows}   2  \n"]
+        for _ in range(n_rows):
+            lines.append(f"\t {_point(rng, 2)} \t\n")
+            if rng.random() < 0.2:
+                lines.append("   \n")
+        yield "".join(lines)
+        i += 1
+
+
+def _corrupt(rng: random.Random) -> Iterator[str]:
+    # Valid blocks separated by corrupt regions, blocks without points and invalid points.
+    i = 0
+    while True:
+        kind = rng.randint(0, 3)
+        if kind == 0:
+            yield "".join(f"corrupt line {i}.{j} ### ???\n" for j in range(rng.randint(1, 50)))
+        elif kind == 1:
+            yield f"no_points_{i}\n3    2\n"
+        elif kind == 2:
+            yield f"invalid_points_{i}\n3    2\n    1.0    2.0\n    3.0\n    4.0    5.0    6.0\n"
+        else:
+            yield _block(rng, f"valid_{i}", rng.randint(10, 100), 2)
+        i += 1
+
+
+def _long_headers(rng: random.Random) -> Iterator[str]:
+    # Blocks with long description headers, e.g. exported with their full history.
+    i = 0
+    while True:
+        comments = [f"history {j}: modified by {rng.choice(['a', 'b', 'c'])} for scenario {rng.randint(0, 999)}"
+                    for j in range(rng.randint(50, 200))]
+        yield _block(rng, f"described_{i}", rng.randint(5, 20), 2, comments)
+        i += 1
+
+
+class Corpus(NamedTuple):
+    """Corpus describes a kind of polyfile, generated from an endless iterator of blocks."""
+    blocks: Optional[Callable[[random.Random], Iterator[str]]]
+    suffix: str
+    has_z_value: bool
+
+
+CORPORA: Dict[str, Corpus] = {
+    # The blocks of the typical corpus are written by bench_read_polyfile.
+    "typical": Corpus(None, ".pli", False),
+    "tiny_blocks": Corpus(_tiny_blocks, ".pli", False),
+    "huge_blocks": Corpus(_huge_blocks, ".pli", False),
+    "wide_pliz": Corpus(_wide_pliz, ".pliz", True),
+    "noisy": Corpus(_noisy, ".pli", False),
+    "corrupt": Corpus(_corrupt, ".pli", False),
+    "long_headers": Corpus(_long_headers, ".pli", False),
+}
+
+
+def write_corpus(name: str, directory: Path, size_bytes: int, seed: int=42) -> Path:
+    """Write the polyfile of the given corpus to the directory.
+
+    Args:
+        name (str): The name of the corpus, one of CORPORA.
+        directory (Path): The directory to write the polyfile to.
+        size_bytes (int): The approximate size of the polyfile. Blocks are only
+                          written completely, as such the last block may exceed it.
+        seed (int, optional): The seed of the generated values. Defaults to 42.
+
+    Returns:
+        Path: The path of the written polyfile.
+    """
+    corpus = CORPORA[name]
+    path = directory / f"{name}{corpus.suffix}"
+
+    if corpus.blocks is None:
+        write_synthetic_polyfile(path, size_bytes, seed=seed)
+        return path
+
+    written = 0
+    blocks = corpus.blocks(random.Random(seed))
+
+    with path.open("w", newline="") as f:
+        while written < size_bytes:
+            block = next(blocks)
+            f.write(block)
+            written += len(block)
+
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--size-mb", type=float, default=5.0, help="The approximate size of each polyfile.")
+    parser.add_argument("--corpora", nargs="+", choices=list(CORPORA), default=list(CORPORA))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    args.directory.mkdir(parents=True, exist_ok=True)
+    for name in args.corpora:
+        path = write_corpus(name, args.directory, int(args.size_mb * 1024 * 1024), args.seed)
+        print(f"{path}: {path.stat().st_size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""Profile the polyfile_grammar per terminal and per rule on a given polyfile.
+
+The lexer is timed per token, attributed to the terminal of the token, and every
+rule reduction and terminal callback of the LALR parser is timed separately.
+Afterwards the contextual and standard lexers of Lark are compared on the same
+input, without profiling. All results are printed as markdown tables.
+
+The timers add overhead to every token and reduction, as such the profiled times
+should be compared relative to each other, the lexer comparison reports the
+unprofiled parse times.
+
+Usage:
+    python benchmarks/profile_polyfile_grammar.py --path some/model/dike.pliz --has-z-value
+    python benchmarks/profile_polyfile_grammar.py --size-mb 5
+    python benchmarks/profile_polyfile_grammar.py --size-mb 5 --tree --top 10
+"""
+import argparse
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from lark import Lark
+from lark.exceptions import UnexpectedInput
+from lark.lexer import ContextualLexer, Lexer, LexerState, Token
+
+from bench_read_polyfile import write_synthetic_polyfile
+from plain_model_inspector.io.polyfile import PolyFileTransformer, polyfile_grammar
+from plain_model_inspector.io.polyfile_instrumentation import format_table
+
+
+class Timings:
+    """Timings accumulates the number of calls and the total duration per key."""
+
+    def __init__(self) -> None:
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.durations: Dict[str, float] = defaultdict(float)
+
+    def add(self, key: str, duration: float) -> None:
+        self.counts[key] += 1
+        self.durations[key] += duration
+
+    @property
+    def total(self) -> float:
+        return sum(self.durations.values())
+
+
+class ProfilingLexer(Lexer):
+    """ProfilingLexer times the wrapped lexer per token, by the terminal of the token."""
+
+    def __init__(self, lexer: Lexer, timings: Timings) -> None:
+        self._lexer = lexer
+        self._timings = timings
+
+    def make_lexer_state(self, text: str) -> LexerState:
+        return self._lexer.make_lexer_state(text)
+
+    def lex(self, lexer_state: LexerState, parser_state: Any) -> Iterator[Token]:
+        tokens = self._lexer.lex(lexer_state, parser_state)
+        while True:
+            start = time.perf_counter()
+            token = next(tokens, None)
+            duration = time.perf_counter() - start
+            if token is None:
+                return
+            self._timings.add(token.type, duration)
+            yield token
+
+
+def _timed(callback: Callable, key: str, timings: Timings) -> Callable:
+    def timed_callback(arg: Any) -> Any:
+        start = time.perf_counter()
+        result = callback(arg)
+        timings.add(key, time.perf_counter() - start)
+        return result
+    return timed_callback
+
+
+def _rule_key(rule: Any) -> str:
+    return f"{rule.origin.name}: {' '.join(symbol.name for symbol in rule.expansion)}"
+
+
+def build_parser(start: str, lexer: str, tree: bool, has_z_value: bool) -> Lark:
+    transformer = None if tree else PolyFileTransformer(has_z_value)
+    return Lark(polyfile_grammar, start=start, parser="lalr", lexer=lexer, transformer=transformer)
+
+
+def profile(text: str,
+            start: str,
+            tree: bool,
+            has_z_value: bool) -> Tuple[Timings, Timings, Timings, float, Optional[str]]:
+    """Parse the text with a contextual lexer while timing every token and reduction.
+
+    If the text cannot be parsed, the timings up to the error are returned.
+
+    Args:
+        text (str): The polyfile to parse.
+        start (str): The rule of the polyfile_grammar to start parsing from.
+        tree (bool): Whether a tree is constructed instead of converting while parsing.
+        has_z_value (bool): Whether the third column of each point contains the z-value.
+
+    Returns:
+        Tuple[Timings, Timings, Timings, float, Optional[str]]:
+            The timings per terminal of the lexer, per terminal callback, per rule
+            reduction, the total duration of the profiled parse, and the parse
+            error if any.
+    """
+    parser = build_parser(start, "contextual", tree, has_z_value)
+    terminals, literals, rules = Timings(), Timings(), Timings()
+
+    frontend = parser.parser
+    frontend.lexer = ProfilingLexer(frontend.lexer, terminals)
+
+    # Rules are keyed by their Rule, terminal callbacks by the name of the terminal.
+    callbacks = frontend.parser.parser.callbacks
+    for (key, callback) in list(callbacks.items()):
+        if isinstance(key, str):
+            callbacks[key] = _timed(callback, key, literals)
+        else:
+            callbacks[key] = _timed(callback, _rule_key(key), rules)
+
+    error = None
+    start_time = time.perf_counter()
+    try:
+        parser.parse(text)
+    except UnexpectedInput as e:
+        error = _describe_error(e)
+    return (terminals, literals, rules, time.perf_counter() - start_time, error)
+
+
+def _describe_error(e: Exception) -> str:
+    return f"{type(e).__name__} at line {getattr(e, 'line', '?')}"
+
+
+def _terminal_sets(parser: Lark) -> Tuple[int, float]:
+    lexer = parser.parser.lexer
+    if isinstance(lexer, ContextualLexer):
+        sets = {id(state_lexer): state_lexer for state_lexer in lexer.lexers.values()}
+        return (len(sets), sum(len(l.terminals) for l in sets.values()) / len(sets))
+    return (1, float(len(lexer.terminals)))
+
+
+def compare_lexers(text: str, start: str, tree: bool, has_z_value: bool, repeat: int) -> List[List[str]]:
+    """Compare the unprofiled parse of the text with the contextual and standard lexer.
+
+    Returns:
+        List[List[str]]: The rows of the comparison table.
+    """
+    rows = []
+    size_mb = len(text.encode("utf-8")) / 1e6
+
+    for lexer in ("contextual", "standard"):
+        parser = build_parser(start, lexer, tree, has_z_value)
+        (n_sets, mean_terminals) = _terminal_sets(parser)
+        durations = []
+        outcome = "ok"
+
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            try:
+                parser.parse(text)
+            except UnexpectedInput as e:
+                outcome = _describe_error(e)
+                break
+            durations.append(time.perf_counter() - start_time)
+
+        duration = min(durations) if durations else None
+        rows.append([lexer,
+                     f"{duration:.3f}" if duration is not None else "-",
+                     f"{size_mb / duration:.2f}" if duration else "-",
+                     str(n_sets),
+                     f"{mean_terminals:.1f}",
+                     outcome])
+    return rows
+
+
+def timings_table(name: str, unit: str, per_unit: str, timings: Timings, top: Optional[int]) -> str:
+    total = timings.total
+    keys = sorted(timings.durations, key=lambda key: -timings.durations[key])[:top]
+    rows = [[key,
+             str(timings.counts[key]),
+             f"{timings.durations[key] * 1e3:.1f}",
+             f"{100 * timings.durations[key] / total:.1f}" if total else "-",
+             f"{timings.durations[key] / timings.counts[key] * 1e6:.2f}"] for key in keys]
+    return format_table([name, unit, "time (ms)", "share (%)", f"us per {per_unit}"], rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, default=None, help="The polyfile to profile.")
+    parser.add_argument("--size-mb", type=float, default=2.0,
+                        help="The size of the synthetic polyfile, if no path is given.")
+    parser.add_argument("--has-z-value", action="store_true")
+    parser.add_argument("--start", default="poly_file", help="The rule of the polyfile_grammar to start from.")
+    parser.add_argument("--tree", action="store_true",
+                        help="Construct a tree instead of converting while parsing.")
+    parser.add_argument("--top", type=int, default=None, help="Only report the most expensive entries.")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.path is not None:
+        text = args.path.read_text(encoding="utf-8")
+    else:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = Path(tmp_dir) / "synthetic.pli"
+            write_synthetic_polyfile(path, int(args.size_mb * 1024 * 1024))
+            text = path.read_text(encoding="utf-8")
+
+    (terminals, literals, rules, duration, error) = profile(text, args.start, args.tree, args.has_z_value)
+    if error is not None:
+        print(f"The input could not be parsed ({error}), only the input up to the error is profiled.\n")
+
+    print(f"Profiled parse: {duration:.3f} s, of which lexing {terminals.total:.3f} s, "
+          f"terminal callbacks {literals.total:.3f} s and reductions {rules.total:.3f} s.\n")
+    print(timings_table("terminal", "matches", "match", terminals, args.top) + "\n")
+    if literals.counts:
+        print(timings_table("terminal callback", "calls", "call", literals, args.top) + "\n")
+    print(timings_table("rule", "reductions", "reduction", rules, args.top) + "\n")
+
+    header = ["lexer", "time (s)", "MB/s", "terminal sets", "terminals per set", "result"]
+    print(format_table(header, compare_lexers(text, args.start, args.tree, args.has_z_value, args.repeat)))
+
+
+if __name__ == "__main__":
+    main()
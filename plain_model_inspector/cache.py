@@ -0,0 +1,36 @@
+import os
+from pathlib import Path
+from typing import Optional
+
+
+CACHE_DIR_ENV_VAR = "PLAIN_MODEL_INSPECTOR_CACHE_DIR"
+
+
+def get_cache_dir() -> Optional[Path]:
+    """Get the directory in which plain-model-inspector persists its caches.
+
+    The directory can be overridden with the PLAIN_MODEL_INSPECTOR_CACHE_DIR
+    environment variable. Setting it to an empty string disables on-disk caching.
+    By default $XDG_CACHE_HOME/plain-model-inspector is used, falling back to
+    ~/.cache/plain-model-inspector.
+
+    Returns:
+        Optional[Path]: The existing, writable cache directory, or None if on-disk
+                        caching is disabled or the directory cannot be created.
+    """
+    configured = os.environ.get(CACHE_DIR_ENV_VAR)
+
+    if configured is not None:
+        if not configured:
+            return None
+        cache_dir = Path(configured)
+    else:
+        cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+        cache_dir = Path(cache_home) / "plain-model-inspector"
+
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        return None
+
+    return cache_dir if os.access(cache_dir, os.W_OK) else None
@@ -0,0 +1,75 @@
+"""Command line interface of plain-model-inspector.
+
+Usage:
+    plain-model-inspector inspect path/to/model --workers 8
+"""
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+from plain_model_inspector import __version__
+from plain_model_inspector.io.batch import inspect_directory
+from plain_model_inspector.io.polyfile import ParseErrorLevel
+from plain_model_inspector.io.polyfile_cache import PolyFileCache
+
+
+def _inspect(args: argparse.Namespace) -> int:
+    n_files = 0
+    n_errors = 0
+
+    cache = None if args.no_cache else PolyFileCache.default(max_size=int(args.cache_size_mb * 1024 * 1024))
+
+    stop_at_level = ParseErrorLevel.ERROR if args.fail_fast else None
+
+    for inspection in inspect_directory(args.directory, 
+                                        n_workers=args.workers, 
+                                        cache=cache, 
+                                        stop_at_level=stop_at_level,
+                                        fail_fast=args.fail_fast):
+        n_files += 1
+        print(f"{inspection.path}: {inspection.n_objects} objects, {len(inspection.msgs)} messages",
+              flush=True)
+
+        for msg in inspection.msgs:
+            print(f"{inspection.path}:{msg.line[0]}:{msg.column[0]}: {msg.level.name}: {msg.reason}")
+
+        n_errors += inspection.msgs.count_msgs(levels=(ParseErrorLevel.FATAL, ParseErrorLevel.ERROR))
+
+    print(f"Inspected {n_files} polyfiles, {n_errors} errors.")
+    return 1 if n_errors else 0
+
+
+def main(argv: Optional[List[str]]=None) -> int:
+    """Run the plain-model-inspector command line interface.
+
+    Args:
+        argv (Optional[List[str]], optional): The arguments, excluding the program
+                                              name. Defaults to sys.argv[1:].
+
+    Returns:
+        int: The exit code, which is 1 if any ERROR or FATAL message was found.
+    """
+    parser = argparse.ArgumentParser(prog="plain-model-inspector")
+    parser.add_argument("--version", action="version", version=__version__)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    inspect_parser = subparsers.add_parser("inspect", help="Inspect the polyfiles under a model directory.")
+    inspect_parser.add_argument("directory", type=Path)
+    inspect_parser.add_argument("--workers", type=int, default=None,
+                                help="The number of worker processes. Defaults to the number of processors.")
+    inspect_parser.add_argument("--no-cache", action="store_true",
+                                help="Read every polyfile, instead of reusing the results of previous runs.")
+    inspect_parser.add_argument("--cache-size-mb", type=float, default=1024.0,
+                                help="The maximum size of the cached results in MB.")
+    inspect_parser.add_argument("--fail-fast", action="store_true",
+                                help="Stop reading a polyfile at its first ERROR or FATAL message, and stop "
+                                     "the inspection at the first polyfile which cannot be inspected.")
+    inspect_parser.set_defaults(run=_inspect)
+
+    args = parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
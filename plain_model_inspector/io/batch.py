@@ -0,0 +1,203 @@
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from functools import partial
+from pathlib import Path
+from pydantic import BaseModel, validator
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+from plain_model_inspector.io.polyfile import ParseErrorLevel, ParseMsg
+from plain_model_inspector.io.polyfile_cache import PolyFileCache, PolyFileResult, read_polyfile_cached
+from plain_model_inspector.io.polyfile_msgs import ParseMsgStore, read_polyfile_to_store
+
+
+# The polyfile suffixes mapped to whether their points contain a z-value. The 
+# samples of .xyz files are not organised in named blocks, as such they are not
+# read as polyfiles.
+POLYFILE_SUFFIXES: Dict[str, bool] = {
+    ".pli": False,
+    ".pliz": True,
+    ".pol": False,
+}
+
+
+class PolyFileInspection(BaseModel):
+    """PolyFileInspection describes the result of reading a single polyfile.
+
+    The messages are kept in a ParseMsgStore, such that the inspections of large
+    files remain compact, also when they are returned by worker processes.
+    """
+    path: Path
+    n_objects: int
+    msgs: ParseMsgStore
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @validator("msgs", pre=True)
+    def _store_msgs(cls, v: Any) -> ParseMsgStore:
+        return v if isinstance(v, ParseMsgStore) else ParseMsgStore(v)
+
+
+def find_polyfiles(directory: Union[str, Path]) -> List[Path]:
+    """Find the polyfiles under the given directory, largest file first.
+
+    Args:
+        directory (Union[str, Path]): The directory to search recursively.
+
+    Returns:
+        List[Path]: The paths of the polyfiles ordered by decreasing size.
+    """
+    paths = [path for path in Path(directory).rglob("*")
+             if path.suffix.lower() in POLYFILE_SUFFIXES and path.is_file()]
+
+    # Sorting on the path as well keeps the order deterministic for equal sizes.
+    return sorted(paths, key=lambda path: (-path.stat().st_size, path))
+
+
+def _has_z_value(path: Path) -> bool:
+    return POLYFILE_SUFFIXES.get(path.suffix.lower(), False)
+
+
+def inspect_polyfile(path: Union[str, Path], 
+                     cache: Optional[PolyFileCache]=None,
+                     stop_at_level: Optional[ParseErrorLevel]=None) -> PolyFileInspection:
+    """Read the polyfile at the given path and summarize the result.
+
+    Whether the points contain a z-value is derived from the suffix of the path.
+    A file which cannot be read results in a single FATAL message.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        cache (Optional[PolyFileCache], optional): 
+            The cache of previously read polyfiles. Defaults to None, in which
+            case the file is always read.
+        stop_at_level (Optional[ParseErrorLevel], optional): 
+            Reading stops at the first message of this level or a more severe
+            level. Defaults to None, i.e. the whole file is read. The results of
+            a partially read file are not cached.
+
+    Returns:
+        PolyFileInspection: The number of PolyObjects and the parse messages.
+    """
+    path = Path(path)
+    has_z_value = _has_z_value(path)
+
+    try:
+        (objects, msgs) = (read_polyfile_cached(path, has_z_value, cache) 
+                           if cache is not None and stop_at_level is None else
+                           read_polyfile_to_store(path, has_z_value, memory_map=True, stop_at_level=stop_at_level))
+    except (OSError, UnicodeDecodeError) as e:
+        return _failed_inspection(path, f"File could not be read: {e}")
+
+    return PolyFileInspection(path=path, n_objects=len(objects), msgs=msgs)
+
+
+def _failed_inspection(path: Path, reason: str) -> PolyFileInspection:
+    return PolyFileInspection(path=path,
+                              n_objects=0,
+                              msgs=[ParseMsg(level=ParseErrorLevel.FATAL,
+                                             line=(1, 1),
+                                             column=(1, 1),
+                                             reason=reason)])
+
+
+def _read_polyfile(path: Path) -> PolyFileResult:
+    # Read in a worker process, such that the result is cached by the parent.
+    return read_polyfile_to_store(path, _has_z_value(path), memory_map=True)
+
+
+def _complete_inspection(path: Path, 
+                         get_result: Callable[[], Any], 
+                         cache: Optional[PolyFileCache], 
+                         fail_fast: bool) -> PolyFileInspection:
+    # The result is either a PolyFileInspection, or the PolyFileResult to cache.
+    try:
+        result = get_result()
+    except (OSError, UnicodeDecodeError) as e:
+        return _failed_inspection(path, f"File could not be read: {e}")
+    except Exception as e:
+        if fail_fast:
+            raise
+        return _failed_inspection(path, f"File could not be inspected: {type(e).__name__}: {e}")
+
+    if isinstance(result, PolyFileInspection):
+        return result
+
+    (objects, msgs) = result
+    if cache is not None:
+        cache.put(path, result, _has_z_value(path))
+    return PolyFileInspection(path=path, n_objects=len(objects), msgs=msgs)
+
+
+def inspect_directory(directory: Union[str, Path],
+                      n_workers: Optional[int]=None,
+                      cache: Optional[PolyFileCache]=None,
+                      stop_at_level: Optional[ParseErrorLevel]=None,
+                      fail_fast: bool=False) -> Iterator[PolyFileInspection]:
+    """Inspect all polyfiles under the given directory on a process pool.
+
+    Files of which the result is cached are yielded first, without starting
+    the process pool. The remaining files are submitted largest first, such 
+    that a single large file does not delay the end of the batch. These 
+    inspections are yielded as soon as each file has been read, as such their 
+    order is not deterministic. The cache is only used by the current process,
+    the results of the workers are cached once they are returned.
+
+    A file which cannot be inspected, e.g. because reading it raises an 
+    unexpected exception, results in a single FATAL message, unless fail_fast
+    is set.
+
+    Args:
+        directory (Union[str, Path]): The directory to search recursively.
+        n_workers (Optional[int], optional):
+            The number of worker processes. Defaults to the number of processors.
+            With a single worker the files are read in the current process.
+        cache (Optional[PolyFileCache], optional): 
+            The cache of previously read polyfiles. Defaults to None, in which
+            case every file is read.
+        stop_at_level (Optional[ParseErrorLevel], optional): 
+            Reading a file stops at its first message of this level or a more 
+            severe level. Defaults to None, i.e. every file is read completely.
+        fail_fast (bool, optional): Whether an unexpected exception while 
+                                    inspecting a file is raised, which stops 
+                                    the batch. Defaults to False.
+
+    Yields:
+        Iterator[PolyFileInspection]: The inspection of each polyfile.
+
+    Raises:
+        Exception: The unexpected exception of a file, if fail_fast is set.
+    """
+    # Partially read files are not cached.
+    if stop_at_level is not None:
+        cache = None
+
+    paths: List[Path] = []
+
+    for path in find_polyfiles(directory):
+        result = cache.get(path, _has_z_value(path)) if cache is not None else None
+        if result is None:
+            paths.append(path)
+            continue
+
+        (objects, msgs) = result
+        yield PolyFileInspection(path=path, n_objects=len(objects), msgs=msgs)
+
+    if not paths:
+        return
+
+    read = _read_polyfile if cache is not None else partial(inspect_polyfile, cache=None, stop_at_level=stop_at_level)
+
+    if n_workers == 1:
+        for path in paths:
+            yield _complete_inspection(path, partial(read, path), cache, fail_fast)
+        return
+
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures: Dict[Future, Path] = {executor.submit(read, path): path for path in paths}
+        try:
+            for future in as_completed(futures):
+                yield _complete_inspection(futures[future], future.result, cache, fail_fast)
+        finally:
+            # Stopping the batch early should not wait for the remaining files.
+            for future in futures:
+                future.cancel()
@@ -1,10 +1,27 @@
+import mmap
+import os
+import re
+from bisect import bisect_right
 from enum import Enum
+from functools import lru_cache
+from itertools import chain
+from hashlib import sha256
+from time import perf_counter
 from lark import Lark, Transformer
-from lark.lexer import Token
+from lark.exceptions import UnexpectedInput
+from lark.lexer import Lexer, LexerState, LineCounter, Token
 from lark.tree import Tree
 from lark.visitors import Interpreter
-from pydantic import BaseModel
-from typing import Collection, Sequence, Tuple, Any, List, Optional
+import numpy as np
+from pydantic import BaseModel, root_validator, validator
+from pathlib import Path
+from typing import AbstractSet, AnyStr, Callable, Collection, Dict, FrozenSet, Iterable, Iterator, NamedTuple, Pattern, Sequence, Tuple, Any, List, Optional, Union, TYPE_CHECKING
+
+from plain_model_inspector.cache import get_cache_dir
+from plain_model_inspector.io.polyfile_instrumentation import Instrumentation, Span, Stage
+
+if TYPE_CHECKING:
+    from plain_model_inspector.io.polyfile_msgs import ParseMsgStore
 
 
 polyfile_grammar = r"""// Grammar defined for polyfiles:
@@ -59,6 +76,59 @@ invalid_block.-2: name_line? INVALID_BLOCK
 poly_file: EMPTY_LINES? (poly_block | invalid_block )+
 """
 
+polyfile_grammar_hash: str = sha256(polyfile_grammar.encode("utf-8")).hexdigest()
+
+
+def _build_polyfile_parser(start: str, transformer: Optional[Transformer]=None) -> Lark:
+    """Build a new LALR parser of the polyfile_grammar for the given start symbol.
+
+    If a cache directory is available, the analysed grammar and parse tables are
+    persisted to disk, keyed by the hash of the grammar. Subsequent builds, including
+    those in fresh processes, load the tables instead of reconstructing them.
+
+    Args:
+        start (str): The rule of the polyfile_grammar to start parsing from.
+        transformer (Optional[Transformer], optional): 
+            Transformer applied while parsing, instead of afterwards. Defaults to None.
+
+    Returns:
+        Lark: The newly constructed parser.
+    """
+    cache_dir = get_cache_dir()
+    cache = (str(cache_dir / f"polyfile_{start}_{polyfile_grammar_hash[:16]}.lark")
+             if cache_dir is not None else False)
+
+    return Lark(polyfile_grammar, start=start, parser='lalr', cache=cache, transformer=transformer)
+
+
+@lru_cache(maxsize=None)
+def get_polyfile_parser(start: str = "poly_file", 
+                        transform_literals: bool=False,
+                        msg_filter: Optional["MsgFilter"]=None) -> Lark:
+    """Get the shared LALR parser of the polyfile_grammar for the given start symbol.
+
+    Parsers are only constructed the first time a start symbol is requested and are
+    kept in memory for the remainder of the process. The returned parser is shared
+    and should not be modified.
+
+    Args:
+        start (str, optional): The rule of the polyfile_grammar to start parsing from.
+                               Defaults to "poly_file".
+        transform_literals (bool, optional): 
+            Whether the literals are converted with the PolyFileLiteralTransformer 
+            while they are parsed, such that the resulting tree can be fed directly 
+            to the PolyFileInterpreter. Defaults to False.
+        msg_filter (Optional[MsgFilter], optional):
+            The messages created by the PolyFileLiteralTransformer. Defaults to None,
+            i.e. all messages are created.
+
+    Returns:
+        Lark: The parser corresponding with the start symbol.
+    """
+    transformer = PolyFileLiteralTransformer(msg_filter) if transform_literals else None
+    return _build_polyfile_parser(start, transformer)
+
+
 class ParseErrorLevel(Enum):
     """ParseErrorLevel defines the possible error levels of ParsingReportItems.
     """
@@ -75,6 +145,64 @@ class ParseMsg(BaseModel):
     reason: str
 
 
+class MsgKind(Enum):
+    """MsgKind defines the kinds of ParseMsgs which can be reported while reading a polyfile.
+
+    Each kind is always reported with the same ParseErrorLevel, see MSG_KIND_LEVELS.
+    """
+    EMPTY_LINES = "empty_lines"
+    WHITESPACE = "whitespace"
+    INSUFFICIENT_COLUMNS = "insufficient_columns"
+    EXCESS_COLUMNS = "excess_columns"
+    MISSING_COLUMN = "missing_column"
+    MISSING_POINT_DATA = "missing_point_data"
+    EXCESS_POINT_DATA = "excess_point_data"
+    INVALID_POINT = "invalid_point"
+    INVALID_BLOCK = "invalid_block"
+
+
+MSG_KIND_LEVELS: Dict[MsgKind, ParseErrorLevel] = {
+    MsgKind.EMPTY_LINES: ParseErrorLevel.WARNING,
+    MsgKind.WHITESPACE: ParseErrorLevel.WARNING,
+    MsgKind.INSUFFICIENT_COLUMNS: ParseErrorLevel.ERROR,
+    MsgKind.EXCESS_COLUMNS: ParseErrorLevel.WARNING,
+    MsgKind.MISSING_COLUMN: ParseErrorLevel.ERROR,
+    MsgKind.MISSING_POINT_DATA: ParseErrorLevel.ERROR,
+    MsgKind.EXCESS_POINT_DATA: ParseErrorLevel.ERROR,
+    MsgKind.INVALID_POINT: ParseErrorLevel.ERROR,
+    MsgKind.INVALID_BLOCK: ParseErrorLevel.ERROR,
+}
+
+_ALL_MSG_KINDS: FrozenSet[MsgKind] = frozenset(MsgKind)
+
+
+class MsgFilter(BaseModel):
+    """MsgFilter selects the kinds of ParseMsgs which are reported while reading a polyfile.
+
+    A message is reported if its level is report_level or a more severe level,
+    and its kind is not disabled. The filter is evaluated before a message is 
+    constructed, as such suppressed messages are never created.
+    """
+    report_level: ParseErrorLevel = ParseErrorLevel.INFO
+    disabled_kinds: FrozenSet[MsgKind] = frozenset()
+
+    class Config:
+        frozen = True
+
+    def enabled_kinds(self) -> FrozenSet[MsgKind]:
+        """Get the kinds of ParseMsgs which are reported.
+
+        Returns:
+            FrozenSet[MsgKind]: The kinds of messages which pass the filter.
+        """
+        return frozenset(kind for (kind, level) in MSG_KIND_LEVELS.items()
+                         if level.value <= self.report_level.value and kind not in self.disabled_kinds)
+
+
+def _get_enabled_kinds(msg_filter: Optional[MsgFilter]) -> FrozenSet[MsgKind]:
+    return msg_filter.enabled_kinds() if msg_filter is not None else _ALL_MSG_KINDS
+
+
 class DescriptionHeader(BaseModel):
     content: str
 
@@ -96,21 +224,163 @@ class Point(BaseModel):
     data: Sequence[float]
 
 
-# TODO: make sure this is an actual object
+def _values_from_rows(rows: Sequence[Sequence[float]], n_columns: int) -> np.ndarray:
+    """Convert the rows of a block into a single (n_rows, n_columns) float64 array.
+
+    Rows with fewer values than the widest row, or fewer than n_columns, are padded
+    with NaN to represent the missing data.
+    """
+    width = max(n_columns, max((len(r) for r in rows), default=0))
+
+    if all(len(r) == width for r in rows):
+        return np.array(rows, dtype=np.float64).reshape((len(rows), width))
+
+    values = np.full((len(rows), width), np.nan, dtype=np.float64)
+    for i, row in enumerate(rows):
+        values[i, :len(row)] = row
+    return values
+
+
+def _point_from_row(row: np.ndarray, has_z_value: bool) -> Point:
+    # NaN values are never parsed, they only pad the rows with missing data.
+    min_n_columns = 3 if has_z_value else 2
+    z_value = float(row[2]) if has_z_value and not np.isnan(row[2]) else None
+    data = [v for v in row[min_n_columns:].tolist() if v == v]
+
+    return Point.construct(x=float(row[0]), y=float(row[1]), z=z_value, data=data)
+
+
+class PointsView(Sequence[Point]):
+    """PointsView provides the Point API on top of the values of a block.
+
+    The Points are constructed lazily when a row is accessed.
+    """
+
+    def __init__(self, values: np.ndarray, has_z_value: bool=False) -> None:
+        self._values = values
+        self._has_z_value = has_z_value
+
+    @property
+    def values(self) -> np.ndarray:
+        return self._values
+
+    def __len__(self) -> int:
+        return self._values.shape[0]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return _point_from_row(self._values[index], self._has_z_value)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, PointsView):
+            return (self._has_z_value == other._has_z_value and 
+                    np.array_equal(self._values, other._values, equal_nan=True))
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+
 class PolyObject(BaseModel):
+    """PolyObject describes a single block of a polyfile.
+
+    The points are stored column-wise in values, a single float64 array with 
+    a row per point. Rows with missing data are padded with NaN. The x, y, z 
+    and data properties are views on this array, and points provides the 
+    original Point API.
+    """
     description: Optional[DescriptionHeader]
     metadata: Metadata
-    points: List[Point]
+    values: np.ndarray
+    has_z_value: bool = False
+
+    class Config:
+        arbitrary_types_allowed = True
+        json_encoders = { np.ndarray: lambda v: v.tolist() }
+
+    @root_validator(pre=True)
+    def _convert_points(cls, fields: Dict[str, Any]) -> Dict[str, Any]:
+        # Support constructing a PolyObject from a sequence of Points.
+        if "values" not in fields and "points" in fields:
+            points = fields.pop("points")
+            has_z_value = fields.setdefault("has_z_value", 
+                                            any(p.z is not None for p in points))
+            rows = [[p.x, p.y] + 
+                    ([p.z if p.z is not None else np.nan] if has_z_value else []) +
+                    list(p.data) for p in points]
+            fields["values"] = _values_from_rows(rows, 3 if has_z_value else 2)
+        return fields
+
+    @validator("values")
+    def _validate_values(cls, v: np.ndarray) -> np.ndarray:
+        v = np.asarray(v, dtype=np.float64)
+        if v.ndim != 2:
+            raise ValueError("values should be a (n_rows, n_columns) array.")
+        return v
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.values[:, 0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.values[:, 1]
+
+    @property
+    def z(self) -> Optional[np.ndarray]:
+        return self.values[:, 2] if self.has_z_value else None
+
+    @property
+    def data(self) -> np.ndarray:
+        return self.values[:, 3 if self.has_z_value else 2:]
+
+    @property
+    def points(self) -> PointsView:
+        return PointsView(self.values, self.has_z_value)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PolyObject):
+            return NotImplemented
+        return (self.description == other.description and
+                self.metadata == other.metadata and 
+                self.has_z_value == other.has_z_value and
+                np.array_equal(self.values, other.values, equal_nan=True))
+
+
+class TokenData:
+    """TokenData couples the converted value of a literal to its token.
+
+    TokenData is created for every NAME, INT and FLOAT literal, as such it is 
+    a plain slotted record without any validation. Validation happens when the 
+    public models, e.g. Metadata and PolyObject, are constructed.
+    """
+    __slots__ = ("token", "data")
+
+    def __init__(self, token: Token, data: Any) -> None:
+        self.token = token
+        self.data = data
 
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TokenData):
+            return NotImplemented
+        return self.token == other.token and self.data == other.data
 
-class TokenData(BaseModel):
-    token: Token
-    data: Any
+    def __repr__(self) -> str:
+        return f"TokenData(token={self.token!r}, data={self.data!r})"
 
 
 def _message_from_tokens(tokens: Sequence[Token], 
                          level: ParseErrorLevel, 
                          reason: str) -> ParseMsg:
+    if tokens[0].line is None:
+        # The tokens of the block parsers only carry their offsets, the message 
+        # spans these offsets until _parse_block resolves them.
+        return ParseMsg(level=level,
+                        line=(tokens[0].pos_in_stream,  # type: ignore
+                              tokens[-1].end_pos),      # type: ignore
+                        column=(0, 0),
+                        reason=reason)
+
     return ParseMsg(level=level,           
                     line=(tokens[0].line,           # type: ignore
                           tokens[-1].end_line),     # type: ignore
@@ -120,19 +390,31 @@ def _message_from_tokens(tokens: Sequence[Token],
 
 
 class PolyFileLiteralTransformer(Transformer):
-    """ Transforms the literals of a polyfile to usable objects"""
+    """ Transforms the literals of a polyfile to usable objects
+
+    Literals of which the message is suppressed by the MsgFilter are transformed
+    into None, which is dropped together with the messages by the rules.
+    """
+    def __init__(self, msg_filter: Optional[MsgFilter]=None) -> None:
+        super().__init__()
+        self._enabled_kinds = _get_enabled_kinds(msg_filter)
+
     def COMMENT(self, token: Token) -> CommentLine:
         # Comments cannot contain errors, as such we directly return the CommentLine
         return CommentLine(content=token[1:].rstrip())
 
-    def EMPTY_LINES(self, token: Token) -> ParseMsg:
+    def EMPTY_LINES(self, token: Token) -> Optional[ParseMsg]:
         # Empty lines are not permitted by the standard, as such they always return a
-        # warning parse message.
+        # warning parse message, unless it is suppressed.
+        if MsgKind.EMPTY_LINES not in self._enabled_kinds:
+            return None
         return _message_from_tokens((token,), ParseErrorLevel.WARNING, "Unexpected empty lines will be ignored.")
 
-    def WS(self, token: Token) -> ParseMsg:
+    def WS(self, token: Token) -> Optional[ParseMsg]:
         # Non-ignored whitespace is not permitted by the standard, as such it always 
-        # returns a warning parse message.
+        # returns a warning parse message, unless it is suppressed.
+        if MsgKind.WHITESPACE not in self._enabled_kinds:
+            return None
         return _message_from_tokens((token,), ParseErrorLevel.WARNING, "Unexpected empty whitespace will be ignored.")
 
     def NAME(self, token: Token) -> TokenData: 
@@ -142,7 +424,161 @@ class PolyFileLiteralTransformer(Transformer):
         return TokenData(token=token, data=int(str(token)))
 
     def FLOAT(self, token: Token) -> TokenData:
-        return TokenData(token=token, data=float(str(token)))
+        # Floats are kept as text, such that the points of a block can be 
+        # converted at once by the PolyFileInterpreter.
+        return TokenData(token=token, data=str(token))
+
+
+def _filter_msgs(input: Collection) -> Tuple[List[Any], List[ParseMsg]]:
+    # Suppressed messages are None, and are dropped.
+    elems = list(x for x in input if x is not None and not isinstance(x, ParseMsg))
+    msgs = list(x for x in input if isinstance(x, ParseMsg))
+
+    return elems, msgs
+
+
+def _description_header(children: Collection) -> Tuple[DescriptionHeader, List[ParseMsg]]:
+    (comments, msgs) = _filter_msgs(children)
+
+    # Either elements are ParseMsgs or they are CommentLines, due to the grammar
+    result: str = "\n".join(elem.content for elem in comments)
+    return DescriptionHeader(content=result), msgs
+
+
+def _dimensions_line(result: Tuple[Tuple[int, int], List[ParseMsg]], 
+                     whitespace_msg: Optional[ParseMsg]) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+    (dimensions, msgs) = result
+
+    # The message of the WS terminal is only specialised, it is not constructed 
+    # again.
+    if whitespace_msg is not None:
+        whitespace_msg.reason = "Whitespace at the beginning of the dimensions is ignored."
+        msgs.append(whitespace_msg)
+
+    return dimensions, msgs
+
+
+def _dimensions_valid(n_rows: TokenData, 
+                      n_columns: TokenData, 
+                      min_n_columns: int,
+                      enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+    msgs: List[ParseMsg] = list()
+
+    # TODO: check if we need validation on the number of points here (lines vs polygons)
+    if n_columns.data < min_n_columns and MsgKind.INSUFFICIENT_COLUMNS in enabled_kinds:
+        msgs.append(_message_from_tokens((n_columns.token, ),
+                                         ParseErrorLevel.ERROR, 
+                                         "The number of specified columns is smaller than the minimum expected number."))
+
+    return ((n_rows.data, n_columns.data), msgs)
+
+
+def _dimensions_exceeding_columns(result: Tuple[Tuple[int, int], List[ParseMsg]], 
+                                  excess_column: TokenData,
+                                  enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+    (dimensions, msgs) = result
+
+    if MsgKind.EXCESS_COLUMNS in enabled_kinds:
+        msgs.append(_message_from_tokens((excess_column.token, ),
+                                         ParseErrorLevel.WARNING, 
+                                         "Too many columns specified, the excess columns will be ignored."))
+
+    return (dimensions, msgs)
+
+
+def _dimensions_missing_column(n_rows: TokenData, 
+                               enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+    msgs = [ _message_from_tokens((n_rows.token,),
+                                  ParseErrorLevel.ERROR, 
+                                  "Only one dimension is specified, the number of columns will not be validated")
+           ] if MsgKind.MISSING_COLUMN in enabled_kinds else []
+
+    return ((n_rows.data, -1), msgs)
+
+
+def _point_msgs(values: Sequence[TokenData], 
+                expected_n_columns: int,
+                enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> List[ParseMsg]:
+    msgs: List[ParseMsg] = list()
+    n_values = len(values)
+
+    if n_values < expected_n_columns and MsgKind.MISSING_POINT_DATA in enabled_kinds:
+        msgs.append(_message_from_tokens((values[0].token, values[-1].token),
+                    ParseErrorLevel.ERROR,
+                    "Not as many columns provided as specified, the created point will be missing data."))
+
+    elif n_values > expected_n_columns and MsgKind.EXCESS_POINT_DATA in enabled_kinds:
+        msgs.append(_message_from_tokens((values[0].token, values[-1].token),
+                    ParseErrorLevel.ERROR,
+                    "Too many columns provided as specified, the created point will contain too much data."))
+
+    return msgs
+
+
+def _point_invalid(value: TokenData, 
+                   enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Tuple[None, List[ParseMsg]]:
+    if MsgKind.INVALID_POINT not in enabled_kinds:
+        return (None, [])
+
+    return (None, 
+            [ _message_from_tokens((value.token, ),
+                                   ParseErrorLevel.ERROR,
+                                   "No point can be constructed from only a single value, row will be skipped") ])
+
+
+def _point_values(rows: Sequence[Sequence[TokenData]], n_columns: int) -> np.ndarray:
+    is_clean = [len(row) == n_columns for row in rows]
+    width = max([n_columns] + [len(row) for row in rows])
+    values = np.full((len(rows), width), np.nan, dtype=np.float64)
+
+    # The rows with the expected number of columns are converted at once, only
+    # the rows with parse messages are converted value by value.
+    clean_text = [v.data for (row, clean) in zip(rows, is_clean) if clean for v in row]
+    values[np.array(is_clean, dtype=bool), :n_columns] = \
+        np.array(clean_text, dtype=np.float64).reshape((-1, n_columns))
+
+    for (i, (row, clean)) in enumerate(zip(rows, is_clean)):
+        if not clean:
+            values[i, :len(row)] = [float(v.data) for v in row]
+
+    return values
+
+
+def _invalid_block(name: Optional[TokenData], 
+                   invalid_block: Token,
+                   enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Optional[ParseMsg]:
+    if MsgKind.INVALID_BLOCK not in enabled_kinds:
+        return None
+
+    # Note: we know that an invalid block only consists of an optional 
+    # name_line and the INVALID_BLOCK token, as such we use this to 
+    # construct the range
+    tokens: List[Token] = [name.token] if name is not None else []
+    tokens.append(invalid_block)
+
+    return _message_from_tokens(tokens,
+                                ParseErrorLevel.ERROR, 
+                                "Invalid block of data will be ignored.")
+
+
+def _poly_file(children: Iterable[Any]) -> Tuple[List[PolyObject], List[ParseMsg]]:
+    # Given the grammar, children are either ParseMsgs of empty lines and 
+    # invalid blocks, or the (PolyObject, messages) of valid blocks. Suppressed
+    # messages are None.
+    objects: List[PolyObject] = []
+    msgs: List[ParseMsg] = []
+
+    for child in children:
+        if child is None:
+            continue
+        if isinstance(child, ParseMsg):
+            msgs.append(child)
+        else:
+            (poly_object, block_msgs) = child
+            objects.append(poly_object)
+            msgs.extend(block_msgs)
+
+    return (objects, msgs)
 
 
 class PolyFileInterpreter(Interpreter):
@@ -156,25 +592,19 @@ class PolyFileInterpreter(Interpreter):
     as well.
     """
 
-    def __init__(self, has_z_value: bool=False) -> None:
+    def __init__(self, has_z_value: bool=False, msg_filter: Optional[MsgFilter]=None) -> None:
         super().__init__()
         self._has_z_value = has_z_value
+        self._enabled_kinds = _get_enabled_kinds(msg_filter)
         self._min_n_columns: int = 2 if not has_z_value else 3
         self._expected_n_columns = self._min_n_columns
 
     @staticmethod
-    def _filter_msgs(input: Collection) -> Collection:
-        elems = list(x for x in input if not isinstance(x, ParseMsg))
-        msgs = list(x for x in input if isinstance(x, ParseMsg))
-
-        return elems, msgs
+    def _filter_msgs(input: Collection) -> Tuple[List[Any], List[ParseMsg]]:
+        return _filter_msgs(input)
 
     def description_header(self, tree: Tree) -> Tuple[DescriptionHeader, Sequence[ParseMsg]]:
-        (comments, msgs) = PolyFileInterpreter._filter_msgs(tree.children)
-
-        # Either elements are ParseMsgs or they are CommentLines, due to the grammar
-        result: str = "\n".join(elem.content for elem in comments)
-        return DescriptionHeader(content=result), msgs
+        return _description_header(tree.children)
 
     def metadata(self, tree: Tree) -> Tuple[Metadata, List[ParseMsg]]:
         elems, msgs = PolyFileInterpreter._filter_msgs(tree.children)
@@ -193,136 +623,1044 @@ class PolyFileInterpreter(Interpreter):
 
 
     def dimensions_line(self, tree: Tree) -> Tuple[Tuple[int, int], List[ParseMsg]]:
-        (result, msgs) = self.visit(tree.children[-1]) # type: ignore
-
-        if len(tree.children) > 1:
-            # Given the grammar, if more than 1 element exist, it is due
-            # to the first element being whitespace.
-            msgs.append(_message_from_tokens((tree.children[0].token, ), # type: ignore
-                                             ParseErrorLevel.WARNING,
-                                             "Whitespace at the beginning of the dimensions is ignored."))
-
-        return result, msgs
+        # Given the grammar, if more than 1 element exist, it is due
+        # to the first element being whitespace, which has already been 
+        # transformed into a ParseMsg.
+        whitespace_msg = tree.children[0] if len(tree.children) > 1 else None
+        return _dimensions_line(self.visit(tree.children[-1]), whitespace_msg) # type: ignore
 
     def dimensions_valid(self, tree: Tree) -> Tuple[Tuple[int, int], List[ParseMsg]]:
         # Given the grammar, we know that a valid tree has two children with valid integers.
-        msgs: List[ParseMsg] = list()
-
-        # TODO: check if we need validation on the number of points here (lines vs polygons)
-        n_rows: int = tree.children[0].data # type: ignore
-        n_columns: int = tree.children[1].data # type: ignore
-
-        if n_columns < self._min_n_columns:
-            msgs.append(_message_from_tokens((tree.children[1].token, ), # type: ignore
-                                             ParseErrorLevel.ERROR, 
-                                             "The number of specified columns is smaller than the minimum expected number."))
-
-        return ((n_rows, n_columns), msgs)
+        return _dimensions_valid(tree.children[0], tree.children[1], self._min_n_columns, self._enabled_kinds) # type: ignore
 
     def dimensions_exceeding_columns(self, tree: Tree) -> Tuple[Tuple[int, int], List[ParseMsg]]:
-        (result, msgs) = self.visit(tree.children[0]) # type: ignore
-
-        msgs.append(_message_from_tokens((tree.children[1].token, ), # type: ignore
-                                         ParseErrorLevel.WARNING, 
-                                         "Too many columns specified, the excess columns will be ignored."))
-
-        return (result, msgs)
+        return _dimensions_exceeding_columns(self.visit(tree.children[0]), tree.children[1], self._enabled_kinds) # type: ignore
 
     def dimensions_missing_column(self, tree: Tree) -> Tuple[Tuple[int, int], List[ParseMsg]]:
-        msgs = [ _message_from_tokens((tree.children[0].token,), # type: ignore
-                                      ParseErrorLevel.ERROR, 
-                                      "Only one dimension is specified, the number of columns will not be validated")
-               ]
-
-        n_rows: int = tree.children[0].data # type: ignore
-
-        return ((n_rows, -1), msgs)
+        return _dimensions_missing_column(tree.children[0], self._enabled_kinds) # type: ignore
 
     def point(self, tree: Tree) -> Tuple[Optional[Point], List[ParseMsg]]:
-        msgs: List[ParseMsg] = list()
+        msgs = _point_msgs(tree.children, self._expected_n_columns, self._enabled_kinds) # type: ignore
 
-        values: List[float] = list(v.data for v in tree.children) # type: ignore
+        values: List[float] = list(float(v.data) for v in tree.children) # type: ignore
         n_values = len(values)
 
-        if n_values < self._expected_n_columns:
-            msgs.append(_message_from_tokens((tree.children[0].token, tree.children[-1].token), # type: ignore
-                        ParseErrorLevel.ERROR,
-                        "Not as many columns provided as specified, the created point will be missing data."))
-
-        elif n_values > self._expected_n_columns:
-            msgs.append(_message_from_tokens((tree.children[0].token, tree.children[-1].token), # type: ignore
-                        ParseErrorLevel.ERROR,
-                        "Too many columns provided as specified, the created point will contain too much data."))
-
         z_value = values[2] if self._has_z_value and n_values >= 3 else None
         data = values[self._min_n_columns:]
 
         return (Point(x=values[0], y=values[1], z=z_value, data=data), msgs)
 
-
     def point_invalid(self, tree: Tree) -> Tuple[Optional[Point], List[ParseMsg]]:
-        return (None, 
-                [ _message_from_tokens((tree.children[0].token, ), # type: ignore
-                                       ParseErrorLevel.ERROR,
-                                       "No point can be constructed from only a single value, row will be skipped") ])
+        return _point_invalid(tree.children[0], self._enabled_kinds) # type: ignore
 
-    def points(self, tree: Tree) -> Tuple[List[Point], List[ParseMsg]]:
+    def points(self, tree: Tree) -> Tuple[PointsView, List[ParseMsg]]:
         # TODO: add validation for the number of points
         elems, msgs = PolyFileInterpreter._filter_msgs(tree.children)
-        points: List[Point] = []
+        rows: List[List[TokenData]] = []
 
         for e in elems:
-            (point, point_msgs) = self.visit(e)
+            if e.data == "point_invalid":
+                (_, point_msgs) = self.visit(e)
+            else:
+                point_msgs = _point_msgs(e.children, self._expected_n_columns, self._enabled_kinds)
+                rows.append(e.children)
 
-            if point:
-                points.append(point)
             if point_msgs:
                 msgs.extend(point_msgs)
 
-        return (points, msgs)
-        
+        values = _point_values(rows, self._expected_n_columns)
+        return (PointsView(values, self._has_z_value), msgs)
 
     def poly_block(self, tree: Tree) -> Tuple[PolyObject, List[ParseMsg]]:
         elems, msgs = PolyFileInterpreter._filter_msgs(tree.children)
 
-        # TODO: set validation values
-
-        components = tuple(self.visit(e) for e in elems)
-
         # given the grammar, we either have 2 or 3 components, because
         # the description header is optional
-        if (len(components) == 3):
-            ((description, description_msgs), 
-             (metadata, metadata_msgs),
-             (points, point_msgs)) = components
+        if len(elems) == 3:
+            (description, description_msgs) = self.visit(elems[0])
         else:
-            ((metadata, metadata_msgs),
-             (points, point_msgs)) = components
-            description= None
+            description = None
             description_msgs = []
 
+        (metadata, metadata_msgs) = self.visit(elems[-2])
+
+        # The points are validated against the number of columns specified in
+        # the dimensions, unless fewer than the minimum are specified.
+        self._expected_n_columns = max(metadata.n_columns, self._min_n_columns)
+        (points, point_msgs) = self.visit(elems[-1])
+
         msgs.extend(description_msgs)
         msgs.extend(metadata_msgs)
         msgs.extend(point_msgs)
 
         return (PolyObject(description=description, 
                            metadata=metadata,
-                           points=points),
+                           values=points.values,
+                           has_z_value=self._has_z_value),
                 msgs)
 
-    def invalid_block(self, tree: Tree):
-        # Note: we know that an invalid block only
-        # consists of tokens, as such we use this to construct the range
-        return _message_from_tokens(tree.children, # type: ignore
-                                    ParseErrorLevel.ERROR, 
-                                    "Invalid block of data will be ignored.")
+    def invalid_block(self, tree: Tree) -> Optional[ParseMsg]:
+        name: Optional[TokenData] = None
+
+        if isinstance(tree.children[0], Tree):
+            name_elems, _ = PolyFileInterpreter._filter_msgs(tree.children[0].children)
+            name = name_elems[0]
 
-    def poly_file(self, tree: Tree):
+        return _invalid_block(name, tree.children[-1], self._enabled_kinds) # type: ignore
+
+    def poly_file(self, tree: Tree) -> Tuple[List[PolyObject], List[ParseMsg]]:
         """Handle the parsing of a poly file.
 
-        This serves as the entry point of the parsing of whole pol files.
+        This serves as the entry point of the parsing of whole pol files. Each
+        block is visited exactly once, in order of occurrence.
 
         Args:
-            tree (Tree): [description]
+            tree (Tree): The poly_file tree with transformed literals.
+
+        Returns:
+            Tuple[List[PolyObject], List[ParseMsg]]: 
+                The PolyObjects of the valid blocks and all parse messages in 
+                order of occurrence.
         """
-        pass
\ No newline at end of file
+        return _poly_file(self.visit(child) if isinstance(child, Tree) else child 
+                          for child in tree.children)
+
+
+class PolyFileTransformer(PolyFileLiteralTransformer):
+    """PolyFileTransformer converts a polyfile into its contents and parse messages
+    while it is being parsed.
+
+    It is embedded in the LALR parser, see get_inline_polyfile_parser, such that 
+    each rule is converted as soon as it is reduced and no tree is constructed. 
+    The results are identical to those of the PolyFileInterpreter. Because the 
+    rules are reduced bottom-up, the points are only validated once their 
+    poly_block is reduced. The transformer does not contain any state besides its
+    configuration, and can thus be shared between parses.
+    """
+
+    def __init__(self, has_z_value: bool=False, msg_filter: Optional[MsgFilter]=None) -> None:
+        super().__init__(msg_filter)
+        self._has_z_value = has_z_value
+        self._min_n_columns: int = 2 if not has_z_value else 3
+
+    def description_header(self, children: List[Any]) -> Tuple[DescriptionHeader, List[ParseMsg]]:
+        return _description_header(children)
+
+    def name_line(self, children: List[Any]) -> Tuple[TokenData, List[ParseMsg]]:
+        # The token is retained, as it is required when the name is part of an invalid_block.
+        elems, msgs = _filter_msgs(children)
+        return elems[0], msgs
+
+    def dimensions_line(self, children: List[Any]) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+        whitespace_msg = children[0] if len(children) > 1 else None
+        return _dimensions_line(children[-1], whitespace_msg)
+
+    def dimensions_valid(self, children: List[Any]) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+        return _dimensions_valid(children[0], children[1], self._min_n_columns, self._enabled_kinds)
+
+    def dimensions_exceeding_columns(self, children: List[Any]) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+        return _dimensions_exceeding_columns(children[0], children[1], self._enabled_kinds)
+
+    def dimensions_missing_column(self, children: List[Any]) -> Tuple[Tuple[int, int], List[ParseMsg]]:
+        return _dimensions_missing_column(children[0], self._enabled_kinds)
+
+    def metadata(self, children: List[Any]) -> Tuple[Metadata, List[ParseMsg]]:
+        elems, msgs = _filter_msgs(children)
+
+        (name, name_msgs) = elems[0]
+        ((n_rows, n_columns), dimensions_msgs) = elems[1]
+
+        msgs.extend(name_msgs)
+        msgs.extend(dimensions_msgs)
+
+        return Metadata(name=name.data, n_rows=n_rows, n_columns=n_columns), msgs
+
+    def point(self, children: List[TokenData]) -> List[TokenData]:
+        return children
+
+    def point_invalid(self, children: List[TokenData]) -> Tuple[None, List[ParseMsg]]:
+        return _point_invalid(children[0], self._enabled_kinds)
+
+    def points(self, children: List[Any]) -> Tuple[List[Any], List[ParseMsg]]:
+        # The points can only be validated once the dimensions are known, as such
+        # the rows and invalid points are passed on to the poly_block.
+        return _filter_msgs(children)
+
+    def poly_block(self, children: List[Any]) -> Tuple[PolyObject, List[ParseMsg]]:
+        elems, msgs = _filter_msgs(children)
+
+        if len(elems) == 3:
+            (description, description_msgs) = elems[0]
+        else:
+            description = None
+            description_msgs = []
+
+        (metadata, metadata_msgs) = elems[-2]
+        (point_elems, point_msgs) = elems[-1]
+
+        expected_n_columns = max(metadata.n_columns, self._min_n_columns)
+        rows: List[List[TokenData]] = []
+
+        for e in point_elems:
+            if isinstance(e, tuple):
+                point_msgs.extend(e[1])
+            else:
+                point_msgs.extend(_point_msgs(e, expected_n_columns, self._enabled_kinds))
+                rows.append(e)
+
+        msgs.extend(description_msgs)
+        msgs.extend(metadata_msgs)
+        msgs.extend(point_msgs)
+
+        return (PolyObject(description=description,
+                           metadata=metadata,
+                           values=_point_values(rows, expected_n_columns),
+                           has_z_value=self._has_z_value),
+                msgs)
+
+    def invalid_block(self, children: List[Any]) -> Optional[ParseMsg]:
+        name = children[0][0] if len(children) > 1 else None
+        return _invalid_block(name, children[-1], self._enabled_kinds)
+
+    def poly_file(self, children: List[Any]) -> Tuple[List[PolyObject], List[ParseMsg]]:
+        return _poly_file(children)
+
+
+@lru_cache(maxsize=None)
+def get_inline_polyfile_parser(start: str = "poly_file", 
+                               has_z_value: bool=False,
+                               msg_filter: Optional[MsgFilter]=None) -> Lark:
+    """Get the shared LALR parser of the polyfile_grammar with an embedded PolyFileTransformer.
+
+    The parser converts each rule while it is reduced, as such parsing returns the
+    same results as the PolyFileInterpreter without constructing a tree. Parsers are
+    only constructed the first time a start symbol is requested.
+
+    Args:
+        start (str, optional): The rule of the polyfile_grammar to start parsing from.
+                               Defaults to "poly_file".
+        has_z_value (bool, optional): Whether the third column of each point 
+                                      contains the z-value. Defaults to False.
+        msg_filter (Optional[MsgFilter], optional):
+            The messages created while parsing. Defaults to None, i.e. all 
+            messages are created.
+
+    Returns:
+        Lark: The parser corresponding with the start symbol.
+    """
+    return _build_polyfile_parser(start, PolyFileTransformer(has_z_value, msg_filter))
+
+
+# The patterns of the fast path only accept lines which the polyfile_grammar
+# parses without any parse messages.
+_FLOAT_PATTERN = r"[+-]?(?:[0-9]+(?:\.[0-9]*(?:[eE][+-]?[0-9]+)?|[eE][+-]?[0-9]+)|\.[0-9]+(?:[eE][+-]?[0-9]+)?)"
+_END_OF_LINE_PATTERN = r"[ \t]*\r?\n?"
+_EMPTY_LINE_PATTERN = _END_OF_LINE_PATTERN
+_POINT_LINE_PATTERN = r"[ \t]*[+-]?\.?[0-9]"
+_CLEAN_NAME_LINE_PATTERN = (r"([A-Za-z_][A-Za-z_0-9]*(?:[ \t]+[A-Za-z_][A-Za-z_0-9]*)*)" + 
+                            _END_OF_LINE_PATTERN)
+_CLEAN_DIMENSIONS_LINE_PATTERN = r"([0-9]+)[ \t]+([0-9]+)" + _END_OF_LINE_PATTERN
+# Any dimensions line with at least two columns, used to resynchronise after an invalid block.
+_PLAUSIBLE_DIMENSIONS_LINE_PATTERN = r"[ \t]*[0-9]+(?:[ \t]+[0-9]+)+" + _END_OF_LINE_PATTERN
+
+
+class _LinePatterns(NamedTuple):
+    """_LinePatterns contains the compiled line patterns for either str or bytes lines."""
+    empty_line: Pattern
+    point_line: Pattern
+    name_line: Pattern
+    dimensions_line: Pattern
+    plausible_dimensions_line: Pattern
+    comment: Union[str, bytes]
+    end_of_line: Union[str, bytes]
+
+
+@lru_cache(maxsize=None)
+def _get_line_patterns(is_bytes: bool) -> _LinePatterns:
+    def compile(pattern: str) -> Pattern:
+        return re.compile(pattern.encode("ascii") if is_bytes else pattern)
+
+    return _LinePatterns(empty_line=compile(_EMPTY_LINE_PATTERN),
+                         point_line=compile(_POINT_LINE_PATTERN),
+                         name_line=compile(_CLEAN_NAME_LINE_PATTERN),
+                         dimensions_line=compile(_CLEAN_DIMENSIONS_LINE_PATTERN),
+                         plausible_dimensions_line=compile(_PLAUSIBLE_DIMENSIONS_LINE_PATTERN),
+                         comment=b"*" if is_bytes else "*",
+                         end_of_line=b"\n" if is_bytes else "\n")
+
+
+@lru_cache(maxsize=None)
+def _clean_points_pattern(n_columns: int, is_bytes: bool=False) -> Pattern:
+    # Matches a whole points section of which every line has exactly n_columns values.
+    pattern = (r"(?:[ \t]*" + _FLOAT_PATTERN + 
+               r"(?:[ \t]+" + _FLOAT_PATTERN + r"){" + str(n_columns - 1) + "}" + 
+               r"[ \t]*\r?\n)+")
+    return re.compile(pattern.encode("ascii") if is_bytes else pattern)
+
+
+class _BlockState(Enum):
+    """_BlockState describes which part of a block is read by _split_blocks."""
+    LEADING_EMPTY_LINES = 0
+    DESCRIPTION_HEADER = 1
+    DIMENSIONS_LINE = 2
+    FIRST_POINT = 3
+    POINTS = 4
+    RECOVERY = 5
+
+
+def _split_blocks(lines: Iterable[AnyStr], 
+                  patterns: _LinePatterns) -> Iterator[Tuple[int, List[AnyStr], bool]]:
+    """Split the lines of a polyfile into chunks of which each contains at most one block.
+
+    A new block starts at the first non-empty line that is not a point, after a 
+    block has read at least one point. Empty lines following the points are kept
+    with the block, consistent with the polyfile_grammar. Leading empty lines of the
+    file are returned as a separate chunk, which is the only chunk that starts with
+    an empty line.
+
+    A block of which the line following its dimensions line is not a point cannot
+    be parsed by the polyfile_grammar. The lines of such a block are skipped up to
+    the next plausible block, i.e. a name line directly followed by a dimensions 
+    line, optionally preceded by comment lines. Each line is inspected once, such 
+    that recovering from a corrupt region takes linear time. A block which ends 
+    before its first point is invalid as well.
+
+    Args:
+        lines (Iterable[AnyStr]): The lines of the polyfile, including their end of line.
+        patterns (_LinePatterns): The line patterns matching the type of the lines.
+
+    Yields:
+        Iterator[Tuple[int, List[AnyStr], bool]]: 
+            The 1-based line number of the first line of each chunk, the lines of 
+            the chunk, and whether the chunk is known to be invalid.
+    """
+    chunk: List[AnyStr] = []
+    chunk_start = 1
+    state = _BlockState.LEADING_EMPTY_LINES
+
+    # While recovering, the comment lines and name line of a candidate block.
+    candidate: List[AnyStr] = []
+    candidate_start = 1
+
+    empty_line = patterns.empty_line
+    point_line = patterns.point_line
+    comment = patterns.comment
+
+    for line_number, line in enumerate(lines, start=1):
+        if state == _BlockState.RECOVERY:
+            if (candidate and not candidate[-1].startswith(comment) and   # type: ignore
+                patterns.plausible_dimensions_line.fullmatch(line)):
+                yield chunk_start, chunk, True
+                chunk, chunk_start = candidate + [line], candidate_start
+                candidate = []
+                state = _BlockState.FIRST_POINT
+            elif empty_line.fullmatch(line) or point_line.match(line):
+                chunk.extend(candidate)
+                chunk.append(line)
+                candidate = []
+            else:
+                # A name line has to be directly followed by its dimensions line.
+                if candidate and not candidate[-1].startswith(comment):   # type: ignore
+                    chunk.extend(candidate)
+                    candidate = []
+                if not candidate:
+                    candidate_start = line_number
+                candidate.append(line)
+            continue
+
+        if empty_line.fullmatch(line):
+            chunk.append(line)
+            continue
+
+        if state == _BlockState.LEADING_EMPTY_LINES:
+            if chunk:
+                yield chunk_start, chunk, False
+                chunk, chunk_start = [], line_number
+            state = _BlockState.DESCRIPTION_HEADER
+        elif state == _BlockState.POINTS and not point_line.match(line):
+            yield chunk_start, chunk, False
+            chunk, chunk_start = [], line_number
+            state = _BlockState.DESCRIPTION_HEADER
+        elif state == _BlockState.FIRST_POINT and not point_line.match(line):
+            # The block does not contain any points, and as such is invalid.
+            state = _BlockState.RECOVERY
+            candidate, candidate_start = [line], line_number
+            continue
+
+        if state == _BlockState.DESCRIPTION_HEADER:
+            if not line.startswith(comment):  # type: ignore
+                # The first line after the description header is the name line.
+                state = _BlockState.DIMENSIONS_LINE
+        elif state == _BlockState.DIMENSIONS_LINE:
+            state = _BlockState.FIRST_POINT
+        elif state == _BlockState.FIRST_POINT:
+            state = _BlockState.POINTS
+
+        chunk.append(line)
+
+    if state == _BlockState.RECOVERY:
+        yield chunk_start, chunk + candidate, True
+    elif chunk:
+        # A block which ends before its first point is invalid as well.
+        yield chunk_start, chunk, state not in (_BlockState.LEADING_EMPTY_LINES, _BlockState.POINTS)
+
+
+_BlockParser = Callable[[str], Tuple[PolyObject, List[ParseMsg]]]
+
+
+class _OffsetCounter(LineCounter):
+    """_OffsetCounter only tracks the offset of the lexer in the text.
+
+    The lines and columns of the lexed tokens are None, only their pos_in_stream
+    and end_pos are set. See _LineStarts to resolve these offsets.
+    """
+    __slots__ = ()
+
+    def __init__(self, newline_char: str) -> None:
+        super().__init__(newline_char)
+        self.line = None
+        self.column = None
+
+    def feed(self, token: str, test_newline: bool=True) -> None:
+        self.char_pos += len(token)
+
+
+class _OffsetLexer(Lexer):
+    """_OffsetLexer lexes with the wrapped lexer, without counting lines and columns."""
+
+    def __init__(self, lexer: Lexer) -> None:
+        self._lexer = lexer
+
+    def make_lexer_state(self, text: str) -> LexerState:
+        return LexerState(text, _OffsetCounter("\n"))
+
+    def lex(self, lexer_state: LexerState, parser_state: Any) -> Iterator[Token]:
+        return self._lexer.lex(lexer_state, parser_state)
+
+
+class _LineStarts:
+    """_LineStarts resolves character offsets in a text into 1-based lines and columns."""
+
+    def __init__(self, text: str) -> None:
+        self._starts = [0]
+        newline = text.find("\n")
+        while newline >= 0:
+            self._starts.append(newline + 1)
+            newline = text.find("\n", newline + 1)
+
+    def resolve(self, offset: int) -> Tuple[int, int]:
+        line = bisect_right(self._starts, offset)
+        return (line, offset - self._starts[line - 1] + 1)
+
+
+def _build_block_parser(has_z_value: bool, inline: bool, msg_filter: Optional[MsgFilter]) -> Lark:
+    # The block parsers are separate from the shared parsers, as their lexer only
+    # tracks offsets. Messages are located by _parse_block, only for the blocks
+    # which have messages.
+    transformer = (PolyFileTransformer(has_z_value, msg_filter) if inline else 
+                   PolyFileLiteralTransformer(msg_filter))
+    parser = _build_polyfile_parser("poly_block", transformer)
+    parser.parser.lexer = _OffsetLexer(parser.parser.lexer)
+    return parser
+
+
+@lru_cache(maxsize=None)
+def _get_block_parser(has_z_value: bool, inline: bool, msg_filter: Optional[MsgFilter]=None) -> _BlockParser:
+    parser = _build_block_parser(has_z_value, inline, msg_filter)
+    if inline:
+        return parser.parse
+
+    interpreter = PolyFileInterpreter(has_z_value, msg_filter)
+    return lambda text: interpreter.visit(parser.parse(text))
+
+
+class _StageDurations:
+    """_StageDurations accumulates the durations of the stages within parsing a block."""
+    __slots__ = ("lex", "transform", "interpret")
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self) -> None:
+        self.lex = 0.0
+        self.transform = 0.0
+        self.interpret = 0.0
+
+
+class _TimedLexer(Lexer):
+    """_TimedLexer accumulates the time spent in the wrapped lexer."""
+
+    def __init__(self, lexer: Lexer, durations: _StageDurations) -> None:
+        self._lexer = lexer
+        self._durations = durations
+
+    def make_lexer_state(self, text: str) -> LexerState:
+        return self._lexer.make_lexer_state(text)
+
+    def lex(self, lexer_state: LexerState, parser_state: Any) -> Iterator[Token]:
+        tokens = self._lexer.lex(lexer_state, parser_state)
+        durations = self._durations
+        while True:
+            start = perf_counter()
+            token = next(tokens, None)
+            durations.lex += perf_counter() - start
+            if token is None:
+                return
+            yield token
+
+
+def _timed_terminal(callback: Callable, durations: _StageDurations) -> Callable:
+    def timed_callback(token: Token) -> Any:
+        start = perf_counter()
+        result = callback(token)
+        durations.transform += perf_counter() - start
+        return result
+    return timed_callback
+
+
+def _timed_rule(callback: Callable, durations: _StageDurations) -> Callable:
+    def timed_callback(children: List[Any]) -> Any:
+        start = perf_counter()
+        result = callback(children)
+        durations.interpret += perf_counter() - start
+        return result
+    return timed_callback
+
+
+@lru_cache(maxsize=None)
+def _get_instrumented_block_parser(has_z_value: bool, 
+                                   inline: bool, 
+                                   msg_filter: Optional[MsgFilter]=None) -> Tuple[_BlockParser, _StageDurations]:
+    # A separate parser of which the lexer and callbacks are timed, such that 
+    # the shared parsers are never instrumented. The callbacks of the parser are
+    # keyed by the name of the terminal, or by the Rule for reductions.
+    durations = _StageDurations()
+    parser = _build_block_parser(has_z_value, inline, msg_filter)
+    parser.parser.lexer = _TimedLexer(parser.parser.lexer, durations)
+
+    callbacks = parser.parser.parser.parser.callbacks
+    for (key, callback) in list(callbacks.items()):
+        if isinstance(key, str):
+            callbacks[key] = _timed_terminal(callback, durations)
+        elif inline:
+            callbacks[key] = _timed_rule(callback, durations)
+
+    if inline:
+        return (parser.parse, durations)
+
+    interpreter = PolyFileInterpreter(has_z_value, msg_filter)
+
+    def parse(text: str) -> Tuple[PolyObject, List[ParseMsg]]:
+        tree = parser.parse(text)
+        start = perf_counter()
+        result = interpreter.visit(tree)
+        durations.interpret += perf_counter() - start
+        return result
+
+    return (parse, durations)
+
+
+def _invalid_chunk_msgs(chunk_start: int, n_lines: int, enabled_kinds: AbstractSet[MsgKind]) -> List[ParseMsg]:
+    if MsgKind.INVALID_BLOCK not in enabled_kinds:
+        return []
+
+    return [ParseMsg(level=ParseErrorLevel.ERROR,
+                     line=(chunk_start, chunk_start + n_lines - 1),
+                     column=(1, 1),
+                     reason="Invalid block of data will be ignored.")]
+
+
+def _unparsable_chunk_msgs(error: UnexpectedInput, 
+                           text: str,
+                           chunk_start: int, 
+                           n_lines: int, 
+                           enabled_kinds: AbstractSet[MsgKind]) -> List[ParseMsg]:
+    if MsgKind.INVALID_BLOCK not in enabled_kinds:
+        return []
+
+    # The block is reported at the offset where parsing failed. An unexpected
+    # end of the chunk does not have an offset, and is reported at its last line.
+    token = getattr(error, "token", None)
+    if isinstance(error.pos_in_stream, int) and error.pos_in_stream >= 0:
+        line_starts = _LineStarts(text)
+        (line, start_column) = line_starts.resolve(error.pos_in_stream)
+        end_column = (line_starts.resolve(token.end_pos)[1] 
+                      if token is not None and token.end_pos is not None and token.end_pos > error.pos_in_stream else 
+                      start_column)
+        line += chunk_start - 1
+        column = (start_column, end_column)
+    else:
+        line = chunk_start + n_lines - 1
+        column = (1, 1)
+
+    return [ParseMsg(level=ParseErrorLevel.ERROR,
+                     line=(line, line),
+                     column=column,
+                     reason="Invalid block of data will be ignored.")]
+
+
+def _parse_block(parse: _BlockParser,
+                 chunk_start: int, 
+                 chunk: Union[List[str], List[bytes]],
+                 enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Tuple[Optional[PolyObject], List[ParseMsg]]:
+    # Lark lexes text, as such only the chunk of a block which requires the 
+    # grammar is decoded.
+    text = (b"".join(chunk).decode("utf-8")  # type: ignore
+            if isinstance(chunk[0], bytes) else "".join(chunk))  # type: ignore
+
+    # The grammar always expects a terminating end of line.
+    if not text.endswith("\n"):
+        text += "\n"
+
+    try:
+        (poly_object, msgs) = parse(text)
+    except UnexpectedInput as e:
+        return (None, _unparsable_chunk_msgs(e, text, chunk_start, len(chunk), enabled_kinds))
+
+    if not msgs:
+        return (poly_object, msgs)
+
+    # The messages span offsets in the text, which are only resolved into lines
+    # and columns here. The chunk is parsed in isolation, as such its line 
+    # numbers are relative to the start of the chunk.
+    line_starts = _LineStarts(text)
+    line_offset = chunk_start - 1
+    for msg in msgs:
+        (start_line, start_column) = line_starts.resolve(msg.line[0])
+        (end_line, end_column) = line_starts.resolve(msg.line[1])
+        msg.line = (start_line + line_offset, end_line + line_offset)
+        msg.column = (start_column, end_column)
+
+    return (poly_object, msgs)
+
+
+def _decode(value: Union[str, bytes]) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def _scan_block(chunk_start: int, 
+                chunk: List[AnyStr], 
+                has_z_value: bool,
+                patterns: Optional[_LinePatterns]=None,
+                enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Optional[Tuple[PolyObject, List[ParseMsg]]]:
+    """Scan a well-formed block without the polyfile_grammar.
+
+    The fast path handles blocks consisting of a description header of only 
+    comments, a name line, a dimensions line and point lines with exactly the
+    specified number of columns, optionally followed by empty lines. The result
+    is identical to the result of the poly_block parser and PolyFileInterpreter.
+    Lines of bytes are scanned without decoding the point lines.
+
+    Args:
+        chunk_start (int): The 1-based line number of the first line of the chunk.
+        chunk (List[AnyStr]): The lines of the block.
+        has_z_value (bool): Whether the third column of each point contains the z-value.
+        patterns (Optional[_LinePatterns], optional): 
+            The line patterns matching the type of the lines. Defaults to the 
+            patterns of the type of the first line.
+        enabled_kinds (AbstractSet[MsgKind], optional):
+            The kinds of messages which are created. Defaults to all kinds.
+
+    Returns:
+        Optional[Tuple[PolyObject, List[ParseMsg]]]: 
+            The PolyObject and its messages, or None if the block is not well-formed
+            and should be parsed with the polyfile_grammar instead.
+    """
+    is_bytes = isinstance(chunk[0], bytes)
+    if patterns is None:
+        patterns = _get_line_patterns(is_bytes)
+
+    n_lines = len(chunk)
+    i = 0
+
+    while i < n_lines and chunk[i].startswith(patterns.comment):  # type: ignore
+        i += 1
+    description = (DescriptionHeader(content="\n".join(_decode(l[1:]).rstrip() for l in chunk[:i]))
+                   if i > 0 else None)
+
+    if i + 2 >= n_lines:
+        return None
+
+    name_match = patterns.name_line.fullmatch(chunk[i])
+    dimensions_match = patterns.dimensions_line.fullmatch(chunk[i + 1])
+    if name_match is None or dimensions_match is None:
+        return None
+
+    n_columns = int(dimensions_match.group(2))
+    if n_columns < (3 if has_z_value else 2):
+        return None
+
+    points_end = n_lines
+    while patterns.empty_line.fullmatch(chunk[points_end - 1]):
+        points_end -= 1
+
+    n_points = points_end - (i + 2)
+    if n_points <= 0:
+        return None
+
+    # The points are validated and converted as a single section. Because the
+    # section is validated, every line contributes exactly n_columns values.
+    # Only the section of the last block of a file can lack its end of line,
+    # such that at most a single block is copied to append it.
+    section = chunk[0][:0].join(chunk[i + 2:points_end])
+    if not section.endswith(patterns.end_of_line):  # type: ignore
+        section += patterns.end_of_line  # type: ignore
+    if _clean_points_pattern(n_columns, is_bytes).fullmatch(section) is None:
+        return None
+
+    values = np.array(section.split(), dtype=np.float64)
+
+    msgs: List[ParseMsg] = []
+    if points_end < n_lines and MsgKind.EMPTY_LINES in enabled_kinds:
+        msgs.append(ParseMsg(level=ParseErrorLevel.WARNING,
+                             line=(chunk_start + points_end, chunk_start + n_lines),
+                             column=(1, 1),
+                             reason="Unexpected empty lines will be ignored."))
+
+    metadata = Metadata(name=_decode(name_match.group(1)), 
+                        n_rows=int(dimensions_match.group(1)), 
+                        n_columns=n_columns)
+    return (PolyObject(description=description,
+                       metadata=metadata,
+                       values=values.reshape((n_points, n_columns)),
+                       has_z_value=has_z_value),
+            msgs)
+
+
+PolyFileSource = Union[Iterable[str], Iterable[bytes], mmap.mmap]
+
+
+def _iter_lines(handle: PolyFileSource) -> Iterator[Union[str, bytes]]:
+    if isinstance(handle, mmap.mmap):
+        # Iterating a mmap yields single bytes, the lines are read from the 
+        # current position onwards instead.
+        return iter(handle.readline, b"")
+    return iter(handle)
+
+
+class _InstrumentedStages:
+    """_InstrumentedStages times the stages of _iter_blocks and emits their spans.
+
+    Its methods replace _split_blocks, _scan_block and _parse_block, such that 
+    uninstrumented reads do not involve any timers.
+    """
+
+    def __init__(self, 
+                 instrumentation: Instrumentation,
+                 has_z_value: bool,
+                 inline: bool,
+                 msg_filter: Optional[MsgFilter]) -> None:
+        self._on_span = instrumentation.on_span
+        (self.parse, self._durations) = _get_instrumented_block_parser(has_z_value, inline, msg_filter)
+
+    def split_blocks(self, 
+                     lines: Iterable[AnyStr], 
+                     patterns: _LinePatterns) -> Iterator[Tuple[int, List[AnyStr], bool]]:
+        chunks = _split_blocks(lines, patterns)
+        while True:
+            start = perf_counter()
+            item = next(chunks, None)
+            duration = perf_counter() - start
+            if item is None:
+                return
+            self._on_span(Span(Stage.READ, duration, None, item[0]))
+            yield item
+
+    def scan_block(self, 
+                   chunk_start: int, 
+                   chunk: List[AnyStr], 
+                   has_z_value: bool,
+                   patterns: Optional[_LinePatterns]=None,
+                   enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Optional[Tuple[PolyObject, List[ParseMsg]]]:
+        start = perf_counter()
+        result = _scan_block(chunk_start, chunk, has_z_value, patterns, enabled_kinds)
+        self._on_span(Span(Stage.SCAN, perf_counter() - start, None, chunk_start))
+        return result
+
+    def parse_block(self, 
+                    parse: _BlockParser,
+                    chunk_start: int, 
+                    chunk: Union[List[str], List[bytes]],
+                    enabled_kinds: AbstractSet[MsgKind]=_ALL_MSG_KINDS) -> Tuple[Optional[PolyObject], List[ParseMsg]]:
+        durations = self._durations
+        durations.reset()
+
+        start = perf_counter()
+        result = _parse_block(parse, chunk_start, chunk, enabled_kinds)
+        total = perf_counter() - start
+
+        # The lexer and callbacks are invoked by the parser, as such the time of 
+        # the parser itself is the remainder.
+        parser_duration = total - durations.lex - durations.transform - durations.interpret
+        self._on_span(Span(Stage.LEX, durations.lex, None, chunk_start))
+        self._on_span(Span(Stage.PARSE, max(parser_duration, 0.0), None, chunk_start))
+        self._on_span(Span(Stage.TRANSFORM, durations.transform, None, chunk_start))
+        self._on_span(Span(Stage.INTERPRET, durations.interpret, None, chunk_start))
+        return result
+
+
+def _iter_blocks(handle: PolyFileSource, 
+                 has_z_value: bool,
+                 fast_path: bool,
+                 inline: bool,
+                 msg_filter: Optional[MsgFilter],
+                 instrumentation: Optional[Instrumentation]=None) -> Iterator[Tuple[Optional[PolyObject], List[ParseMsg]]]:
+    lines = _iter_lines(handle)
+    first_line = next(lines, None)
+    if first_line is None:
+        return
+
+    patterns = _get_line_patterns(isinstance(first_line, bytes))
+    enabled_kinds = _get_enabled_kinds(msg_filter)
+    pending_msgs: List[ParseMsg] = []
+
+    if instrumentation is None:
+        (split_blocks, scan_block, parse_block) = (_split_blocks, _scan_block, _parse_block)
+        parse = _get_block_parser(has_z_value, inline, msg_filter)
+    else:
+        stages = _InstrumentedStages(instrumentation, has_z_value, inline, msg_filter)
+        (split_blocks, scan_block, parse_block) = (stages.split_blocks, stages.scan_block, stages.parse_block)  # type: ignore
+        parse = stages.parse
+
+    for chunk_start, chunk, is_invalid in split_blocks(chain((first_line,), lines), patterns):  # type: ignore
+        if patterns.empty_line.fullmatch(chunk[0]):
+            if MsgKind.EMPTY_LINES not in enabled_kinds:
+                continue
+            pending_msgs.append(ParseMsg(level=ParseErrorLevel.WARNING,
+                                         line=(chunk_start, chunk_start + len(chunk)),
+                                         column=(1, 1),
+                                         reason="Unexpected empty lines will be ignored."))
+            continue
+
+        if is_invalid:
+            (poly_object, msgs) = (None, _invalid_chunk_msgs(chunk_start, len(chunk), enabled_kinds))
+        else:
+            scanned = (scan_block(chunk_start, chunk, has_z_value, patterns, enabled_kinds) 
+                       if fast_path else None)
+            (poly_object, msgs) = (scanned if scanned is not None else 
+                                   parse_block(parse, chunk_start, chunk, enabled_kinds))
+
+        if pending_msgs:
+            msgs = pending_msgs + msgs
+            pending_msgs = []
+
+        yield (poly_object, msgs)
+
+    if pending_msgs:
+        yield (None, pending_msgs)
+
+
+def _is_error(msg: ParseMsg) -> bool:
+    return msg.level.value <= ParseErrorLevel.ERROR.value
+
+
+def _check_max_errors(max_errors: Optional[int]) -> None:
+    if max_errors is not None and max_errors < 1:
+        raise ValueError(f"max_errors should be at least 1, got {max_errors}.")
+
+
+def _stop_at_threshold(blocks: Iterator[Tuple[Optional[PolyObject], List[ParseMsg]]],
+                       max_errors: Optional[int],
+                       stop_at_level: Optional[ParseErrorLevel]) -> Iterator[Tuple[Optional[PolyObject], List[ParseMsg]]]:
+    n_errors = 0
+
+    for (poly_object, msgs) in blocks:
+        for (i, msg) in enumerate(msgs):
+            if _is_error(msg):
+                n_errors += 1
+
+            if ((stop_at_level is not None and msg.level.value <= stop_at_level.value) or
+                (max_errors is not None and _is_error(msg) and n_errors >= max_errors)):
+                stop_msg = ParseMsg(level=ParseErrorLevel.INFO,
+                                    line=(msg.line[1], msg.line[1]),
+                                    column=(1, 1),
+                                    reason="Reading stopped at the error threshold, the remainder of the file is ignored.")
+                yield (poly_object, msgs[:i + 1] + [stop_msg])
+                return
+
+        yield (poly_object, msgs)
+
+
+def iter_polyfile(handle: PolyFileSource, 
+                  has_z_value: bool=False,
+                  fast_path: bool=True,
+                  inline: bool=True,
+                  max_errors: Optional[int]=None,
+                  stop_at_level: Optional[ParseErrorLevel]=None,
+                  msg_filter: Optional[MsgFilter]=None,
+                  instrumentation: Optional[Instrumentation]=None) -> Iterator[Tuple[Optional[PolyObject], List[ParseMsg]]]:
+    """Iterate over the blocks of a polyfile as they are read from the handle.
+
+    Only a single block is kept in memory at any time. Well-formed blocks are 
+    scanned directly, any other block is parsed with the shared poly_block parser.
+    By default this parser converts the block while parsing, with inline set to 
+    False a tree is constructed and visited by a PolyFileInterpreter instead. 
+    The line numbers of the messages are relative to the start of the file.
+
+    The handle can provide either text or bytes. Lines of bytes, such as those of
+    a file opened in binary mode or a mmap, are only decoded where required, i.e.
+    for comments, names and blocks which need to be parsed with the grammar.
+
+    Reading stops at the block containing the message which reaches max_errors or
+    stop_at_level. The threshold is checked once each block has been read, as 
+    such this block is always read completely. The messages of this block 
+    following it are dropped, and an INFO message stating that reading stopped
+    is added instead.
+
+    Messages suppressed by msg_filter are never constructed, and as such do not
+    count towards max_errors and stop_at_level. The message stating that reading
+    stopped is always reported.
+
+    With instrumentation set, the time spent in each stage of each block is 
+    emitted as a Span, see Stage. The instrumented stages use separate parsers,
+    without instrumentation no timers are involved.
+
+    Args:
+        handle (PolyFileSource): The opened polyfile, a mmap of the polyfile, or any 
+                                 other iterable of lines including their end of line.
+        has_z_value (bool, optional): Whether the third column of each point 
+                                      contains the z-value. Defaults to False.
+        fast_path (bool, optional): Whether well-formed blocks are scanned without 
+                                    the polyfile_grammar. Defaults to True.
+        inline (bool, optional): Whether blocks are converted while they are parsed,
+                                 instead of constructing a tree. Defaults to True.
+        max_errors (Optional[int], optional): 
+            The number of ERROR and FATAL messages after which reading stops.
+            Defaults to None, i.e. no limit.
+        stop_at_level (Optional[ParseErrorLevel], optional): 
+            Reading stops at the first message of this level or a more severe
+            level. Defaults to None, i.e. the whole file is read.
+        msg_filter (Optional[MsgFilter], optional):
+            The messages which are reported. Defaults to None, i.e. all messages
+            are reported.
+        instrumentation (Optional[Instrumentation], optional):
+            The instrumentation receiving the spans of each block. Defaults to 
+            None, i.e. reading is not instrumented.
+
+    Yields:
+        Iterator[Tuple[Optional[PolyObject], List[ParseMsg]]]: 
+            The PolyObject of each block together with its parse messages. Invalid
+            blocks yield None together with a message, which spans the skipped 
+            lines of a block without points, or is located where parsing failed.
+
+    Raises:
+        ValueError: Thrown when max_errors is less than 1.
+    """
+    _check_max_errors(max_errors)
+
+    blocks = _iter_blocks(handle, has_z_value, fast_path, inline, msg_filter, instrumentation)
+
+    if max_errors is None and stop_at_level is None:
+        return blocks
+    return _stop_at_threshold(blocks, max_errors, stop_at_level)
+
+
+class _SourceInstrumentation(Instrumentation):
+    """_SourceInstrumentation sets the source of the spans of the wrapped instrumentation."""
+
+    def __init__(self, instrumentation: Instrumentation, source: str) -> None:
+        self._instrumentation = instrumentation
+        self._source = source
+
+    def on_span(self, span: Span) -> None:
+        self._instrumentation.on_span(span._replace(source=self._source))
+
+
+def read_polyfile(path: Union[str, Path], 
+                  has_z_value: bool=False, 
+                  fast_path: bool=True,
+                  inline: bool=True,
+                  memory_map: bool=False,
+                  max_errors: Optional[int]=None,
+                  stop_at_level: Optional[ParseErrorLevel]=None,
+                  msg_filter: Optional[MsgFilter]=None,
+                  instrumentation: Optional[Instrumentation]=None) -> Tuple[List[PolyObject], List[ParseMsg]]:
+    """Read the polyfile at the given path.
+
+    The file is read block by block with iter_polyfile, such that neither the 
+    whole text nor its parse tree is kept in memory. With memory_map set, the 
+    file is mapped into memory and its lines are read as bytes, which avoids
+    decoding the point lines. Reading stops early once max_errors or 
+    stop_at_level is reached, as described by iter_polyfile. Messages suppressed
+    by msg_filter are never constructed. With instrumentation set, the spans of 
+    the blocks and a FILE span of the whole read are emitted with the path as 
+    their source.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        has_z_value (bool, optional): Whether the third column of each point 
+                                      contains the z-value. Defaults to False.
+        fast_path (bool, optional): Whether well-formed blocks are scanned without 
+                                    the polyfile_grammar. Defaults to True.
+        inline (bool, optional): Whether blocks are converted while they are parsed,
+                                 instead of constructing a tree. Defaults to True.
+        memory_map (bool, optional): Whether the file is read through a mmap.
+                                     Defaults to False.
+        max_errors (Optional[int], optional): 
+            The number of ERROR and FATAL messages after which reading stops.
+            Defaults to None, i.e. no limit.
+        stop_at_level (Optional[ParseErrorLevel], optional): 
+            Reading stops at the first message of this level or a more severe
+            level. Defaults to None, i.e. the whole file is read.
+        msg_filter (Optional[MsgFilter], optional):
+            The messages which are reported. Defaults to None, i.e. all messages
+            are reported.
+        instrumentation (Optional[Instrumentation], optional):
+            The instrumentation receiving the spans of the file and its blocks.
+            Defaults to None, i.e. reading is not instrumented.
+
+    Returns:
+        Tuple[List[PolyObject], List[ParseMsg]]: 
+            The PolyObjects of the valid blocks and all parse messages in order
+            of occurrence.
+
+    Raises:
+        ValueError: Thrown when max_errors is less than 1.
+    """
+    msgs: List[ParseMsg] = []
+    objects = _read_polyfile_into(msgs, path, has_z_value, fast_path, inline, memory_map,
+                                  max_errors, stop_at_level, msg_filter, instrumentation)
+    return (objects, msgs)
+
+
+def _read_polyfile_into(msgs: Union[List[ParseMsg], "ParseMsgStore"],
+                        path: Union[str, Path], 
+                        has_z_value: bool, 
+                        fast_path: bool,
+                        inline: bool,
+                        memory_map: bool,
+                        max_errors: Optional[int],
+                        stop_at_level: Optional[ParseErrorLevel],
+                        msg_filter: Optional[MsgFilter],
+                        instrumentation: Optional[Instrumentation]) -> List[PolyObject]:
+    # The messages of each block are added to msgs as soon as it is read, see
+    # read_polyfile for the arguments.
+    _check_max_errors(max_errors)
+
+    start = perf_counter()
+    block_instrumentation = (_SourceInstrumentation(instrumentation, str(path)) 
+                             if instrumentation is not None else None)
+    objects: List[PolyObject] = []
+
+    def collect(handle: PolyFileSource) -> None:
+        for (poly_object, block_msgs) in iter_polyfile(handle, has_z_value, fast_path, inline, 
+                                                       max_errors, stop_at_level, msg_filter,
+                                                       block_instrumentation):
+            if poly_object is not None:
+                objects.append(poly_object)
+            msgs.extend(block_msgs)
+
+    if memory_map:
+        with open(path, "rb") as f:
+            # Empty files cannot be mapped, and do not contain any blocks.
+            if os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    collect(mapped)
+    else:
+        # Lines are only split on "\n", as the lines of the memory map are.
+        with open(path, "r", encoding="utf-8", newline="\n") as f:
+            collect(f)
+
+    if instrumentation is not None:
+        instrumentation.on_span(Span(Stage.FILE, perf_counter() - start, str(path), None))
+    return objects
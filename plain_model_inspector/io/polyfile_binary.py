@@ -0,0 +1,255 @@
+"""Binary format for parsed polyfiles.
+
+A binary polyfile consists of:
+
+* a fixed header: the magic bytes, the format version and the size of the
+  block header, packed as "<8sIQ".
+* the block header: a utf-8 encoded JSON object containing the description,
+  name, dimensions and shape of the values of every block.
+* padding up to a multiple of DATA_ALIGNMENT bytes.
+* the values of all blocks as contiguous little-endian float64 values.
+
+Because the values are stored contiguously, they can be loaded as views on a
+mmap of the file without copying them.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from plain_model_inspector.io.polyfile import DescriptionHeader, Metadata, PolyObject
+
+
+BINARY_MAGIC = b"PMIPOLY\x00"
+BINARY_FORMAT_VERSION = 1
+DATA_ALIGNMENT = 64
+SIDECAR_SUFFIX = ".pmib"
+
+_FIXED_HEADER = struct.Struct("<8sIQ")
+_VALUE_DTYPE = np.dtype("<f8")
+
+
+class BinaryFormatError(ValueError):
+    """BinaryFormatError is raised when a file is not a supported binary polyfile."""
+
+
+def _block_header(objects: Sequence[PolyObject],
+                  source: Optional[Dict[str, int]]) -> Dict[str, Any]:
+    return dict(
+        source=source,
+        descriptions=[o.description.content if o.description is not None else None for o in objects],
+        names=[o.metadata.name for o in objects],
+        n_rows=[o.metadata.n_rows for o in objects],
+        n_columns=[o.metadata.n_columns for o in objects],
+        has_z_value=[o.has_z_value for o in objects],
+        shapes=[list(o.values.shape) for o in objects],
+    )
+
+
+def _write(path: Path, objects: Sequence[PolyObject], source: Optional[Dict[str, int]]) -> None:
+    header = json.dumps(_block_header(objects, source)).encode("utf-8")
+    header_end = _FIXED_HEADER.size + len(header)
+    padding = -header_end % DATA_ALIGNMENT
+
+    # Readers should never observe a partially written file.
+    (fd, tmp_path) = tempfile.mkstemp(dir=path.parent, prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_FIXED_HEADER.pack(BINARY_MAGIC, BINARY_FORMAT_VERSION, len(header)))
+            f.write(header)
+            f.write(b"\x00" * padding)
+            for o in objects:
+                f.write(np.ascontiguousarray(o.values, dtype=_VALUE_DTYPE).data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def write_polyfile_binary(path: Union[str, Path], objects: Sequence[PolyObject]) -> None:
+    """Write the PolyObjects to the binary polyfile at the given path.
+
+    Args:
+        path (Union[str, Path]): The path of the binary polyfile.
+        objects (Sequence[PolyObject]): The PolyObjects to write.
+    """
+    _write(Path(path), objects, source=None)
+
+
+def _read(path: Path, memory_map: bool) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        # Empty files cannot be mapped, and are too small to be a binary polyfile.
+        if os.fstat(f.fileno()).st_size < _FIXED_HEADER.size:
+            raise BinaryFormatError(f"{path} is not a binary polyfile.")
+
+        if memory_map:
+            buffer: Union[bytes, mmap.mmap] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buffer = f.read()
+
+    try:
+        return _read_header(path, buffer)
+    except BaseException:
+        # The mmap is only kept open for the values of a valid file.
+        if isinstance(buffer, mmap.mmap):
+            buffer.close()
+        raise
+
+
+def _read_header(path: Path, buffer: Union[bytes, mmap.mmap]) -> Dict[str, Any]:
+    if len(buffer) < _FIXED_HEADER.size:
+        raise BinaryFormatError(f"{path} is not a binary polyfile.")
+
+    (magic, version, header_size) = _FIXED_HEADER.unpack_from(buffer)
+    if magic != BINARY_MAGIC:
+        raise BinaryFormatError(f"{path} is not a binary polyfile.")
+    if version != BINARY_FORMAT_VERSION:
+        raise BinaryFormatError(f"{path} has unsupported format version {version}, "
+                                f"expected {BINARY_FORMAT_VERSION}.")
+
+    header_end = _FIXED_HEADER.size + header_size
+    if header_end > len(buffer):
+        raise BinaryFormatError(f"{path} is truncated within its block header.")
+
+    try:
+        header = json.loads(buffer[_FIXED_HEADER.size:header_end])
+        shapes = [(int(n_rows), int(n_columns)) for (n_rows, n_columns) in header["shapes"]]
+        n_blocks = [len(header[key]) for key in ("descriptions", "names", "n_rows", "n_columns", "has_z_value")]
+    except (ValueError, TypeError, KeyError) as e:
+        raise BinaryFormatError(f"{path} has an invalid block header.") from e
+
+    # Every block should have each of its fields.
+    if any(n != len(shapes) for n in n_blocks):
+        raise BinaryFormatError(f"{path} has an invalid block header.")
+
+    header["data_offset"] = header_end + (-header_end % DATA_ALIGNMENT)
+    header["buffer"] = buffer
+
+    # Every block should lie within the file.
+    block_end = header["data_offset"]
+    for (n_rows, n_columns) in shapes:
+        if n_rows < 0 or n_columns < 0:
+            raise BinaryFormatError(f"{path} has an invalid block header.")
+        block_end += n_rows * n_columns * _VALUE_DTYPE.itemsize
+        if block_end > len(buffer):
+            raise BinaryFormatError(f"{path} is truncated within its values.")
+
+    return header
+
+
+def _objects(header: Dict[str, Any]) -> List[PolyObject]:
+    shapes = header["shapes"]
+    sizes = [n_rows * n_columns for (n_rows, n_columns) in shapes]
+
+    values = np.frombuffer(header["buffer"],
+                           dtype=_VALUE_DTYPE,
+                           count=sum(sizes),
+                           offset=header["data_offset"])
+    if values.dtype != np.float64:
+        # Big-endian platforms require a copy in the native byte order.
+        values = values.astype(np.float64)
+
+    objects: List[PolyObject] = []
+    start = 0
+
+    # The content was validated when it was written, as such the models are
+    # constructed without validating them again.
+    for (description, name, n_rows, n_columns, has_z_value, shape, size) in zip(
+            header["descriptions"], header["names"], header["n_rows"], header["n_columns"],
+            header["has_z_value"], shapes, sizes):
+        objects.append(PolyObject.construct(
+            description=DescriptionHeader.construct(content=description) if description is not None else None,
+            metadata=Metadata.construct(name=name, n_rows=n_rows, n_columns=n_columns),
+            values=values[start:start + size].reshape(shape),
+            has_z_value=has_z_value))
+        start += size
+
+    return objects
+
+
+def read_polyfile_binary(path: Union[str, Path], memory_map: bool=True) -> List[PolyObject]:
+    """Read the PolyObjects from the binary polyfile at the given path.
+
+    With memory_map set, the values of the PolyObjects are read-only views on
+    a mmap of the file, which are only read from disk once they are accessed.
+
+    Args:
+        path (Union[str, Path]): The path of the binary polyfile.
+        memory_map (bool, optional): Whether the file is mapped into memory instead
+                                     of read. Defaults to True.
+
+    Raises:
+        BinaryFormatError: Thrown when the file is not a binary polyfile of the
+                           current BINARY_FORMAT_VERSION, or is truncated.
+
+    Returns:
+        List[PolyObject]: The PolyObjects in the order in which they were written.
+    """
+    return _objects(_read(Path(path), memory_map))
+
+
+def get_sidecar_path(path: Union[str, Path]) -> Path:
+    """Get the path of the binary sidecar of the polyfile at the given path.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+
+    Returns:
+        Path: The path of the sidecar, i.e. the path with SIDECAR_SUFFIX appended.
+    """
+    path = Path(path)
+    return path.with_name(path.name + SIDECAR_SUFFIX)
+
+
+def _source_stat(path: Path) -> Dict[str, int]:
+    stat = path.stat()
+    return dict(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def write_sidecar(path: Union[str, Path], objects: Sequence[PolyObject]) -> Path:
+    """Write the PolyObjects read from the polyfile at the given path to its sidecar.
+
+    The size and modification time of the polyfile are recorded, such that a
+    sidecar of an outdated polyfile is not used by read_sidecar.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        objects (Sequence[PolyObject]): The PolyObjects read from the polyfile.
+
+    Returns:
+        Path: The path of the written sidecar.
+    """
+    sidecar_path = get_sidecar_path(path)
+    _write(sidecar_path, objects, source=_source_stat(Path(path)))
+    return sidecar_path
+
+
+def read_sidecar(path: Union[str, Path], memory_map: bool=True) -> Optional[List[PolyObject]]:
+    """Read the PolyObjects of the polyfile at the given path from its sidecar.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        memory_map (bool, optional): Whether the sidecar is mapped into memory
+                                     instead of read. Defaults to True.
+
+    Returns:
+        Optional[List[PolyObject]]:
+            The PolyObjects, or None if the sidecar does not exist, is written
+            with a different format version, is truncated, or the polyfile 
+            changed since.
+    """
+    path = Path(path)
+
+    try:
+        header = _read(get_sidecar_path(path), memory_map)
+        if header["source"] != _source_stat(path):
+            return None
+    except (OSError, BinaryFormatError):
+        return None
+
+    return _objects(header)
@@ -0,0 +1,246 @@
+import json
+import os
+import pickle
+import tempfile
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from pydantic import VERSION as pydantic_version
+
+from plain_model_inspector import __version__
+from plain_model_inspector.cache import get_cache_dir
+from plain_model_inspector.io.polyfile import PolyObject, polyfile_grammar_hash
+from plain_model_inspector.io.polyfile_msgs import ParseMsgStore, read_polyfile_to_store
+
+
+# Increment when the layout of the cached results changes.
+CACHE_FORMAT_VERSION = 2
+DEFAULT_MAX_SIZE = 1024 * 1024 * 1024
+
+_HASH_BLOCK_SIZE = 1024 * 1024
+
+PolyFileResult = Tuple[List[PolyObject], ParseMsgStore]
+
+
+def _hash_content(path: Path) -> str:
+    content_hash = sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(_HASH_BLOCK_SIZE), b""):
+            content_hash.update(block)
+    return content_hash.hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    # Concurrent readers should never observe a partially written file.
+    (fd, tmp_path) = tempfile.mkstemp(dir=path.parent, prefix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+class PolyFileCache:
+    """PolyFileCache persists the results of read_polyfile on disk.
+
+    Results are keyed by the hash of the file content, the polyfile_grammar,
+    the versions of the package, pydantic and numpy, and whether the points 
+    contain a z-value. Hashing the content is avoided as long as the modification
+    time and size of the file match those recorded when it was last hashed. 
+    Results which cannot be loaded are treated as missing and removed.
+
+    The least recently used results are evicted once their total size exceeds
+    max_size, together with the records of the files that were not used since.
+    The size of the results is only scanned once per PolyFileCache, afterwards
+    its own writes are tracked.
+    """
+
+    def __init__(self, cache_dir: Path, max_size: int=DEFAULT_MAX_SIZE):
+        """Create a new PolyFileCache.
+
+        Args:
+            cache_dir (Path): The directory in which the results are stored.
+            max_size (int, optional): The maximum total size in bytes of the cached
+                                      results. Defaults to DEFAULT_MAX_SIZE.
+        """
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+
+        self._stat_dir = cache_dir / "stat"
+        self._result_dir = cache_dir / "results"
+        self._stat_dir.mkdir(parents=True, exist_ok=True)
+        self._result_dir.mkdir(parents=True, exist_ok=True)
+
+        self._version_key = (f"{CACHE_FORMAT_VERSION}:{__version__}:{pydantic_version}:{np.__version__}:"
+                             f"{polyfile_grammar_hash}")
+        # The total size of the results, None until it has been scanned.
+        self._size: Optional[int] = None
+
+    @classmethod
+    def default(cls, max_size: int=DEFAULT_MAX_SIZE) -> Optional["PolyFileCache"]:
+        """Create the PolyFileCache in the directory given by get_cache_dir.
+
+        Args:
+            max_size (int, optional): The maximum total size in bytes of the cached
+                                      results. Defaults to DEFAULT_MAX_SIZE.
+
+        Returns:
+            Optional[PolyFileCache]: The cache, or None if on-disk caching is disabled.
+        """
+        cache_dir = get_cache_dir()
+        return cls(cache_dir / "polyfile-results", max_size) if cache_dir is not None else None
+
+    def _stat_path(self, path: Path) -> Path:
+        return self._stat_dir / (sha256(str(path.resolve()).encode("utf-8")).hexdigest() + ".json")
+
+    def _content_hash(self, path: Path) -> str:
+        stat = path.stat()
+        stat_path = self._stat_path(path)
+
+        try:
+            record = json.loads(stat_path.read_text())
+            if record["mtime_ns"] == stat.st_mtime_ns and record["size"] == stat.st_size:
+                # The modification time of a record records its last use.
+                os.utime(stat_path)
+                return record["content_hash"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+        content_hash = _hash_content(path)
+        record = dict(mtime_ns=stat.st_mtime_ns, size=stat.st_size, content_hash=content_hash)
+        _write_atomic(stat_path, json.dumps(record).encode("utf-8"))
+        return content_hash
+
+    def _result_path(self, path: Path, has_z_value: bool) -> Path:
+        key = f"{self._version_key}:{has_z_value}:{self._content_hash(path)}"
+        return self._result_dir / (sha256(key.encode("utf-8")).hexdigest() + ".pickle")
+
+    def get(self, path: Union[str, Path], has_z_value: bool=False) -> Optional[PolyFileResult]:
+        """Get the cached result of reading the polyfile at the given path.
+
+        Args:
+            path (Union[str, Path]): Path to the .pli(z) or .pol file.
+            has_z_value (bool, optional): Whether the third column of each point
+                                          contains the z-value. Defaults to False.
+
+        Returns:
+            Optional[PolyFileResult]: The cached result, or None if it is not cached.
+        """
+        try:
+            result_path = self._result_path(Path(path), has_z_value)
+            data = result_path.read_bytes()
+            # The modification time of a result records its last use.
+            os.utime(result_path)
+        except OSError:
+            return None
+
+        try:
+            return pickle.loads(data)
+        except Exception:
+            # A truncated result, or a result of which the classes changed.
+            _unlink(result_path)
+            return None
+
+    def put(self, path: Union[str, Path], result: PolyFileResult, has_z_value: bool=False) -> None:
+        """Store the result of reading the polyfile at the given path.
+
+        Args:
+            path (Union[str, Path]): Path to the .pli(z) or .pol file.
+            result (PolyFileResult): The result of read_polyfile_to_store.
+            has_z_value (bool, optional): Whether the third column of each point
+                                          contains the z-value. Defaults to False.
+        """
+        data = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_size:
+            return
+
+        # Failing to cache a result should not fail reading the polyfile.
+        try:
+            _write_atomic(self._result_path(Path(path), has_z_value), data)
+        except OSError:
+            return
+
+        if self._size is None:
+            self._size = sum(size for (_, size, _) in _list_entries(self._result_dir.glob("*.pickle")))
+        else:
+            self._size += len(data)
+
+        if self._size > self.max_size:
+            self.evict()
+
+    def evict(self) -> None:
+        """Remove the least recently used results until the cache fits in max_size.
+
+        The records of files which were not used since the most recently used 
+        evicted result are removed as well.
+        """
+        entries = _list_entries(self._result_dir.glob("*.pickle"))
+        total_size = sum(size for (_, size, _) in entries)
+        evicted_mtime_ns = None
+
+        for (mtime_ns, size, result_path) in sorted(entries, key=lambda entry: entry[0]):
+            if total_size <= self.max_size:
+                break
+            _unlink(result_path)
+            total_size -= size
+            evicted_mtime_ns = mtime_ns
+
+        self._size = total_size
+
+        if evicted_mtime_ns is not None:
+            for (mtime_ns, _, stat_path) in _list_entries(self._stat_dir.glob("*.json")):
+                if mtime_ns <= evicted_mtime_ns:
+                    _unlink(stat_path)
+
+
+def _list_entries(paths: Iterable[Path]) -> List[Tuple[int, int, Path]]:
+    entries = []
+    for path in paths:
+        try:
+            stat = path.stat()
+        except OSError:
+            # The entry was evicted concurrently.
+            continue
+        entries.append((stat.st_mtime_ns, stat.st_size, path))
+    return entries
+
+
+def _unlink(path: Path) -> None:
+    try:
+        path.unlink()
+    except OSError:
+        # The entry was evicted concurrently.
+        pass
+
+
+def read_polyfile_cached(path: Union[str, Path],
+                         has_z_value: bool=False,
+                         cache: Optional[PolyFileCache]=None) -> PolyFileResult:
+    """Read the polyfile at the given path, reusing the result of a previous read.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        has_z_value (bool, optional): Whether the third column of each point
+                                      contains the z-value. Defaults to False.
+        cache (Optional[PolyFileCache], optional):
+            The cache to use. Defaults to PolyFileCache.default().
+
+    Returns:
+        PolyFileResult: The PolyObjects of the valid blocks and all parse messages
+                        in order of occurrence, stored in a ParseMsgStore.
+    """
+    if cache is None:
+        cache = PolyFileCache.default()
+        if cache is None:
+            return read_polyfile_to_store(path, has_z_value, memory_map=True)
+
+    result = cache.get(path, has_z_value)
+    if result is None:
+        result = read_polyfile_to_store(path, has_z_value, memory_map=True)
+        cache.put(path, result, has_z_value)
+
+    return result
@@ -0,0 +1,122 @@
+import mmap
+import os
+from pathlib import Path
+from pydantic import BaseModel
+from typing import Iterator, List, Optional, Tuple, Union
+
+from plain_model_inspector.io.polyfile import (
+    _ALL_MSG_KINDS,
+    DescriptionHeader,
+    Metadata,
+    ParseMsg,
+    PolyObject,
+    _LinePatterns,
+    _get_block_parser,
+    _get_line_patterns,
+    _invalid_chunk_msgs,
+    _parse_block,
+    _scan_block,
+    _split_blocks,
+)
+
+
+class BlockHeader(BaseModel):
+    """BlockHeader describes the location and metadata of a single block of a polyfile.
+
+    The offsets are byte offsets in the file. The points of the block are located
+    in [points_offset, end_offset), which includes any empty lines following them.
+    """
+    description: Optional[DescriptionHeader]
+    metadata: Metadata
+    line: int
+    offset: int
+    points_line: int
+    points_offset: int
+    end_offset: int
+
+
+def _block_header(chunk_start: int, 
+                  chunk: List[bytes], 
+                  offset: int, 
+                  end_offset: int,
+                  poly_object: PolyObject,
+                  patterns: _LinePatterns) -> BlockHeader:
+    # The points follow the name line and dimensions line, which both may be
+    # preceded by empty lines. The lines before the name line are the comments
+    # and empty lines of the description header.
+    points_index = 0
+    n_metadata_lines = 0
+    while n_metadata_lines < 2:
+        line = chunk[points_index]
+        if (not patterns.empty_line.fullmatch(line) and 
+            (n_metadata_lines > 0 or not line.startswith(patterns.comment))):  # type: ignore
+            n_metadata_lines += 1
+        points_index += 1
+
+    return BlockHeader(description=poly_object.description,
+                       metadata=poly_object.metadata,
+                       line=chunk_start,
+                       offset=offset,
+                       points_line=chunk_start + points_index,
+                       points_offset=offset + sum(map(len, chunk[:points_index])),
+                       end_offset=end_offset)
+
+
+def _iter_block_headers(mapped: mmap.mmap) -> Iterator[Union[BlockHeader, ParseMsg]]:
+    # The blocks are split, validated and recovered from exactly as by 
+    # read_polyfile, see _iter_blocks.
+    patterns = _get_line_patterns(is_bytes=True)
+    parse = _get_block_parser(has_z_value=False, inline=True)
+    offset = 0
+
+    for (chunk_start, chunk, is_invalid) in _split_blocks(iter(mapped.readline, b""), patterns):
+        chunk_offset = offset
+        offset += sum(map(len, chunk))
+
+        if patterns.empty_line.fullmatch(chunk[0]):
+            continue
+
+        if is_invalid:
+            yield from _invalid_chunk_msgs(chunk_start, len(chunk), _ALL_MSG_KINDS)
+            continue
+
+        scanned = _scan_block(chunk_start, chunk, False, patterns)
+        (poly_object, msgs) = scanned if scanned is not None else _parse_block(parse, chunk_start, chunk)
+        if poly_object is None:
+            yield from msgs
+        else:
+            yield _block_header(chunk_start, chunk, chunk_offset, offset, poly_object, patterns)
+
+
+def scan_polyfile_headers(path: Union[str, Path]) -> Tuple[List[BlockHeader], List[ParseMsg]]:
+    """Scan the headers of the blocks of the polyfile at the given path.
+
+    The blocks are split and validated as by read_polyfile, such that the same 
+    blocks are found and skipped. Only the description header, metadata and 
+    location of each block are kept, the messages of the valid blocks are not
+    reported.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+
+    Returns:
+        Tuple[List[BlockHeader], List[ParseMsg]]:
+            The headers of the blocks and the messages describing skipped blocks,
+            in order of occurrence. Line numbers are 1-based.
+    """
+    headers: List[BlockHeader] = []
+    msgs: List[ParseMsg] = []
+
+    with open(path, "rb") as f:
+        # Empty files cannot be mapped, and do not contain any blocks.
+        if os.fstat(f.fileno()).st_size == 0:
+            return (headers, msgs)
+
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for result in _iter_block_headers(mapped):
+                if isinstance(result, BlockHeader):
+                    headers.append(result)
+                else:
+                    msgs.append(result)
+
+    return (headers, msgs)
@@ -0,0 +1,277 @@
+import io
+from pathlib import Path
+from pydantic import BaseModel, PrivateAttr
+from typing import Dict, List, Optional, Tuple, Union
+
+from plain_model_inspector.io.polyfile import ParseMsg, PolyObject, iter_polyfile
+from plain_model_inspector.io.polyfile_cache import _write_atomic
+from plain_model_inspector.io.polyfile_headers import scan_polyfile_headers
+
+
+# Increment when the layout of the persisted index, or the scan it is built
+# with, changes.
+INDEX_FORMAT_VERSION = 2
+INDEX_SUFFIX = ".pmidx"
+
+
+class IndexMismatchError(ValueError):
+    """IndexMismatchError is raised when the data at an index entry is not the indexed block."""
+
+
+class BlockIndexEntry(BaseModel):
+    """BlockIndexEntry describes the location of a single block of a polyfile."""
+    name: str
+    offset: int
+    end_offset: int
+    line: int
+    n_rows: int
+    n_columns: int
+
+
+class BlockIndex(BaseModel):
+    """BlockIndex maps the names of the blocks of a polyfile to their location.
+
+    The entries are stored column-wise in order of occurrence, such that blocks
+    sharing a name are all recorded.
+    """
+    version: int = INDEX_FORMAT_VERSION
+    source_size: int
+    source_mtime_ns: int
+    names: List[str]
+    offsets: List[int]
+    end_offsets: List[int]
+    lines: List[int]
+    n_rows: List[int]
+    n_columns: List[int]
+
+    # The mapping is derived from the names, as such it is not persisted.
+    _name_positions: Optional[Dict[str, List[int]]] = PrivateAttr(default=None)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _positions(self) -> Dict[str, List[int]]:
+        if self._name_positions is None:
+            self._name_positions = {}
+            for (i, name) in enumerate(self.names):
+                self._name_positions.setdefault(name, []).append(i)
+        return self._name_positions
+
+    def entry(self, i: int) -> BlockIndexEntry:
+        """Get the i-th entry of the index.
+
+        Args:
+            i (int): The position of the block in the polyfile.
+
+        Returns:
+            BlockIndexEntry: The location of the block.
+        """
+        return BlockIndexEntry(name=self.names[i],
+                               offset=self.offsets[i],
+                               end_offset=self.end_offsets[i],
+                               line=self.lines[i],
+                               n_rows=self.n_rows[i],
+                               n_columns=self.n_columns[i])
+
+    def find(self, name: str) -> List[BlockIndexEntry]:
+        """Find all blocks with the given name.
+
+        Args:
+            name (str): The name of the blocks.
+
+        Returns:
+            List[BlockIndexEntry]: The locations of the blocks in order of occurrence.
+        """
+        return [self.entry(i) for i in self._positions().get(name, [])]
+
+    def duplicate_names(self) -> List[str]:
+        """Get the names shared by multiple blocks.
+
+        Returns:
+            List[str]: The duplicate names in order of first occurrence.
+        """
+        return [name for (name, positions) in self._positions().items() if len(positions) > 1]
+
+
+def get_index_path(path: Union[str, Path]) -> Path:
+    """Get the path at which the BlockIndex of the polyfile at the given path is persisted.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+
+    Returns:
+        Path: The path of the index, i.e. the path with INDEX_SUFFIX appended.
+    """
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def build_block_index(path: Union[str, Path]) -> BlockIndex:
+    """Build the BlockIndex of the polyfile at the given path.
+
+    The index is built with scan_polyfile_headers, as such the blocks are the
+    valid blocks of read_polyfile. Invalid blocks are not indexed.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+
+    Returns:
+        BlockIndex: The index of the blocks of the polyfile.
+    """
+    stat = Path(path).stat()
+    (headers, _) = scan_polyfile_headers(path)
+
+    return BlockIndex(source_size=stat.st_size,
+                      source_mtime_ns=stat.st_mtime_ns,
+                      names=[h.metadata.name for h in headers],
+                      offsets=[h.offset for h in headers],
+                      end_offsets=[h.end_offset for h in headers],
+                      lines=[h.line for h in headers],
+                      n_rows=[h.metadata.n_rows for h in headers],
+                      n_columns=[h.metadata.n_columns for h in headers])
+
+
+def load_block_index(path: Union[str, Path], persist: bool=True) -> BlockIndex:
+    """Load the BlockIndex of the polyfile at the given path.
+
+    The persisted index is used as long as the polyfile did not change since
+    it was built. Otherwise the index is built and, if persist is set, written
+    next to the polyfile. Failing to write the index is not an error.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        persist (bool, optional): Whether a newly built index is written next to
+                                  the polyfile. Defaults to True.
+
+    Returns:
+        BlockIndex: The index of the blocks of the polyfile.
+    """
+    index_path = get_index_path(path)
+    stat = Path(path).stat()
+
+    try:
+        index = BlockIndex.parse_raw(index_path.read_bytes())
+        if (index.version == INDEX_FORMAT_VERSION and
+            index.source_size == stat.st_size and
+            index.source_mtime_ns == stat.st_mtime_ns):
+            return index
+    except (OSError, ValueError):
+        pass
+
+    index = build_block_index(path)
+    if persist:
+        try:
+            _write_atomic(index_path, index.json().encode("utf-8"))
+        except OSError:
+            pass
+
+    return index
+
+
+def read_block(path: Union[str, Path],
+               entry: BlockIndexEntry,
+               has_z_value: bool=False) -> Tuple[Optional[PolyObject], List[ParseMsg]]:
+    """Read the single block at the location described by the entry.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        entry (BlockIndexEntry): The location of the block.
+        has_z_value (bool, optional): Whether the third column of each point
+                                      contains the z-value. Defaults to False.
+
+    Raises:
+        IndexMismatchError: Thrown when the data at the entry is not exactly the
+                            block described by the entry, e.g. because the file
+                            changed since the index was built.
+
+    Returns:
+        Tuple[Optional[PolyObject], List[ParseMsg]]:
+            The PolyObject, or None if the block is invalid, and its parse messages
+            with line numbers relative to the start of the file.
+    """
+    with open(path, "rb") as f:
+        f.seek(entry.offset)
+        data = f.read(entry.end_offset - entry.offset)
+
+    blocks = list(iter_polyfile(io.BytesIO(data), has_z_value))
+    if (len(blocks) != 1 or 
+        (blocks[0][0] is not None and blocks[0][0].metadata.name != entry.name)):
+        raise IndexMismatchError(f"The data at line {entry.line} of {path} is not the block {entry.name!r}.")
+
+    (poly_object, msgs) = blocks[0]
+
+    line_offset = entry.line - 1
+    for msg in msgs:
+        msg.line = (msg.line[0] + line_offset, msg.line[1] + line_offset)
+
+    return (poly_object, msgs)
+
+
+def get_block(path: Union[str, Path],
+              name: str,
+              has_z_value: bool=False,
+              occurrence: Optional[int]=None,
+              index: Optional[BlockIndex]=None) -> Tuple[Optional[PolyObject], List[ParseMsg]]:
+    """Read the block with the given name from the polyfile at the given path.
+
+    Only the requested block is read and parsed, its location is obtained from
+    the BlockIndex of the polyfile. If the data at this location is not the
+    requested block, the whole polyfile is read instead.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        name (str): The name of the block.
+        has_z_value (bool, optional): Whether the third column of each point
+                                      contains the z-value. Defaults to False.
+        occurrence (Optional[int], optional):
+            The 0-based occurrence of the block if multiple blocks share the name.
+            Defaults to None, which requires the name to be unique.
+        index (Optional[BlockIndex], optional):
+            The index of the polyfile. Defaults to load_block_index(path).
+
+    Raises:
+        KeyError: Thrown when no block, or not the requested occurrence, has the name.
+        ValueError: Thrown when multiple blocks share the name and no occurrence
+                    is specified.
+
+    Returns:
+        Tuple[Optional[PolyObject], List[ParseMsg]]:
+            The PolyObject, or None if the block is invalid, and its parse messages
+            with line numbers relative to the start of the file.
+    """
+    if index is None:
+        index = load_block_index(path)
+
+    entries = index.find(name)
+
+    if occurrence is None:
+        if len(entries) > 1:
+            lines = ", ".join(str(entry.line) for entry in entries)
+            raise ValueError(f"Multiple blocks are named {name!r}, at lines {lines}.")
+        occurrence = 0
+
+    if occurrence >= len(entries):
+        raise KeyError(name)
+
+    try:
+        return read_block(path, entries[occurrence], has_z_value)
+    except IndexMismatchError:
+        return _read_block_fully(path, name, occurrence, has_z_value)
+
+
+def _read_block_fully(path: Union[str, Path],
+                      name: str,
+                      occurrence: int,
+                      has_z_value: bool) -> Tuple[Optional[PolyObject], List[ParseMsg]]:
+    # The index does not describe the file, as such the whole file is read and
+    # only the requested block is kept.
+    n_found = 0
+    with open(path, "rb") as f:
+        for (poly_object, msgs) in iter_polyfile(f, has_z_value):
+            if poly_object is None or poly_object.metadata.name != name:
+                continue
+            if n_found == occurrence:
+                return (poly_object, msgs)
+            n_found += 1
+
+    raise KeyError(name)
@@ -0,0 +1,174 @@
+from enum import Enum
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from pydantic import BaseModel
+
+
+def format_table(header: List[str], rows: List[List[str]]) -> str:
+    """Format the given rows as a markdown table, of which the columns are aligned.
+
+    Args:
+        header (List[str]): The name of each column.
+        rows (List[List[str]]): The cells of each row, one per column.
+
+    Returns:
+        str: The table with a line per row, following the header and its separator.
+    """
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+
+    def line(cells: List[str]) -> str:
+        return "| " + " | ".join(cell.ljust(width) for (cell, width) in zip(cells, widths)) + " |"
+
+    return "\n".join([line(header), line(["-" * width for width in widths])] + [line(row) for row in rows])
+
+
+class Stage(Enum):
+    """Stage describes a stage of reading a polyfile.
+
+    FILE spans a whole call of read_polyfile, every other stage spans a single
+    block. The block stages are:
+
+    - READ: reading the lines of the block and splitting them from the file.
+    - SCAN: validating and converting a well-formed block without the grammar.
+    - LEX: lexing a block which is parsed with the polyfile_grammar.
+    - PARSE: the LALR parser itself, including decoding the block.
+    - TRANSFORM: converting the terminals into literals.
+    - INTERPRET: interpreting the rules into a validated PolyObject, either while
+                 parsing or by visiting the tree.
+    """
+    FILE = "file"
+    READ = "read"
+    SCAN = "scan"
+    LEX = "lex"
+    PARSE = "parse"
+    TRANSFORM = "transform"
+    INTERPRET = "interpret"
+
+
+class Span(NamedTuple):
+    """Span describes the time spent in a single stage."""
+    stage: Stage
+    duration: float
+    source: Optional[str]
+    block: Optional[int]
+
+
+class Instrumentation:
+    """Instrumentation receives the spans of the stages of reading polyfiles.
+
+    The duration of a span is in seconds. Its source is the path of the polyfile
+    when read with read_polyfile, and None when read with iter_polyfile. Its
+    block is the 1-based line number of the first line of the block, and None
+    for FILE spans.
+
+    The base class discards every span, subclasses override on_span. Reading is
+    only instrumented if an Instrumentation is passed, as such no timers are
+    involved by default.
+    """
+
+    def on_span(self, span: Span) -> None:
+        pass
+
+
+class StageSummary(BaseModel):
+    """StageSummary aggregates the spans of a single stage."""
+    stage: Stage
+    n_spans: int
+    total: float
+    max: float
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.n_spans
+
+
+class TimingCollector(Instrumentation):
+    """TimingCollector aggregates the spans per stage and source.
+
+    Only the number of spans, their total and their maximum duration are kept,
+    such that the memory of the collector does not grow with the number of blocks.
+    """
+
+    def __init__(self) -> None:
+        # The number of spans, the total and maximum duration per source and stage.
+        self._timings: Dict[Tuple[Optional[str], Stage], List[float]] = {}
+
+    def on_span(self, span: Span) -> None:
+        key = (span.source, span.stage)
+        timings = self._timings.get(key)
+
+        if timings is None:
+            self._timings[key] = [1, span.duration, span.duration]
+            return
+
+        timings[0] += 1
+        timings[1] += span.duration
+        if span.duration > timings[2]:
+            timings[2] = span.duration
+
+    @property
+    def sources(self) -> List[str]:
+        return list(dict.fromkeys(source for (source, _) in self._timings if source is not None))
+
+    def clear(self) -> None:
+        self._timings.clear()
+
+    def summary(self, source: Optional[str]=None) -> List[StageSummary]:
+        """Summarise the collected spans per stage.
+
+        Args:
+            source (Optional[str], optional):
+                The source of which the spans are summarised. Defaults to None,
+                i.e. the spans of all sources, including those without a source.
+
+        Returns:
+            List[StageSummary]: The summary of each stage with at least one span,
+                                in the order of Stage.
+        """
+        aggregated: Dict[Stage, List[float]] = {}
+
+        for ((span_source, stage), (n_spans, total, maximum)) in self._timings.items():
+            if source is not None and span_source != source:
+                continue
+
+            timings = aggregated.setdefault(stage, [0, 0.0, 0.0])
+            timings[0] += n_spans
+            timings[1] += total
+            timings[2] = max(timings[2], maximum)
+
+        return [StageSummary(stage=stage,
+                             n_spans=int(aggregated[stage][0]),
+                             total=aggregated[stage][1],
+                             max=aggregated[stage][2])
+                for stage in Stage if stage in aggregated]
+
+    def format_summary(self, source: Optional[str]=None) -> str:
+        """Format the summary of the collected spans as a markdown table.
+
+        The share of each block stage is relative to the total of the block
+        stages, the time of FILE spans not covered by them is reported as "other".
+
+        Args:
+            source (Optional[str], optional):
+                The source of which the spans are summarised. Defaults to None,
+                i.e. the spans of all sources.
+
+        Returns:
+            str: The table with a row per stage.
+        """
+        summaries = self.summary(source)
+        block_total = sum(s.total for s in summaries if s.stage != Stage.FILE)
+        header = ["stage", "spans", "total (s)", "share (%)", "mean (ms)", "max (ms)"]
+        rows = []
+
+        for s in summaries:
+            share = (f"{100 * s.total / block_total:.1f}"
+                     if s.stage != Stage.FILE and block_total > 0 else "-")
+            rows.append([s.stage.value, str(s.n_spans), f"{s.total:.3f}", share,
+                         f"{s.mean * 1e3:.3f}", f"{s.max * 1e3:.3f}"])
+
+        file_total = sum(s.total for s in summaries if s.stage == Stage.FILE)
+        if file_total > 0:
+            rows.append(["other", "-", f"{max(file_total - block_total, 0.0):.3f}", "-", "-", "-"])
+
+        return format_table(header, rows)
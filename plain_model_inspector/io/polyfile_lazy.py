@@ -0,0 +1,106 @@
+from pathlib import Path
+from pydantic import PrivateAttr
+from typing import Any, List, Optional, Tuple, Union
+
+import numpy as np
+
+from plain_model_inspector.io.polyfile import ParseMsg, PolyObject
+from plain_model_inspector.io.polyfile_headers import BlockHeader, scan_polyfile_headers
+from plain_model_inspector.io.polyfile_index import BlockIndexEntry, read_block
+
+
+class LazyPolyObject(PolyObject):
+    """LazyPolyObject is a PolyObject of which the points are read on first access.
+
+    The description and metadata are available directly. The block is parsed
+    once values, or any of the views on it such as points, is accessed. The
+    parse messages of the block are available afterwards through deferred_msgs.
+    """
+    _path: Path = PrivateAttr()
+    _header: BlockHeader = PrivateAttr()
+    _deferred_msgs: Optional[List[ParseMsg]] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_header(cls, path: Union[str, Path], header: BlockHeader, has_z_value: bool=False) -> "LazyPolyObject":
+        """Create a LazyPolyObject of the block described by the header.
+
+        Args:
+            path (Union[str, Path]): Path to the .pli(z) or .pol file.
+            header (BlockHeader): The header of the block, as obtained by
+                                  scan_polyfile_headers.
+            has_z_value (bool, optional): Whether the third column of each point
+                                          contains the z-value. Defaults to False.
+
+        Returns:
+            LazyPolyObject: The PolyObject of which the values are not read yet.
+        """
+        # The values are not set, such that accessing them calls __getattr__.
+        lazy_object = cls.construct(description=header.description,
+                                    metadata=header.metadata,
+                                    has_z_value=has_z_value)
+        lazy_object._path = Path(path)
+        lazy_object._header = header
+        return lazy_object
+
+    @property
+    def is_loaded(self) -> bool:
+        return "values" in self.__dict__
+
+    @property
+    def deferred_msgs(self) -> Optional[List[ParseMsg]]:
+        """The parse messages of the block, or None if the block has not been read yet."""
+        return self._deferred_msgs
+
+    def load(self) -> "LazyPolyObject":
+        """Read the values of the block, if they have not been read yet.
+
+        Raises:
+            IndexMismatchError: Thrown when the polyfile changed since its headers
+                                were scanned.
+
+        Returns:
+            LazyPolyObject: This LazyPolyObject.
+        """
+        if self.is_loaded:
+            return self
+
+        entry = BlockIndexEntry(name=self.metadata.name,
+                                offset=self._header.offset,
+                                end_offset=self._header.end_offset,
+                                line=self._header.line,
+                                n_rows=self.metadata.n_rows,
+                                n_columns=self.metadata.n_columns)
+        (poly_object, msgs) = read_block(self._path, entry, self.has_z_value)
+
+        # An invalid block does not contain any points.
+        self.__dict__["values"] = (poly_object.values if poly_object is not None else
+                                   np.empty((0, max(self.metadata.n_columns, 3 if self.has_z_value else 2))))
+        self.__fields_set__.add("values")
+        self._deferred_msgs = msgs
+        return self
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "values":
+            return self.load().__dict__["values"]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+
+def read_polyfile_lazy(path: Union[str, Path],
+                       has_z_value: bool=False) -> Tuple[List[LazyPolyObject], List[ParseMsg]]:
+    """Read the headers of the polyfile at the given path, deferring its points.
+
+    The blocks are found with scan_polyfile_headers. The points of each block are
+    read when they are first accessed.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        has_z_value (bool, optional): Whether the third column of each point
+                                      contains the z-value. Defaults to False.
+
+    Returns:
+        Tuple[List[LazyPolyObject], List[ParseMsg]]:
+            The LazyPolyObjects of the blocks and the messages of the blocks that
+            were skipped while scanning the headers.
+    """
+    (headers, msgs) = scan_polyfile_headers(path)
+    return ([LazyPolyObject.from_header(path, header, has_z_value) for header in headers], msgs)
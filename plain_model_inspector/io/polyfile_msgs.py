@@ -0,0 +1,304 @@
+from pathlib import Path
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union, overload
+
+import numpy as np
+
+from plain_model_inspector.io.polyfile import (
+    MsgFilter,
+    ParseErrorLevel,
+    ParseMsg,
+    PolyObject,
+    _read_polyfile_into,
+)
+from plain_model_inspector.io.polyfile_instrumentation import Instrumentation
+
+
+# The rows of the columnar data of a ParseMsgStore.
+_LEVEL = 0
+_LINE_START = 1
+_LINE_END = 2
+_COLUMN_START = 3
+_COLUMN_END = 4
+_CODE = 5
+_N_FIELDS = 6
+
+_INITIAL_CAPACITY = 16
+
+_LEVELS: List[ParseErrorLevel] = sorted(ParseErrorLevel, key=lambda level: level.value)
+
+
+class ParseMsgStore(Sequence[ParseMsg]):
+    """ParseMsgStore holds parse messages column-wise.
+
+    The level, line range and column range of each message are stored in a single
+    integer array, and its reason as a code into the table of reasons, which
+    contains each distinct reason once. ParseMsgs are only constructed when the
+    messages are accessed, filtering and counting operate on the arrays directly.
+    """
+
+    def __init__(self, msgs: Iterable[ParseMsg]=()) -> None:
+        self._data = np.empty((_N_FIELDS, _INITIAL_CAPACITY), dtype=np.int64)
+        self._size = 0
+        self._reasons: List[str] = []
+        self._codes: Dict[str, int] = {}
+        self.extend(msgs)
+
+    def _reserve(self, n: int) -> None:
+        if self._size + n <= self._data.shape[1]:
+            return
+
+        capacity = max(2 * self._data.shape[1], self._size + n)
+        data = np.empty((_N_FIELDS, capacity), dtype=np.int64)
+        data[:, :self._size] = self._data[:, :self._size]
+        self._data = data
+
+    def _intern(self, reason: str) -> int:
+        code = self._codes.get(reason)
+        if code is None:
+            code = len(self._reasons)
+            self._codes[reason] = code
+            self._reasons.append(reason)
+        return code
+
+    def add(self, level: ParseErrorLevel, line: Tuple[int, int], column: Tuple[int, int], reason: str) -> None:
+        """Add a message without constructing a ParseMsg.
+
+        Args:
+            level (ParseErrorLevel): The level of the message.
+            line (Tuple[int, int]): The first and last line of the message.
+            column (Tuple[int, int]): The first and last column of the message.
+            reason (str): The reason of the message.
+        """
+        self._reserve(1)
+        self._data[:, self._size] = (level.value, line[0], line[1], column[0], column[1], self._intern(reason))
+        self._size += 1
+
+    def append(self, msg: ParseMsg) -> None:
+        """Add the message to the end of the store.
+
+        Args:
+            msg (ParseMsg): The message to add.
+        """
+        self.add(msg.level, msg.line, msg.column, msg.reason)
+
+    def extend(self, msgs: Iterable[ParseMsg]) -> None:
+        """Add the messages to the end of the store.
+
+        The messages of another ParseMsgStore are copied column-wise, without
+        constructing ParseMsgs.
+
+        Args:
+            msgs (Iterable[ParseMsg]): The messages to add.
+        """
+        if not isinstance(msgs, ParseMsgStore):
+            for msg in msgs:
+                self.append(msg)
+            return
+
+        codes = np.array([self._intern(reason) for reason in msgs._reasons], dtype=np.int64)
+        n = len(msgs)
+        self._reserve(n)
+        self._data[:, self._size:self._size + n] = msgs._data[:, :n]
+        self._data[_CODE, self._size:self._size + n] = codes[msgs._data[_CODE, :n]]
+        self._size += n
+
+    @property
+    def reasons(self) -> List[str]:
+        """The table of reasons, indexed by the codes of the messages."""
+        return list(self._reasons)
+
+    def code(self, reason: str) -> int:
+        """Get the code of the given reason.
+
+        Args:
+            reason (str): The reason of a message in the store.
+
+        Raises:
+            KeyError: Thrown when no message in the store has the reason.
+
+        Returns:
+            int: The index of the reason in reasons.
+        """
+        return self._codes[reason]
+
+    @property
+    def levels(self) -> np.ndarray:
+        """The values of the ParseErrorLevels of the messages."""
+        return self._data[_LEVEL, :self._size]
+
+    @property
+    def lines(self) -> np.ndarray:
+        """The (n_msgs, 2) first and last lines of the messages."""
+        return self._data[_LINE_START:_LINE_END + 1, :self._size].T
+
+    @property
+    def columns(self) -> np.ndarray:
+        """The (n_msgs, 2) first and last columns of the messages."""
+        return self._data[_COLUMN_START:_COLUMN_END + 1, :self._size].T
+
+    @property
+    def codes(self) -> np.ndarray:
+        """The reason codes of the messages."""
+        return self._data[_CODE, :self._size]
+
+    def mask(self,
+             levels: Optional[Collection[ParseErrorLevel]]=None,
+             codes: Optional[Collection[int]]=None) -> np.ndarray:
+        """Get the mask of the messages with any of the given levels and codes.
+
+        Args:
+            levels (Optional[Collection[ParseErrorLevel]], optional):
+                The levels to select. Defaults to None, i.e. any level.
+            codes (Optional[Collection[int]], optional):
+                The reason codes to select. Defaults to None, i.e. any code.
+
+        Returns:
+            np.ndarray: The boolean mask of the selected messages.
+        """
+        mask = np.ones(self._size, dtype=bool)
+        if levels is not None:
+            mask &= np.isin(self.levels, [level.value for level in levels])
+        if codes is not None:
+            mask &= np.isin(self.codes, list(codes))
+        return mask
+
+    def count_msgs(self,
+                   levels: Optional[Collection[ParseErrorLevel]]=None,
+                   codes: Optional[Collection[int]]=None) -> int:
+        """Count the messages with any of the given levels and codes.
+
+        Args:
+            levels (Optional[Collection[ParseErrorLevel]], optional):
+                The levels to count. Defaults to None, i.e. any level.
+            codes (Optional[Collection[int]], optional):
+                The reason codes to count. Defaults to None, i.e. any code.
+
+        Returns:
+            int: The number of selected messages.
+        """
+        return int(np.count_nonzero(self.mask(levels, codes)))
+
+    def count_by_level(self) -> Dict[ParseErrorLevel, int]:
+        """Count the messages of each level.
+
+        Returns:
+            Dict[ParseErrorLevel, int]: The number of messages of every level.
+        """
+        counts = np.bincount(self.levels, minlength=len(_LEVELS))
+        return {level: int(counts[level.value]) for level in _LEVELS}
+
+    def count_by_reason(self) -> Dict[str, int]:
+        """Count the messages of each reason.
+
+        Returns:
+            Dict[str, int]: The number of messages of every reason in reasons.
+        """
+        counts = np.bincount(self.codes, minlength=len(self._reasons))
+        return {reason: int(count) for (reason, count) in zip(self._reasons, counts)}
+
+    def filter(self,
+               levels: Optional[Collection[ParseErrorLevel]]=None,
+               codes: Optional[Collection[int]]=None) -> "ParseMsgStore":
+        """Get the messages with any of the given levels and codes.
+
+        Args:
+            levels (Optional[Collection[ParseErrorLevel]], optional):
+                The levels to select. Defaults to None, i.e. any level.
+            codes (Optional[Collection[int]], optional):
+                The reason codes to select. Defaults to None, i.e. any code.
+
+        Returns:
+            ParseMsgStore: A new store with the selected messages, which shares
+                           the reasons and codes of this store.
+        """
+        return self._select(self.mask(levels, codes))
+
+    def _select(self, index: Union[np.ndarray, slice]) -> "ParseMsgStore":
+        result = ParseMsgStore()
+        result._data = np.ascontiguousarray(self._data[:, :self._size][:, index])
+        result._size = result._data.shape[1]
+        result._reasons = list(self._reasons)
+        result._codes = dict(self._codes)
+        return result
+
+    def _msg(self, row: Sequence[int]) -> ParseMsg:
+        # The values are validated when they are added, as such construct is sufficient.
+        return ParseMsg.construct(level=_LEVELS[row[_LEVEL]],
+                                  line=(row[_LINE_START], row[_LINE_END]),
+                                  column=(row[_COLUMN_START], row[_COLUMN_END]),
+                                  reason=self._reasons[row[_CODE]])
+
+    def __len__(self) -> int:
+        return self._size
+
+    @overload
+    def __getitem__(self, index: int) -> ParseMsg: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> "ParseMsgStore": ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._select(index)
+
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("ParseMsgStore index out of range")
+        return self._msg(self._data[:, index].tolist())
+
+    def __iter__(self) -> Iterator[ParseMsg]:
+        # The data is converted per block of messages, rather than per value.
+        for start in range(0, self._size, 1024):
+            for row in self._data[:, start:min(start + 1024, self._size)].T.tolist():
+                yield self._msg(row)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, ParseMsgStore):
+            n = self._size
+            return (n == other._size and 
+                    np.array_equal(self._data[:_CODE, :n], other._data[:_CODE, :n]) and
+                    [self._reasons[code] for code in self.codes.tolist()] == 
+                    [other._reasons[code] for code in other.codes.tolist()])
+        if isinstance(other, list):
+            return len(self) == len(other) and list(self) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ParseMsgStore({list(self)!r})"
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The unused capacity is not pickled.
+        return {"data": self._data[:, :self._size].copy(), "reasons": self._reasons}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._data = state["data"]
+        self._size = self._data.shape[1]
+        self._reasons = state["reasons"]
+        self._codes = {reason: code for (code, reason) in enumerate(self._reasons)}
+
+
+def read_polyfile_to_store(path: Union[str, Path], 
+                           has_z_value: bool=False, 
+                           fast_path: bool=True,
+                           inline: bool=True,
+                           memory_map: bool=False,
+                           max_errors: Optional[int]=None,
+                           stop_at_level: Optional[ParseErrorLevel]=None,
+                           msg_filter: Optional[MsgFilter]=None,
+                           instrumentation: Optional[Instrumentation]=None) -> Tuple[List[PolyObject], ParseMsgStore]:
+    """Read the polyfile at the given path, storing its messages in a ParseMsgStore.
+
+    The polyfile is read as by read_polyfile, of which the arguments are the 
+    same. The messages of each block are added to the store as soon as the block
+    is read, such that only the ParseMsgs of a single block exist at any time.
+
+    Returns:
+        Tuple[List[PolyObject], ParseMsgStore]: 
+            The PolyObjects of the valid blocks and all parse messages in order
+            of occurrence.
+    """
+    msgs = ParseMsgStore()
+    objects = _read_polyfile_into(msgs, path, has_z_value, fast_path, inline, memory_map,
+                                  max_errors, stop_at_level, msg_filter, instrumentation)
+    return (objects, msgs)
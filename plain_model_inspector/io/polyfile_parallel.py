@@ -0,0 +1,249 @@
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple, Union
+
+from plain_model_inspector.io.polyfile import (
+    MsgFilter,
+    ParseMsg,
+    PolyObject,
+    _LinePatterns,
+    _get_line_patterns,
+    iter_polyfile,
+    read_polyfile,
+)
+
+
+DEFAULT_CHUNK_SIZE = 64 * 1024 * 1024
+
+# The number of non-empty point lines which need to precede a line before it is
+# guaranteed to start a new block, independent of the lines before them.
+_N_SYNCHRONIZING_POINT_LINES = 3
+
+# The minimum number of bytes searched for the start of a block, such that small
+# chunk sizes still span enough lines to find one.
+_MIN_SEARCH_SIZE = 4 * 1024
+
+
+def _find_block_start(mapped: mmap.mmap, offset: int, limit: int) -> Optional[int]:
+    """Find the first line at or after offset at which iter_polyfile starts a new block.
+
+    iter_polyfile starts a new block at the first non-empty line which is not a
+    point, after the current block has read at least one point. While skipping an
+    invalid block, it starts a new block at the first name line directly followed
+    by a dimensions line, optionally preceded by comment lines. Any line in a
+    polyfile ends up in either of these states after three consecutive non-empty
+    point lines, e.g. as the name, dimensions and first point of a block in the
+    worst case. It does so as well after a complete block, i.e. a line which is 
+    neither a point nor a comment, directly followed by a dimensions line and at
+    least one point, whatever the state in which this line is read. Comment lines,
+    a name line and a dimensions line following either are as such always the 
+    start of a block in the serial parse, regardless of the content before them.
+
+    Args:
+        mapped (mmap.mmap): The mapped polyfile.
+        offset (int): The byte offset from which to search.
+        limit (int): The number of bytes after offset within which the block 
+                     should start.
+
+    Returns:
+        Optional[int]: The byte offset of the start of the block, or None if no
+                       block starts within limit bytes after offset.
+    """
+    patterns = _get_line_patterns(is_bytes=True)
+
+    # Start at the first complete line after offset.
+    if offset > 0:
+        line_end = mapped.find(b"\n", offset - 1)
+        if line_end < 0:
+            return None
+        offset = line_end + 1
+
+    mapped.seek(offset)
+    n_point_lines = 0
+    # Whether the previous line is a candidate name line, whether the point lines
+    # follow it together with a dimensions line, and whether they contain a point.
+    follows_name = False
+    follows_dimensions = False
+    is_complete = False
+
+    while mapped.tell() < offset + limit:
+        line_start = mapped.tell()
+        line = mapped.readline()
+        if not line:
+            return None
+        if patterns.empty_line.fullmatch(line):
+            follows_name = False
+            continue
+
+        if patterns.point_line.match(line):
+            n_point_lines += 1
+            if follows_dimensions:
+                is_complete = True
+            elif follows_name and patterns.plausible_dimensions_line.fullmatch(line):
+                follows_dimensions = True
+            follows_name = False
+            continue
+
+        if ((n_point_lines >= _N_SYNCHRONIZING_POINT_LINES or is_complete) and 
+            _starts_block(mapped, line, patterns)):
+            return line_start
+
+        n_point_lines = 0
+        follows_name = not line.startswith(patterns.comment)  # type: ignore
+        follows_dimensions = False
+        is_complete = False
+        mapped.seek(line_start + len(line))
+
+    return None
+
+
+def _starts_block(mapped: mmap.mmap, line: bytes, patterns: _LinePatterns) -> bool:
+    # Whether the line and the lines following it are comment lines, followed by
+    # a name line and a dimensions line.
+    while line.startswith(patterns.comment):  # type: ignore
+        line = mapped.readline()
+
+    is_name_line = not (patterns.empty_line.fullmatch(line) or patterns.point_line.match(line))
+    return is_name_line and patterns.plausible_dimensions_line.fullmatch(mapped.readline()) is not None
+
+
+def find_block_boundaries(path: Union[str, Path], chunk_size: int=DEFAULT_CHUNK_SIZE) -> List[int]:
+    """Find byte offsets at which the polyfile can be split into independently parsed chunks.
+
+    The file is not tokenized, only a few lines following every multiple of
+    chunk_size are inspected to find the start of the next block. If no block
+    starts within chunk_size bytes, or 4 KiB for smaller chunk sizes, the search
+    continues after these bytes, such that every byte is inspected at most once 
+    and a region without any block boundary is read as part of a single chunk.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        chunk_size (int, optional): The approximate size in bytes of each chunk.
+                                    Defaults to DEFAULT_CHUNK_SIZE.
+
+    Returns:
+        List[int]: The byte offsets of the chunks, starting with 0 and ending with
+                   the size of the file.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+
+    if size == 0:
+        return boundaries
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        search_size = max(chunk_size, _MIN_SEARCH_SIZE)
+        offset = chunk_size
+        while offset < size:
+            block_start = _find_block_start(mapped, offset, search_size)
+            if block_start is None:
+                offset += search_size
+                continue
+            boundaries.append(block_start)
+            offset = block_start + chunk_size
+
+    boundaries.append(size)
+    return boundaries
+
+
+def _iter_lines(mapped: mmap.mmap, start: int, end: int) -> Iterator[bytes]:
+    # The chunk ends at the start of a line, such that no line crosses the end.
+    mapped.seek(start)
+    while mapped.tell() < end:
+        yield mapped.readline()
+
+
+def _read_chunk(path: Union[str, Path],
+                start: int,
+                end: int,
+                has_z_value: bool,
+                fast_path: bool,
+                inline: bool,
+                msg_filter: Optional[MsgFilter]) -> Tuple[List[PolyObject], List[ParseMsg], int]:
+    objects: List[PolyObject] = []
+    msgs: List[ParseMsg] = []
+    n_lines = 0
+
+    def lines(mapped: mmap.mmap) -> Iterator[bytes]:
+        nonlocal n_lines
+        for line in _iter_lines(mapped, start, end):
+            n_lines += 1
+            yield line
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        for (poly_object, block_msgs) in iter_polyfile(lines(mapped), has_z_value, fast_path, inline, 
+                                                          msg_filter=msg_filter):
+            if poly_object is not None:
+                objects.append(poly_object)
+            msgs.extend(block_msgs)
+
+    return (objects, msgs, n_lines)
+
+
+def read_polyfile_parallel(path: Union[str, Path],
+                           has_z_value: bool=False,
+                           n_workers: Optional[int]=None,
+                           chunk_size: int=DEFAULT_CHUNK_SIZE,
+                           fast_path: bool=True,
+                           inline: bool=True,
+                           msg_filter: Optional[MsgFilter]=None) -> Tuple[List[PolyObject], List[ParseMsg]]:
+    """Read the polyfile at the given path by parsing chunks of it on a process pool.
+
+    The file is split at block boundaries found by find_block_boundaries, after
+    which every chunk is read as a memory mapped polyfile. The results are
+    merged in order, and the line numbers of the messages are rebased to the
+    whole file, such that the result is identical to read_polyfile.
+
+    Args:
+        path (Union[str, Path]): Path to the .pli(z) or .pol file.
+        has_z_value (bool, optional): Whether the third column of each point
+                                      contains the z-value. Defaults to False.
+        n_workers (Optional[int], optional): The number of worker processes.
+                                             Defaults to the number of processors.
+        chunk_size (int, optional): The approximate size in bytes of each chunk.
+                                    Defaults to DEFAULT_CHUNK_SIZE.
+        fast_path (bool, optional): Whether well-formed blocks are scanned without
+                                    the polyfile_grammar. Defaults to True.
+        inline (bool, optional): Whether blocks are converted while they are parsed,
+                                 instead of constructing a tree. Defaults to True.
+        msg_filter (Optional[MsgFilter], optional):
+            The messages which are reported. Defaults to None, i.e. all messages
+            are reported.
+
+    Returns:
+        Tuple[List[PolyObject], List[ParseMsg]]:
+            The PolyObjects of the valid blocks and all parse messages in order
+            of occurrence.
+    """
+    boundaries = find_block_boundaries(path, chunk_size)
+
+    if len(boundaries) <= 2 or n_workers == 1:
+        return read_polyfile(path, has_z_value, fast_path, inline, memory_map=True, msg_filter=msg_filter)
+
+    n_chunks = len(boundaries) - 1
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        results = executor.map(_read_chunk,
+                               [path] * n_chunks,
+                               boundaries[:-1],
+                               boundaries[1:],
+                               [has_z_value] * n_chunks,
+                               [fast_path] * n_chunks,
+                               [inline] * n_chunks,
+                               [msg_filter] * n_chunks)
+
+        objects: List[PolyObject] = []
+        msgs: List[ParseMsg] = []
+        line_offset = 0
+
+        for (chunk_objects, chunk_msgs, n_lines) in results:
+            if line_offset:
+                for msg in chunk_msgs:
+                    msg.line = (msg.line[0] + line_offset, msg.line[1] + line_offset)
+
+            objects.extend(chunk_objects)
+            msgs.extend(chunk_msgs)
+            line_offset += n_lines
+
+    return (objects, msgs)
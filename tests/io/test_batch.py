@@ -0,0 +1,105 @@
+import pytest
+
+from plain_model_inspector.io import batch, polyfile_msgs
+from plain_model_inspector.io.batch import find_polyfiles, inspect_directory, inspect_polyfile
+from plain_model_inspector.io.polyfile import ParseErrorLevel
+from plain_model_inspector.io.polyfile_cache import PolyFileCache
+from plain_model_inspector.io.polyfile_msgs import read_polyfile_to_store
+
+
+@pytest.fixture
+def model_dir(tmp_path):
+    (tmp_path / "geometry").mkdir()
+    (tmp_path / "geometry" / "dike.pliz").write_text("dike\n2 3\n1.0 2.0 3.0\n4.0 5.0 6.0\n")
+    (tmp_path / "boundary.pli").write_text("boundary\n1 2\n1.0 2.0\n")
+    (tmp_path / "invalid.pol").write_text("polygon\n1 2\n1.0 2\n")
+    (tmp_path / "samples.xyz").write_text("1.0 2.0 3.0\n")
+    return tmp_path
+
+
+def test_find_polyfiles_returns_largest_file_first(model_dir):
+    assert find_polyfiles(model_dir) == [model_dir / "geometry" / "dike.pliz",
+                                         model_dir / "boundary.pli",
+                                         model_dir / "invalid.pol"]
+
+
+def test_inspect_polyfile_derives_z_value_from_suffix(model_dir):
+    inspection = inspect_polyfile(model_dir / "geometry" / "dike.pliz")
+
+    assert inspection.n_objects == 1
+    assert inspection.msgs == []
+
+
+def test_inspect_polyfile_stores_messages_while_reading(model_dir, monkeypatch):
+    read_polyfile_into = polyfile_msgs._read_polyfile_into
+
+    def read_into_store(msgs, *args, **kwargs):
+        assert isinstance(msgs, polyfile_msgs.ParseMsgStore), "The messages should not be collected in a list."
+        return read_polyfile_into(msgs, *args, **kwargs)
+
+    monkeypatch.setattr(polyfile_msgs, "_read_polyfile_into", read_into_store)
+
+    inspection = inspect_polyfile(model_dir / "invalid.pol")
+
+    assert inspection.n_objects == 0
+    assert isinstance(inspection.msgs, polyfile_msgs.ParseMsgStore)
+    assert inspection.msgs.count_msgs(levels=[ParseErrorLevel.ERROR]) == 1
+
+
+def test_inspect_polyfile_that_cannot_be_read_returns_fatal_message(tmp_path):
+    inspection = inspect_polyfile(tmp_path / "missing.pli")
+
+    assert inspection.n_objects == 0
+    assert len(inspection.msgs) == 1
+    assert inspection.msgs[0].level == ParseErrorLevel.FATAL
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_inspect_directory_inspects_every_polyfile(model_dir, n_workers: int):
+    inspections = {inspection.path.name: inspection 
+                   for inspection in inspect_directory(model_dir, n_workers=n_workers)}
+
+    assert set(inspections) == {"dike.pliz", "boundary.pli", "invalid.pol"}
+    assert inspections["boundary.pli"].n_objects == 1
+    assert inspections["invalid.pol"].n_objects == 0
+    assert inspections["invalid.pol"].msgs[0].level == ParseErrorLevel.ERROR
+
+
+class UnpicklableCache(PolyFileCache):
+    def __reduce__(self):
+        raise AssertionError("The cache should not be sent to the workers.")
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+def test_inspect_directory_caches_results_in_current_process(tmp_path, model_dir, n_workers: int):
+    cache = UnpicklableCache(tmp_path / "cache")
+
+    cold = {i.path.name: i.msgs for i in inspect_directory(model_dir, n_workers=n_workers, cache=cache)}
+
+    assert all(cache.get(path, batch._has_z_value(path)) is not None for path in find_polyfiles(model_dir))
+    assert {i.path.name: i.msgs for i in inspect_directory(model_dir, n_workers=n_workers, cache=cache)} == cold
+
+
+def fail_on_dike(path, *args, **kwargs):
+    if path.name == "dike.pliz":
+        raise ValueError("unexpected")
+    return read_polyfile_to_store(path, *args, **kwargs)
+
+
+@pytest.mark.parametrize("n_workers", [1, 2])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_inspect_directory_reports_unexpected_exceptions_per_file(tmp_path, model_dir, monkeypatch, 
+                                                                  n_workers: int, use_cache: bool):
+    monkeypatch.setattr(batch, "read_polyfile_to_store", fail_on_dike)
+    cache = PolyFileCache(tmp_path / "cache") if use_cache else None
+
+    inspections = {inspection.path.name: inspection 
+                   for inspection in inspect_directory(model_dir, n_workers=n_workers, cache=cache)}
+
+    assert inspections["boundary.pli"].n_objects == 1
+    assert len(inspections["dike.pliz"].msgs) == 1
+    assert inspections["dike.pliz"].msgs[0].level == ParseErrorLevel.FATAL
+    assert inspections["dike.pliz"].msgs[0].reason == "File could not be inspected: ValueError: unexpected"
+
+    with pytest.raises(ValueError):
+        list(inspect_directory(model_dir, n_workers=n_workers, fail_fast=True))
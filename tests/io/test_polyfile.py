@@ -1,5 +1,44 @@
+import io
+import numpy as np
+import pytest
 from lark import Lark
-from plain_model_inspector.io.polyfile import PolyFileInterpreter, PolyFileLiteralTransformer, polyfile_grammar
+from lark.exceptions import UnexpectedInput
+from plain_model_inspector.io.polyfile import Metadata, MsgFilter, MsgKind, ParseErrorLevel, Point, PolyObject, TokenData, PolyFileInterpreter, PolyFileLiteralTransformer, get_inline_polyfile_parser, get_polyfile_parser, iter_polyfile, polyfile_grammar, read_polyfile
+import plain_model_inspector.io.polyfile as polyfile
+
+
+def test_get_polyfile_parser_returns_shared_parser_per_start_symbol():
+    parser = get_polyfile_parser('points')
+
+    assert parser is get_polyfile_parser('points')
+    assert parser is not get_polyfile_parser('point')
+    assert parser.options.parser == 'lalr'
+
+
+def test_build_polyfile_parser_persists_tables_keyed_by_grammar_hash(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLAIN_MODEL_INSPECTOR_CACHE_DIR", str(tmp_path))
+
+    parser = polyfile._build_polyfile_parser('dimensions_line')
+    cache_files = list(tmp_path.iterdir())
+
+    assert len(cache_files) == 1
+    assert polyfile.polyfile_grammar_hash[:16] in cache_files[0].name
+
+    cached_parser = polyfile._build_polyfile_parser('dimensions_line')
+    reference = Lark(polyfile_grammar, start='dimensions_line', parser='lalr')
+
+    assert cached_parser.parse("5 23\n") == reference.parse("5 23\n")
+    assert parser.parse("5 23\n") == reference.parse("5 23\n")
+
+
+def test_build_polyfile_parser_without_cache_dir_does_not_persist(tmp_path, monkeypatch):
+    monkeypatch.setenv("PLAIN_MODEL_INSPECTOR_CACHE_DIR", "")
+    monkeypatch.chdir(tmp_path)
+
+    parser = polyfile._build_polyfile_parser('dimensions_line')
+
+    assert parser.parse("5 23\n") is not None
+    assert list(tmp_path.iterdir()) == []
 
 
 def test_description_header_is_tokenized_correctly():
@@ -11,9 +50,7 @@ def test_description_header_is_tokenized_correctly():
 
 """
     
-    parser = Lark(polyfile_grammar, 
-                  start='description_header',
-                  parser='lalr')
+    parser = get_polyfile_parser('description_header')
     result = parser.parse(description_header1)
 
     assert result is not None
@@ -28,9 +65,7 @@ def test_description_header_is_tokenized_correctly():
 def test_name_is_tokenized_correctly():
     name = "some name with spaces\n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='name_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('name_line')
     result = parser.parse(name)
 
     assert result is not None
@@ -41,9 +76,7 @@ def test_name_is_tokenized_correctly():
 def test_valid_dimensions_are_tokenized_correctly():
     name = "5    23\n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='dimensions_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('dimensions_line')
     result = parser.parse(name)
 
     assert result is not None
@@ -59,9 +92,7 @@ def test_valid_dimensions_are_tokenized_correctly():
 def test_valid_dimensions_with_whitespace_are_tokenized_correctly():
     name = "      5    23\n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='dimensions_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('dimensions_line')
     result = parser.parse(name)
 
     assert result is not None
@@ -79,9 +110,7 @@ def test_valid_dimensions_with_whitespace_are_tokenized_correctly():
 def test_invalid_dimensions_with_too_few_columns_are_tokenized_correctly():
     name = "5\n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='dimensions_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('dimensions_line')
     result = parser.parse(name)
 
     assert result is not None
@@ -96,9 +125,7 @@ def test_invalid_dimensions_with_too_few_columns_are_tokenized_correctly():
 def test_invalid_dimensions_with_too_many_columns_are_tokenized_correctly():
     name = "5 12 18\n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='dimensions_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('dimensions_line')
     result = parser.parse(name)
 
     assert result is not None
@@ -118,9 +145,7 @@ def test_metadata_is_tokenized_correctly():
 5    23
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='metadata',
-                  parser='lalr')
+    parser = get_polyfile_parser('metadata')
     result = parser.parse(metadata)
 
     assert result is not None
@@ -142,9 +167,7 @@ def test_point_is_tokenized_correctly():
     point = "   1.0  2.0  3.0 "
 
 
-    parser = Lark(polyfile_grammar, 
-                  start='point',
-                  parser='lalr')
+    parser = get_polyfile_parser('point')
     result = parser.parse(point)
 
     assert result is not None
@@ -158,9 +181,7 @@ def test_point_is_tokenized_correctly():
 def test_point_line_is_tokenized_correctly():
     point = "   1.0  2.0  3.0   \n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='point_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('point_line')
     result = parser.parse(point)
 
     assert result is not None
@@ -174,9 +195,7 @@ def test_point_line_is_tokenized_correctly():
 def test_invalid_point_line_is_tokenized_correctly():
     point = "   1.0     \n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='point_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('point_line')
     result = parser.parse(point)
 
     assert result is not None
@@ -193,9 +212,7 @@ def test_points_is_tokenized_correctly():
     7.0  8.0  9.0   
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='points',
-                  parser='lalr')
+    parser = get_polyfile_parser('points')
     result = parser.parse(point)
 
     assert result is not None
@@ -227,9 +244,7 @@ this is a name
     7.0  8.0  9.0   
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='poly_block',
-                  parser='lalr')
+    parser = get_polyfile_parser('poly_block')
     result = parser.parse(point)
 
     assert result is not None
@@ -294,10 +309,7 @@ woo this should be an invalid block
 because this should not exist.
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='poly_file',
-                  lexer='contextual',
-                  parser='lalr')
+    parser = get_polyfile_parser('poly_file')
     result = parser.parse(point)
 
     assert result is not None
@@ -361,10 +373,7 @@ woo this should be an invalid block
 because this should not exist.
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='poly_file',
-                  lexer='contextual',
-                  parser='lalr')
+    parser = get_polyfile_parser('poly_file')
     result = parser.parse(point)
 
 
@@ -375,9 +384,7 @@ def test_comment_is_parsed_correctly():
         
 * last value
 """
-    parser = Lark(polyfile_grammar, 
-                  start='description_header',
-                  parser='lalr')
+    parser = get_polyfile_parser('description_header')
     tokens = parser.parse(description_header1)
     transformed_tokens = PolyFileLiteralTransformer().transform(tokens)    
     (result, msgs) = PolyFileInterpreter().visit(transformed_tokens)
@@ -392,9 +399,7 @@ def test_metadata_is_parsed_correctly():
 5    23
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='metadata',
-                  parser='lalr')
+    parser = get_polyfile_parser('metadata')
     tokens = parser.parse(metadata)
     transformed_tokens = PolyFileLiteralTransformer().transform(tokens)
     (result, msgs) = PolyFileInterpreter().visit(transformed_tokens)
@@ -407,9 +412,7 @@ def test_metadata_is_parsed_correctly():
 def test_point_line_is_parsed_correctly():
     point = "   1.0  2.0  3.0  4.0  5.0   \n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='point_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('point_line')
     tokens = parser.parse(point)
     transformed_tokens = PolyFileLiteralTransformer().transform(tokens)
 
@@ -430,9 +433,7 @@ def test_point_line_is_parsed_correctly():
 def test_invalid_point_line_is_parsed_correctly():
     point = "   1.0     \n"
 
-    parser = Lark(polyfile_grammar, 
-                  start='point_line',
-                  parser='lalr')
+    parser = get_polyfile_parser('point_line')
     tokens = parser.parse(point)
     transformed_tokens = PolyFileLiteralTransformer().transform(tokens)
     (result, msgs) = PolyFileInterpreter().visit(transformed_tokens)
@@ -449,9 +450,7 @@ def test_points_is_parsed_correctly():
     7.0  8.0  9.0   
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='points',
-                  parser='lalr')
+    parser = get_polyfile_parser('points')
     tokens = parser.parse(point)
     transformed_tokens = PolyFileLiteralTransformer().transform(tokens)
     (result, msgs) = PolyFileInterpreter(True).visit(transformed_tokens)
@@ -487,9 +486,7 @@ this is a name
     7.0  8.0  9.0   
 """
 
-    parser = Lark(polyfile_grammar, 
-                  start='poly_block',
-                  parser='lalr')
+    parser = get_polyfile_parser('poly_block')
     tokens = parser.parse(block)
     transformed_tokens = PolyFileLiteralTransformer().transform(tokens)
     (result, msgs) = PolyFileInterpreter(True).visit(transformed_tokens)
@@ -514,4 +511,433 @@ this is a name
     assert result.points[2].x == 7.0
     assert result.points[2].y == 8.0
     assert result.points[2].z == 9.0
-    assert len(result.points[2].data) == 0
\ No newline at end of file
+    assert len(result.points[2].data) == 0
+
+def test_poly_file_is_parsed_correctly():
+    poly_file = """* Some description header
+first name
+2    2
+    1.0  2.0
+    3.0  4.0
+second name
+1    3
+    5.0  6.0  7.0
+    8.0  9.0
+"""
+
+    tree = get_polyfile_parser('poly_file', transform_literals=True).parse(poly_file)
+    (result, msgs) = PolyFileInterpreter().visit(tree)
+
+    assert len(result) == 2
+    assert result[0].description.content == " Some description header"
+    assert result[0].metadata.name == "first name"
+    assert [(p.x, p.y) for p in result[0].points] == [(1.0, 2.0), (3.0, 4.0)]
+
+    assert result[1].description is None
+    assert result[1].metadata.name == "second name"
+    assert result[1].metadata.n_columns == 3
+    assert result[1].points[0].data == [7.0]
+
+    # The points are validated against the specified number of columns.
+    assert len(msgs) == 1
+    assert msgs[0].level == ParseErrorLevel.ERROR
+    assert msgs[0].line == (9, 9)
+
+
+def test_read_polyfile_without_final_end_of_line(tmp_path):
+    path = tmp_path / "no_final_eol.pli"
+    path.write_text("some name\n1 3\n1.0 2.0 3.0")
+
+    (result, msgs) = read_polyfile(path, has_z_value=True)
+
+    assert len(msgs) == 0
+    assert len(result) == 1
+    assert result[0].points[0].z == 3.0
+
+
+def test_read_polyfile_unparsable_block_returns_invalid_block_message(tmp_path):
+    path = tmp_path / "unparsable.pli"
+    path.write_text("some name\n1 2\n1.0 2\nother name\n1 2\n1.0 2.0\n")
+
+    (result, msgs) = read_polyfile(path)
+
+    assert len(result) == 1
+    assert result[0].metadata.name == "other name"
+    assert len(msgs) == 1
+    assert msgs[0].level == ParseErrorLevel.ERROR
+    assert msgs[0].reason == "Invalid block of data will be ignored."
+    assert msgs[0].line == (3, 3)
+    assert msgs[0].column == (5, 6)
+
+
+@pytest.mark.parametrize("text", ["first\n1 2\n1.0 2.0\nsecond\n1 2\n", 
+                                  "first\n1 2\n1.0 2.0\nsecond\n1 2"])
+def test_read_polyfile_invalid_block_at_end_of_file_spans_its_lines(tmp_path, text):
+    path = tmp_path / "invalid_at_end.pli"
+    path.write_text(text)
+
+    (result, msgs) = read_polyfile(path)
+
+    assert [poly_object.metadata.name for poly_object in result] == ["first"]
+    assert len(msgs) == 1
+    assert msgs[0].reason == "Invalid block of data will be ignored."
+    assert msgs[0].line == (4, 5)
+
+
+@pytest.mark.parametrize("text", [
+    "* header\nsome name\n1 3\n1.0 2.0 3.0\n",
+    "some name\n1 3\n1.0 2.0 3.0",
+    "\n\nsome name\n2 3\n1.0 2.0 3.0\n4.0 5 6.0\nother name\n1 3\n1.0 2.0 3.0\n\n",
+    "",
+    "some name\r\n1 3\r\n1.0 2.0 3.0\r\nother name\r\n1 3\r\n1.0 2.0\r3.0\r\n",
+])
+def test_read_polyfile_memory_mapped_is_identical_to_text(tmp_path, text):
+    path = tmp_path / "mapped.pliz"
+    path.write_bytes(text.encode("utf-8"))
+
+    assert read_polyfile(path, has_z_value=True, memory_map=True) == \
+           read_polyfile(path, has_z_value=True)
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_read_polyfile_does_not_split_lines_on_carriage_return(tmp_path, memory_map):
+    path = tmp_path / "carriage_return.pli"
+    path.write_bytes(b"a\n2 2\n1.0 2.0\r3.0 4.0\nb\n1 2\n5.0 6.0\n")
+
+    (result, msgs) = read_polyfile(path, memory_map=memory_map)
+
+    assert [poly_object.metadata.name for poly_object in result] == ["b"]
+    assert len(msgs) == 1
+    assert msgs[0].reason == "Invalid block of data will be ignored."
+    assert msgs[0].line == (3, 3)
+
+
+def test_iter_polyfile_yields_blocks_with_file_line_numbers():
+    poly_file = """
+
+* first header
+first name
+  2    2
+    1.0  2.0
+    3.0  4.0
+
+second name
+1    2
+    5.0  6.0  7.0
+"""
+
+    blocks = list(iter_polyfile(io.StringIO(poly_file)))
+
+    assert len(blocks) == 2
+    (first, first_msgs), (second, second_msgs) = blocks
+
+    assert first.metadata.name == "first name"
+    assert len(first.points) == 2
+    assert [(m.line, m.reason) for m in first_msgs] == [
+        ((1, 3), "Unexpected empty lines will be ignored."),
+        ((5, 5), "Whitespace at the beginning of the dimensions is ignored."),
+        ((8, 9), "Unexpected empty lines will be ignored."),
+    ]
+
+    assert second.metadata.name == "second name"
+    assert len(second_msgs) == 1
+    assert second_msgs[0].line == (11, 11)
+    assert second_msgs[0].level == ParseErrorLevel.ERROR
+
+
+def test_iter_polyfile_recovers_at_next_name_and_dimensions_line():
+    text = ("first\n1 2\n1.0 2.0\n" + 
+            "".join(f"corrupt line {i} ###\n" for i in range(1000)) + 
+            "not a name\n* header\nlast\n1 2\n3.0 4.0\n")
+
+    result = list(iter_polyfile(io.StringIO(text)))
+
+    assert [o.metadata.name if o is not None else None for (o, _) in result] == ["first", None, "last"]
+    assert result[1][1][0].level == ParseErrorLevel.ERROR
+    assert result[1][1][0].reason == "Invalid block of data will be ignored."
+    assert result[1][1][0].line == (4, 1004)
+    assert result[2][0].description.content == " header"
+
+
+def test_iter_polyfile_recovers_block_following_block_without_points():
+    result = list(iter_polyfile(io.StringIO("first\n1 2\nsecond\n1 2\n1.0 2.0\n")))
+
+    assert result[0][0] is None
+    assert result[0][1][0].line == (1, 2)
+    assert result[1][0].metadata.name == "second"
+
+
+stop_content = ("first\n1 2\n1.0 2\n" +
+                "second\n2 2\n1.0 2.0\n3.0 4.0\n\n" +
+                "third\n1 2\n1.0 2\n" +
+                "fourth\n1 2\n1.0 2.0\n")
+
+
+def test_read_polyfile_stops_at_level(tmp_path):
+    path = tmp_path / "stop.pli"
+    path.write_text(stop_content.replace("first\n1 2\n1.0 2\n", ""))
+
+    (objects, msgs) = read_polyfile(path, stop_at_level=ParseErrorLevel.WARNING)
+
+    assert [o.metadata.name for o in objects] == ["second"]
+    assert [msg.level for msg in msgs] == [ParseErrorLevel.WARNING, ParseErrorLevel.INFO]
+    assert msgs[1].line == (6, 6)
+    assert msgs[1].reason.startswith("Reading stopped")
+
+
+@pytest.mark.parametrize("max_errors, expected_names, expected_levels", [
+    (1, [], [ParseErrorLevel.ERROR, ParseErrorLevel.INFO]),
+    (2, ["second"], [ParseErrorLevel.ERROR, ParseErrorLevel.WARNING, ParseErrorLevel.ERROR, ParseErrorLevel.INFO]),
+    (3, ["second", "fourth"], [ParseErrorLevel.ERROR, ParseErrorLevel.WARNING, ParseErrorLevel.ERROR]),
+])
+def test_read_polyfile_stops_at_max_errors(tmp_path, max_errors, expected_names, expected_levels):
+    path = tmp_path / "stop.pli"
+    path.write_text(stop_content)
+
+    (objects, msgs) = read_polyfile(path, max_errors=max_errors)
+
+    assert [o.metadata.name for o in objects] == expected_names
+    assert [msg.level for msg in msgs] == expected_levels
+
+
+@pytest.mark.parametrize("max_errors", [0, -1])
+def test_read_polyfile_rejects_max_errors_below_one(tmp_path, max_errors):
+    path = tmp_path / "stop.pli"
+    path.write_text(stop_content)
+
+    with pytest.raises(ValueError):
+        read_polyfile(path, max_errors=max_errors)
+    with pytest.raises(ValueError):
+        iter_polyfile(io.StringIO(stop_content), max_errors=max_errors)
+
+
+def test_iter_polyfile_stops_reading_at_threshold():
+    def lines():
+        yield from ("first\n", "1 2\n", "1.0 2\n", "second\n")
+        raise AssertionError("The remainder of the file should not be read.")
+
+    result = list(iter_polyfile(lines(), stop_at_level=ParseErrorLevel.ERROR))
+
+    assert len(result) == 1
+    assert result[0][0] is None
+
+
+def test_iter_polyfile_matches_whole_file_parse():
+    poly_file = """* Some description header
+this is a name  
+5    23
+    1.0  2.0  3.0
+    4.0  5.0  6.0
+
+
+    7.0  8.0  9.0
+* another description
+this is a different name  
+6    15
+    6.0  5.0  2.0   
+    3.0  2.0  1.0    
+"""
+
+    tree = get_polyfile_parser('poly_file', transform_literals=True).parse(poly_file)
+    (expected_objects, expected_msgs) = PolyFileInterpreter(True).visit(tree)
+
+    blocks = list(iter_polyfile(io.StringIO(poly_file), has_z_value=True))
+
+    assert [b for (b, _) in blocks] == expected_objects
+    assert [m for (_, msgs) in blocks for m in msgs] == expected_msgs
+
+
+block_texts = [
+    "* comment\nname\n 2 2\n1.0 2.0\n\n\n3.0 4.0\n",
+    "name \n1\n1.0 2.0  \n1.0\n",
+    "  name\n\n1 2 3 4\n1.0 2.0 3.0\n\n",
+    "name\n1 2\n1.0 2\n",
+    "name\n1 2\nx\n",
+    "name\n1 2\n",
+]
+
+
+@pytest.mark.parametrize("text", block_texts)
+@pytest.mark.parametrize("inline", [True, False])
+def test_block_parser_locates_messages_as_the_shared_parser(text: str, inline: bool):
+    (_, msgs) = polyfile._parse_block(polyfile._get_block_parser(False, inline), 3, text.splitlines(keepends=True))
+
+    try:
+        (_, expected) = get_inline_polyfile_parser("poly_block").parse(text)
+    except UnexpectedInput as e:
+        token = getattr(e, "token", None)
+        line = e.line + 2 if e.line > 0 else 2 + len(text.splitlines())
+        column = ((e.column, token.end_column if token is not None and token.end_column else e.column) 
+                  if e.line > 0 else (1, 1))
+        expected = [polyfile.ParseMsg(level=ParseErrorLevel.ERROR,
+                                      line=(line, line),
+                                      column=column,
+                                      reason="Invalid block of data will be ignored.")]
+    else:
+        for msg in expected:
+            msg.line = (msg.line[0] + 2, msg.line[1] + 2)
+
+    assert len(msgs) > 0
+    assert msgs == expected
+
+
+def test_polyblock_points_are_stored_column_wise():
+    block = """this is a name
+3    4
+    1.0  2.0  3.0  4.0
+    5.0  6.0
+    7.0  8.0  9.0  10.0
+"""
+
+    tree = get_polyfile_parser('poly_block', transform_literals=True).parse(block)
+    (result, msgs) = PolyFileInterpreter(True).visit(tree)
+
+    assert len(msgs) == 1
+    assert result.values.dtype == np.float64
+    assert result.values.shape == (3, 4)
+    assert np.isnan(result.values[1, 2:]).all()
+
+    for view in (result.x, result.y, result.z, result.data):
+        assert np.shares_memory(view, result.values)
+
+    assert result.x.tolist() == [1.0, 5.0, 7.0]
+    assert result.data[:, 0].tolist()[::2] == [4.0, 10.0]
+
+    assert len(result.points) == 3
+    assert result.points[1] == Point(x=5.0, y=6.0, z=None, data=[])
+    assert result.points[2] == Point(x=7.0, y=8.0, z=9.0, data=[10.0])
+
+
+def test_poly_object_can_be_constructed_from_points():
+    points = [Point(x=1.0, y=2.0, z=3.0, data=[]), Point(x=4.0, y=5.0, z=6.0, data=[])]
+    result = PolyObject(description=None, 
+                        metadata=Metadata(name="name", n_rows=2, n_columns=3),
+                        points=points)
+
+    assert result.has_z_value
+    assert result.values.tolist() == [[1.0, 2.0, 3.0], [4.0, 5.0, 6.0]]
+    assert result.points == points
+
+
+def test_points_are_converted_identical_to_float():
+    texts = ["1.", ".5", "-0.0", "+1.5E+05", "2.2250738585072011e-308", "0.1e-3", "123456789.123456789"]
+    point = "    " + "  ".join(texts) + "\n"
+
+    tree = get_polyfile_parser('points', transform_literals=True).parse(point)
+    interpreter = PolyFileInterpreter()
+    interpreter._expected_n_columns = len(texts)
+    (result, msgs) = interpreter.visit(tree)
+
+    assert len(msgs) == 0
+    assert result.values[0].tolist() == [float(t) for t in texts]
+
+
+def test_literals_are_wrapped_in_lightweight_token_data():
+    name = get_polyfile_parser('name_line').parse("some name\n")
+    result = PolyFileLiteralTransformer().transform(name).children[0]
+
+    assert isinstance(result, TokenData)
+    assert result.data == "some name"
+    assert result.token.line == 1
+    assert not hasattr(result, "__dict__")
+
+
+def test_inline_parser_is_identical_to_interpreter():
+    poly_file = """* Some description header
+
+first name
+2    2 5
+    1.0  2.0 3.0
+    3.0
+
+    4.0  5.0
+* second
+second name
+1
+    5.0  6.0  7.0
+
+name three
+  1 3
+5.0 6.0 7.0
+"""
+
+    tree = get_polyfile_parser('poly_file', transform_literals=True).parse(poly_file)
+    expected = PolyFileInterpreter().visit(tree)
+
+    result = get_inline_polyfile_parser('poly_file').parse(poly_file)
+
+    assert isinstance(result, tuple)
+    assert len(result[0]) == 2
+    assert len(result[1]) == 9
+    assert result[1][-1].reason == "Invalid block of data will be ignored."
+    assert result == expected
+
+
+messy_content = """
+* description
+ first name
+  2    2 5
+    1.0  2.0 3.0
+    3.0
+
+    4.0  5.0
+second name
+1
+    5.0  6.0  7.0
+no points
+name three
+  1 3
+5.0 6.0 7.0
+
+"""
+
+whitespace_reasons = ("Unexpected empty whitespace will be ignored.",
+                      "Whitespace at the beginning of the dimensions is ignored.")
+
+
+def test_msg_filter_enables_kinds_by_level_and_kind():
+    assert MsgFilter().enabled_kinds() == frozenset(MsgKind)
+
+    errors = MsgFilter(report_level=ParseErrorLevel.ERROR, 
+                       disabled_kinds=frozenset([MsgKind.INVALID_BLOCK])).enabled_kinds()
+
+    assert MsgKind.EMPTY_LINES not in errors
+    assert MsgKind.INVALID_BLOCK not in errors
+    assert MsgKind.INVALID_POINT in errors
+    assert MsgFilter(report_level=ParseErrorLevel.FATAL).enabled_kinds() == frozenset()
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+@pytest.mark.parametrize("inline", [True, False])
+@pytest.mark.parametrize("msg_filter, is_reported", [
+    (MsgFilter(report_level=ParseErrorLevel.ERROR), 
+     lambda msg: msg.level.value <= ParseErrorLevel.ERROR.value),
+    (MsgFilter(disabled_kinds=frozenset([MsgKind.EMPTY_LINES, MsgKind.WHITESPACE])),
+     lambda msg: msg.reason not in whitespace_reasons + ("Unexpected empty lines will be ignored.",)),
+])
+def test_iter_polyfile_only_reports_filtered_messages(fast_path, inline, msg_filter, is_reported):
+    expected = list(iter_polyfile(io.StringIO(messy_content), fast_path=fast_path, inline=inline))
+    result = list(iter_polyfile(io.StringIO(messy_content), fast_path=fast_path, inline=inline, 
+                                msg_filter=msg_filter))
+
+    assert [b for (b, _) in result] == [b for (b, _) in expected]
+    assert ([m for (_, msgs) in result for m in msgs] == 
+            [m for (_, msgs) in expected for m in msgs if is_reported(m)])
+
+
+@pytest.mark.parametrize("fast_path", [True, False])
+@pytest.mark.parametrize("inline", [True, False])
+def test_suppressed_messages_are_not_constructed(monkeypatch, fast_path, inline):
+    expected = [b for (b, _) in iter_polyfile(io.StringIO(messy_content), fast_path=fast_path, inline=inline)]
+
+    class UnconstructableMsg(polyfile.ParseMsg):
+        def __init__(self, **data):
+            raise AssertionError("Suppressed messages should not be constructed.")
+
+    monkeypatch.setattr(polyfile, "ParseMsg", UnconstructableMsg)
+    result = list(iter_polyfile(io.StringIO(messy_content), fast_path=fast_path, inline=inline, 
+                                msg_filter=MsgFilter(report_level=ParseErrorLevel.FATAL)))
+
+    assert [b for (b, _) in result] == expected
+    assert all(msgs == [] for (_, msgs) in result)
+
@@ -0,0 +1,122 @@
+import os
+import numpy as np
+import pytest
+
+import plain_model_inspector.io.polyfile_binary as polyfile_binary
+from plain_model_inspector.io.polyfile import read_polyfile
+from plain_model_inspector.io.polyfile_binary import (
+    BinaryFormatError,
+    get_sidecar_path,
+    read_polyfile_binary,
+    read_sidecar,
+    write_polyfile_binary,
+    write_sidecar,
+)
+
+
+content = ("* description\n* header\nsome name\n2 4\n1.0 2.0 3.0 4.0\n5.0 6.0 7.0\n"
+           "other name\n1 3\n1.0 2.0 3.0\n")
+
+
+@pytest.fixture
+def polyfile_path(tmp_path):
+    path = tmp_path / "model.pliz"
+    path.write_text(content)
+    return path
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_binary_polyfile_round_trips(tmp_path, polyfile_path, memory_map: bool):
+    (objects, _) = read_polyfile(polyfile_path, has_z_value=True)
+    binary_path = tmp_path / "model.pmib"
+
+    write_polyfile_binary(binary_path, objects)
+    result = read_polyfile_binary(binary_path, memory_map=memory_map)
+
+    assert result == objects
+    assert result[0].description.content == " description\n header"
+    assert np.isnan(result[0].values[1, 3])
+
+
+def test_binary_polyfile_values_are_views_on_the_mapped_file(tmp_path, polyfile_path):
+    (objects, _) = read_polyfile(polyfile_path, has_z_value=True)
+    binary_path = tmp_path / "model.pmib"
+    write_polyfile_binary(binary_path, objects)
+
+    result = read_polyfile_binary(binary_path)
+
+    assert not result[0].values.flags.owndata
+    assert not result[0].values.flags.writeable
+    assert result[1].values.base is result[0].values.base
+
+
+def test_empty_binary_polyfile_round_trips(tmp_path):
+    binary_path = tmp_path / "empty.pmib"
+    write_polyfile_binary(binary_path, [])
+
+    assert read_polyfile_binary(binary_path) == []
+
+
+def test_read_polyfile_binary_rejects_other_files(tmp_path, polyfile_path, monkeypatch):
+    with pytest.raises(BinaryFormatError):
+        read_polyfile_binary(polyfile_path)
+
+    binary_path = tmp_path / "model.pmib"
+    write_polyfile_binary(binary_path, [])
+    monkeypatch.setattr(polyfile_binary, "BINARY_FORMAT_VERSION", 2)
+
+    with pytest.raises(BinaryFormatError):
+        read_polyfile_binary(binary_path)
+
+
+@pytest.mark.parametrize("key", ["descriptions", "names", "n_rows", "n_columns", "has_z_value"])
+def test_read_polyfile_binary_rejects_missing_block_fields(tmp_path, polyfile_path, monkeypatch, key: str):
+    (objects, _) = read_polyfile(polyfile_path, has_z_value=True)
+    binary_path = tmp_path / "model.pmib"
+    block_header = polyfile_binary._block_header
+
+    def truncated_block_header(*args):
+        header = block_header(*args)
+        header[key] = header[key][:-1]
+        return header
+
+    monkeypatch.setattr(polyfile_binary, "_block_header", truncated_block_header)
+    write_polyfile_binary(binary_path, objects)
+
+    mapped = []
+
+    class RecordedMmap(polyfile_binary.mmap.mmap):
+        def __init__(self, *args, **kwargs):
+            mapped.append(self)
+
+    monkeypatch.setattr(polyfile_binary.mmap, "mmap", RecordedMmap)
+
+    with pytest.raises(BinaryFormatError):
+        read_polyfile_binary(binary_path)
+    assert len(mapped) == 1 and mapped[0].closed
+
+
+def test_sidecar_is_only_read_while_polyfile_is_unchanged(polyfile_path):
+    assert read_sidecar(polyfile_path) is None
+
+    (objects, _) = read_polyfile(polyfile_path, has_z_value=True)
+    assert write_sidecar(polyfile_path, objects) == get_sidecar_path(polyfile_path)
+    assert read_sidecar(polyfile_path) == objects
+
+    stat = polyfile_path.stat()
+    os.utime(polyfile_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    assert read_sidecar(polyfile_path) is None
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_empty_or_truncated_sidecar_is_not_read(polyfile_path, memory_map: bool):
+    (objects, _) = read_polyfile(polyfile_path, has_z_value=True)
+    sidecar_path = write_sidecar(polyfile_path, objects)
+    data = sidecar_path.read_bytes()
+
+    for truncated in (b"", data[:polyfile_binary._FIXED_HEADER.size + 10], data[:-8]):
+        sidecar_path.write_bytes(truncated)
+
+        assert read_sidecar(polyfile_path, memory_map) is None
+        with pytest.raises(BinaryFormatError):
+            read_polyfile_binary(sidecar_path, memory_map)
@@ -0,0 +1,158 @@
+import os
+import pytest
+
+import plain_model_inspector.io.polyfile_cache as polyfile_cache
+from plain_model_inspector.io.polyfile import read_polyfile
+from plain_model_inspector.io.polyfile_cache import PolyFileCache, read_polyfile_cached
+from plain_model_inspector.io.polyfile_msgs import ParseMsgStore
+
+
+content = "some name\n2 3\n1.0 2.0 3.0\n4.0 5.0 6.0\n\nother name\n1 2\n1.0 2\n"
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return PolyFileCache(tmp_path / "cache")
+
+
+@pytest.fixture
+def polyfile_path(tmp_path):
+    path = tmp_path / "model.pliz"
+    path.write_text(content)
+    return path
+
+
+def test_cached_result_is_identical_to_read_polyfile(cache, polyfile_path):
+    expected = read_polyfile(polyfile_path, has_z_value=True)
+
+    assert cache.get(polyfile_path, has_z_value=True) is None
+    assert read_polyfile_cached(polyfile_path, True, cache) == expected
+    assert cache.get(polyfile_path, has_z_value=True) == expected
+    assert cache.get(polyfile_path, has_z_value=False) is None
+    assert isinstance(cache.get(polyfile_path, has_z_value=True)[1], ParseMsgStore)
+
+
+def test_unchanged_file_is_not_read_or_hashed_again(cache, polyfile_path, monkeypatch):
+    read_polyfile_cached(polyfile_path, True, cache)
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The cached result should be used.")
+
+    monkeypatch.setattr(polyfile_cache, "read_polyfile_to_store", fail)
+    monkeypatch.setattr(polyfile_cache, "_hash_content", fail)
+
+    (objects, _) = read_polyfile_cached(polyfile_path, True, cache)
+    assert len(objects) == 1
+
+
+def test_touched_file_with_same_content_is_hashed_but_not_read(cache, polyfile_path, monkeypatch):
+    read_polyfile_cached(polyfile_path, True, cache)
+    stat = polyfile_path.stat()
+    os.utime(polyfile_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The cached result should be used.")
+
+    monkeypatch.setattr(polyfile_cache, "read_polyfile_to_store", fail)
+    assert len(read_polyfile_cached(polyfile_path, True, cache)[0]) == 1
+
+
+def test_changed_file_is_read_again(cache, polyfile_path):
+    read_polyfile_cached(polyfile_path, True, cache)
+    polyfile_path.write_text(content.replace("other name\n1 2\n1.0 2\n", ""))
+
+    (objects, msgs) = read_polyfile_cached(polyfile_path, True, cache)
+    assert len(objects) == 1
+    assert len(msgs) == 1
+
+
+def test_least_recently_used_results_are_evicted(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"model_{i}.pli"
+        path.write_text(f"name\n1 2\n{i}.0 2.0\n")
+        paths.append(path)
+
+    result_size = len(polyfile_cache.pickle.dumps(polyfile_cache.read_polyfile_to_store(paths[0]), protocol=polyfile_cache.pickle.HIGHEST_PROTOCOL))
+    cache = PolyFileCache(tmp_path / "cache", max_size=2 * result_size)
+
+    read_polyfile_cached(paths[0], cache=cache)
+    read_polyfile_cached(paths[1], cache=cache)
+    # Using the first result makes the second result the least recently used.
+    result_path = cache._result_path(paths[0], False)
+    os.utime(result_path, ns=(0, result_path.stat().st_mtime_ns + 1_000_000_000))
+    read_polyfile_cached(paths[2], cache=cache)
+
+    assert cache.get(paths[0]) is not None
+    assert cache.get(paths[1]) is None
+    assert cache.get(paths[2]) is not None
+
+
+def test_default_cache_is_disabled_with_empty_cache_dir(monkeypatch, polyfile_path):
+    monkeypatch.setenv("PLAIN_MODEL_INSPECTOR_CACHE_DIR", "")
+
+    assert PolyFileCache.default() is None
+    assert read_polyfile_cached(polyfile_path, True) == read_polyfile(polyfile_path, True)
+
+
+@pytest.mark.parametrize("data", [b"", b"\x80\x05\x95", b"not a pickle"])
+def test_unloadable_result_is_a_miss_and_removed(cache, polyfile_path, data):
+    expected = read_polyfile_cached(polyfile_path, True, cache)
+    result_path = cache._result_path(polyfile_path, True)
+    result_path.write_bytes(data)
+
+    assert cache.get(polyfile_path, has_z_value=True) is None
+    assert not result_path.exists()
+    assert read_polyfile_cached(polyfile_path, True, cache) == expected
+    assert cache.get(polyfile_path, has_z_value=True) == expected
+
+
+def test_results_are_keyed_by_dependency_versions(tmp_path, polyfile_path, monkeypatch):
+    result_path = PolyFileCache(tmp_path / "cache")._result_path(polyfile_path, False)
+
+    monkeypatch.setattr(polyfile_cache.np, "__version__", "0.0.0")
+    assert PolyFileCache(tmp_path / "cache")._result_path(polyfile_path, False) != result_path
+    monkeypatch.undo()
+
+    monkeypatch.setattr(polyfile_cache, "pydantic_version", "0.0.0")
+    assert PolyFileCache(tmp_path / "cache")._result_path(polyfile_path, False) != result_path
+
+
+def test_results_are_only_scanned_once_below_max_size(tmp_path, monkeypatch):
+    cache = PolyFileCache(tmp_path / "cache")
+    scanned = []
+
+    def list_entries(paths):
+        scanned.append(True)
+        return []
+
+    monkeypatch.setattr(polyfile_cache, "_list_entries", list_entries)
+    for i in range(5):
+        path = tmp_path / f"model_{i}.pli"
+        path.write_text(f"name\n1 2\n{i}.0 2.0\n")
+        read_polyfile_cached(path, cache=cache)
+
+    assert len(scanned) == 1
+
+
+def test_records_of_evicted_results_are_evicted(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"model_{i}.pli"
+        path.write_text(f"name\n1 2\n{i}.0 2.0\n")
+        paths.append(path)
+
+    result_size = len(polyfile_cache.pickle.dumps(polyfile_cache.read_polyfile_to_store(paths[0]), protocol=polyfile_cache.pickle.HIGHEST_PROTOCOL))
+    cache = PolyFileCache(tmp_path / "cache")
+
+    for (i, path) in enumerate(paths):
+        read_polyfile_cached(path, cache=cache)
+        # Distinct modification times, such that the order of use is unambiguous.
+        for entry_path in (cache._stat_path(path), cache._result_path(path, False)):
+            os.utime(entry_path, ns=(0, i * 1_000_000_000))
+
+    cache.max_size = result_size
+    cache.evict()
+
+    assert list(cache._stat_dir.iterdir()) == [cache._stat_path(paths[2])]
+    assert cache.get(paths[2]) is not None
@@ -0,0 +1,104 @@
+import io
+import random
+import pytest
+
+import plain_model_inspector.io.polyfile as polyfile
+from plain_model_inspector.io.polyfile import iter_polyfile
+
+
+def read_both_paths(text: str, has_z_value: bool):
+    fast = list(iter_polyfile(io.StringIO(text), has_z_value, fast_path=True))
+    grammar = list(iter_polyfile(io.StringIO(text), has_z_value, fast_path=False))
+
+    # The grammar path converts blocks inline by default, which should be
+    # identical to interpreting the parse tree.
+    tree = list(iter_polyfile(io.StringIO(text), has_z_value, fast_path=False, inline=False))
+    assert grammar == tree
+
+    # Lines of bytes are scanned and parsed identical to lines of text.
+    data = text.encode("utf-8")
+    assert list(iter_polyfile(io.BytesIO(data), has_z_value, fast_path=True)) == fast
+    assert list(iter_polyfile(io.BytesIO(data), has_z_value, fast_path=False)) == grammar
+
+    return fast, grammar
+
+
+well_formed_files = [
+    "name\n2 2\n1.0 2.0\n3.0 4.0\n",
+    "name\n1 2\n1.0 2.0",
+    "* header\n* more header   \nsome name  \n1    2\n   1.0   2.0   \n",
+    "*\nname_1\n1 2\n-1.5E+03 +2.e-1\n",
+    "name\r\n2 2\r\n1.0 2.0\r\n.5 6.\r\n",
+    "first\n1 2\n1.0 2.0\n\n\nsecond\n1 2\n3.0 4.0\n   \n",
+    "name\t with\ttabs\n1\t2\n\t1.0\t2.0\t\n",
+    "\n\n* header\nname\n1 2\n1.0 2.0\n",
+]
+
+ill_formed_files = [
+    "name\n2 2\n1.0 2.0\n\n3.0 4.0\n",
+    "* header\n\nname\n1 2\n1.0 2.0\n",
+    "  name\n1 2\n1.0 2.0\n",
+    "name\n\n1 2\n1.0 2.0\n",
+    "name\n  1 2\n1.0 2.0\n",
+    "name\n1\n1.0 2.0\n",
+    "name\n1 2 3\n1.0 2.0\n",
+    "name\n1 1\n1.0 2.0\n",
+    "name\n2 2\n1.0 2.0 3.0\n1.0\n",
+    "name\n1 3\n1.0 2.0\n",
+    "name\n1 2\n1.0 2\n",
+    "name-with-dash\n1 2\n1.0 2.0\n",
+    "name\n1 2\n",
+    "name\n1 2\nnot a point\n",
+]
+
+
+@pytest.mark.parametrize("has_z_value", [False, True])
+@pytest.mark.parametrize("text", well_formed_files + ill_formed_files)
+def test_fast_path_agrees_with_grammar(text: str, has_z_value: bool):
+    fast, grammar = read_both_paths(text, has_z_value)
+    assert fast == grammar
+
+
+@pytest.mark.parametrize("text", well_formed_files)
+def test_well_formed_blocks_do_not_use_grammar(text: str, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("The well-formed block should be handled by the fast path.")
+
+    monkeypatch.setattr(polyfile, "_parse_block", fail)
+
+    assert all(poly_object is not None for (poly_object, _) in iter_polyfile(io.StringIO(text)))
+
+
+def generate_block(rng: random.Random, index: int, has_z_value: bool) -> str:
+    min_n_columns = 3 if has_z_value else 2
+    n_columns = rng.randint(min_n_columns, min_n_columns + 2)
+    n_rows = rng.randint(1, 6)
+
+    lines = [f"* comment {i}\n" for i in range(rng.randint(0, 2))]
+    lines.append(f"block number_{index}\n")
+    lines.append(f"{n_rows} {n_columns}\n")
+
+    for _ in range(n_rows):
+        row_columns = n_columns if rng.random() > 0.1 else rng.randint(1, n_columns + 1)
+        lines.append("  ".join(rng.choice(("{:.3f}", "{:.2E}", "{:+.1f}")).format(rng.uniform(-1e4, 1e4))
+                               for _ in range(row_columns)) + "\n")
+
+    # Introduce the deviations which require the grammar.
+    if rng.random() < 0.1:
+        lines.insert(rng.randrange(len(lines) + 1), "\n")
+    if rng.random() < 0.1:
+        lines[-1] = "   " + lines[-1]
+    if rng.random() < 0.2:
+        lines.append(rng.choice(("\n", "   \n", "\n\n")))
+
+    return "".join(lines)
+
+
+@pytest.mark.parametrize("seed", range(20))
+@pytest.mark.parametrize("has_z_value", [False, True])
+def test_fast_path_agrees_with_grammar_on_generated_files(seed: int, has_z_value: bool):
+    rng = random.Random(seed)
+    text = "".join(generate_block(rng, i, has_z_value) for i in range(rng.randint(1, 10)))
+
+    fast, grammar = read_both_paths(text, has_z_value)
+    assert fast == grammar
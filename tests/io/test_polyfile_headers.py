@@ -0,0 +1,96 @@
+import pytest
+
+from plain_model_inspector.io.polyfile import DescriptionHeader, Metadata, ParseErrorLevel, read_polyfile
+from plain_model_inspector.io.polyfile_headers import BlockHeader, scan_polyfile_headers
+from tests.io.test_polyfile_fast_path import well_formed_files
+
+
+content = (b"\n* a\n* b\nname one\n2 2\n1.0 2.0\n3.0 4.0\n\n"
+           b"second\n1 3\n1.0 2.0 3.0\n"
+           b"bad\nxx\n1.0\n"
+           b"third\n1 2\n5.0 6.0")
+
+# Blocks of which the dimensions line does not match the points, or has a 
+# single or excess columns, which read_polyfile reads nonetheless.
+malformed_files = [
+    "a\n5 2\n1.0 2.0\nb\n1 2\n3.0 4.0\n",
+    "a\n1 2\n1.0 2.0\n3.0 4.0\nb\n1 2\n5.0 6.0\n",
+    "a\n1\n1.0 2.0\nb\n1 2 7\n3.0 4.0\n",
+    "a\n1 2\nb\n1 2\n1.0 2.0\n",
+    "a\n9 2\n\n1.0 2.0\n\n* comment\nb b\n1 2\n1.0 2.0",
+    "no dimensions\nnext\nb\n1 2\n1.0 2.0\n",
+    "a\nx y\n1.0 2.0\nb\nc\n1 2\n1.0 2.0\n",
+    "name\n1 2\n1.0 2\n",
+    "a\n1 2\n1.0 2.0\n\n  b\n 1 2\n1.0 2.0\n* c\n\nc\n\n1 2\n\n1.0 2.0\n",
+    "a\n1 2\n1.0\n2.0 3.0\nb\n",
+]
+
+
+def test_scan_polyfile_headers_returns_metadata_and_offsets(tmp_path):
+    path = tmp_path / "model.pli"
+    path.write_bytes(content)
+
+    (headers, msgs) = scan_polyfile_headers(path)
+
+    assert headers[0] == BlockHeader(description=DescriptionHeader(content=" a\n b"),
+                                     metadata=Metadata(name="name one", n_rows=2, n_columns=2),
+                                     line=2,
+                                     offset=1,
+                                     points_line=6,
+                                     points_offset=22,
+                                     end_offset=39)
+    assert [content[h.offset:h.points_offset] for h in headers] == \
+           [b"* a\n* b\nname one\n2 2\n", b"second\n1 3\n", b"third\n1 2\n"]
+    assert [content[h.points_offset:h.end_offset] for h in headers] == \
+           [b"1.0 2.0\n3.0 4.0\n\n", b"1.0 2.0 3.0\n", b"5.0 6.0"]
+    assert [h.line for h in headers] == [2, 9, 15]
+
+    assert len(msgs) == 1
+    assert msgs[0].level == ParseErrorLevel.ERROR
+    assert msgs[0].line == (13, 13)
+
+
+@pytest.mark.parametrize("text", well_formed_files)
+def test_scan_polyfile_headers_agrees_with_read_polyfile(tmp_path, text: str):
+    path = tmp_path / "model.pli"
+    path.write_bytes(text.encode("utf-8"))
+
+    (headers, msgs) = scan_polyfile_headers(path)
+    (objects, _) = read_polyfile(path)
+
+    assert msgs == []
+    assert [h.metadata for h in headers] == [o.metadata for o in objects]
+    assert [h.description for h in headers] == [o.description for o in objects]
+
+
+def test_scan_polyfile_headers_of_empty_file(tmp_path):
+    path = tmp_path / "empty.pli"
+    path.write_bytes(b"")
+
+    assert scan_polyfile_headers(path) == ([], [])
+
+
+def test_scan_polyfile_headers_does_not_trust_number_of_rows(tmp_path):
+    text = b"a\n5 2\n1.0 2.0\nb\n1 2\n3.0 4.0\n"
+    path = tmp_path / "model.pli"
+    path.write_bytes(text)
+
+    (headers, msgs) = scan_polyfile_headers(path)
+
+    assert msgs == []
+    assert [h.metadata for h in headers] == [Metadata(name="a", n_rows=5, n_columns=2),
+                                             Metadata(name="b", n_rows=1, n_columns=2)]
+    assert [text[h.points_offset:h.end_offset] for h in headers] == [b"1.0 2.0\n", b"3.0 4.0\n"]
+    assert [h.line for h in headers] == [1, 4]
+
+
+@pytest.mark.parametrize("text", malformed_files)
+def test_scan_polyfile_headers_agrees_with_read_polyfile_on_malformed_blocks(tmp_path, text: str):
+    path = tmp_path / "model.pli"
+    path.write_bytes(text.encode("utf-8"))
+
+    (headers, msgs) = scan_polyfile_headers(path)
+    (objects, read_msgs) = read_polyfile(path)
+
+    assert [h.metadata for h in headers] == [o.metadata for o in objects]
+    assert msgs == [msg for msg in read_msgs if msg.reason == "Invalid block of data will be ignored."]
@@ -0,0 +1,105 @@
+import os
+import pytest
+
+import plain_model_inspector.io.polyfile_index as polyfile_index
+from plain_model_inspector.io.polyfile import read_polyfile
+from plain_model_inspector.io.polyfile_index import (
+    BlockIndex,
+    IndexMismatchError,
+    build_block_index,
+    get_block,
+    get_index_path,
+    load_block_index,
+    read_block,
+)
+
+
+content = ("first\n2 2\n1.0 2.0\n3.0 4.0\n\n"
+           "* duplicate\nsecond\n1 2\n1.0 2.0\n"
+           "third\n2 2\n1.0 2.0\n3.0 4.0 5.0\n"
+           "second\n1 2\n5.0 6.0\n")
+
+
+@pytest.fixture
+def polyfile_path(tmp_path):
+    path = tmp_path / "model.pli"
+    path.write_text(content)
+    return path
+
+
+def test_build_block_index_records_every_block(polyfile_path):
+    index = build_block_index(polyfile_path)
+
+    assert len(index) == 4
+    assert index.names == ["first", "second", "third", "second"]
+    assert index.lines == [1, 6, 10, 14]
+    assert index.duplicate_names() == ["second"]
+    assert [entry.line for entry in index.find("second")] == [6, 14]
+    assert index.find("missing") == []
+
+
+def test_get_block_is_identical_to_read_polyfile(polyfile_path):
+    (objects, msgs) = read_polyfile(polyfile_path)
+
+    assert [msg.line for msg in msgs] == [(5, 6), (13, 13)]
+    assert get_block(polyfile_path, "first") == (objects[0], msgs[:1])
+    assert get_block(polyfile_path, "second", occurrence=0) == (objects[1], [])
+    assert get_block(polyfile_path, "second", occurrence=1) == (objects[3], [])
+    assert get_block(polyfile_path, "third") == (objects[2], msgs[1:])
+
+
+def test_get_block_with_duplicate_or_missing_name_raises(polyfile_path):
+    with pytest.raises(ValueError):
+        get_block(polyfile_path, "second")
+    with pytest.raises(KeyError):
+        get_block(polyfile_path, "missing")
+    with pytest.raises(KeyError):
+        get_block(polyfile_path, "second", occurrence=2)
+
+
+def test_load_block_index_persists_index_until_polyfile_changes(polyfile_path, monkeypatch):
+    index = load_block_index(polyfile_path)
+    assert get_index_path(polyfile_path).exists()
+    assert BlockIndex.parse_file(get_index_path(polyfile_path)) == index
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The persisted index should be used.")
+
+    with monkeypatch.context() as m:
+        m.setattr(polyfile_index, "build_block_index", fail)
+        assert load_block_index(polyfile_path) == index
+
+    polyfile_path.write_text(content + "fourth\n1 2\n1.0 2.0\n")
+    stat = polyfile_path.stat()
+    os.utime(polyfile_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert load_block_index(polyfile_path).names[-1] == "fourth"
+
+
+def test_get_block_after_over_reported_number_of_rows(tmp_path):
+    path = tmp_path / "model.pli"
+    path.write_text("a\n5 2\n1.0 2.0\nb\n1 2\n3.0 4.0\n")
+    (objects, _) = read_polyfile(path)
+
+    assert load_block_index(path).names == ["a", "b"]
+    assert get_block(path, "a") == (objects[0], [])
+    assert get_block(path, "b") == (objects[1], [])
+
+
+def test_get_block_with_mismatching_index_reads_whole_file(polyfile_path):
+    (objects, msgs) = read_polyfile(polyfile_path)
+    index = build_block_index(polyfile_path)
+
+    # An entry spanning multiple blocks, as an index of a changed file would.
+    index.end_offsets[0] = index.end_offsets[1]
+    with pytest.raises(IndexMismatchError):
+        read_block(polyfile_path, index.entry(0))
+    assert get_block(polyfile_path, "first", index=index) == (objects[0], msgs[:1])
+
+    # An entry of which the span contains another block.
+    index = build_block_index(polyfile_path)
+    index.names[2] = "other"
+    with pytest.raises(IndexMismatchError):
+        read_block(polyfile_path, index.entry(2))
+    with pytest.raises(KeyError):
+        get_block(polyfile_path, "other", index=index)
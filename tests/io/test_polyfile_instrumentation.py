@@ -0,0 +1,124 @@
+from typing import List
+
+import pytest
+
+from plain_model_inspector.io.polyfile import iter_polyfile, read_polyfile
+from plain_model_inspector.io.polyfile_instrumentation import (
+    Instrumentation,
+    Span,
+    Stage,
+    TimingCollector,
+    format_table,
+)
+
+
+# A block scanned by the fast path, a block parsed with the grammar and an invalid block.
+content = ("* description\n"
+           "clean name\n"
+           "2    2\n"
+           "    1.0    2.0\n"
+           "    3.0    4.0\n"
+           "  messy name  \n"
+           "  1   2  \n"
+           "\t1.0  2.0 \n"
+           "invalid name\n"
+           "1    2\n"
+           "not a point\n")
+
+_PARSE_STAGES = [Stage.LEX, Stage.PARSE, Stage.TRANSFORM, Stage.INTERPRET]
+
+
+class RecordingInstrumentation(Instrumentation):
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+
+    def on_span(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+@pytest.mark.parametrize("inline", [True, False])
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_read_polyfile_instrumented_is_identical_to_uninstrumented(tmp_path, inline, memory_map):
+    path = tmp_path / "instrumented.pli"
+    path.write_text(content)
+
+    result = read_polyfile(path, inline=inline, memory_map=memory_map, instrumentation=TimingCollector())
+
+    assert result == read_polyfile(path, inline=inline, memory_map=memory_map)
+
+
+@pytest.mark.parametrize("inline", [True, False])
+def test_read_polyfile_emits_spans_per_stage_and_block(tmp_path, inline):
+    path = tmp_path / "instrumented.pli"
+    path.write_text(content)
+    instrumentation = RecordingInstrumentation()
+
+    read_polyfile(path, inline=inline, instrumentation=instrumentation)
+    spans = instrumentation.spans
+
+    assert all(span.source == str(path) for span in spans)
+    assert all(span.duration >= 0.0 for span in spans)
+    assert spans[-1].stage == Stage.FILE
+    assert spans[-1].block is None
+
+    assert [span.block for span in spans if span.stage == Stage.READ] == [1, 6, 9]
+    assert [span.block for span in spans if span.stage == Stage.SCAN] == [1, 6]
+    assert [(span.stage, span.block) for span in spans if span.stage in _PARSE_STAGES] == \
+        [(stage, 6) for stage in _PARSE_STAGES]
+
+    interpret = next(span for span in spans if span.stage == Stage.INTERPRET)
+    assert interpret.duration > 0.0
+
+
+def test_iter_polyfile_without_fast_path_parses_every_block():
+    instrumentation = RecordingInstrumentation()
+
+    list(iter_polyfile(content.splitlines(keepends=True), fast_path=False, instrumentation=instrumentation))
+
+    assert not any(span.stage in (Stage.SCAN, Stage.FILE) for span in instrumentation.spans)
+    assert all(span.source is None for span in instrumentation.spans)
+    assert [span.block for span in instrumentation.spans if span.stage == Stage.LEX] == [1, 6]
+
+
+def test_timing_collector_aggregates_spans_per_stage_and_source():
+    collector = TimingCollector()
+    collector.on_span(Span(Stage.READ, 1.0, "a.pli", 1))
+    collector.on_span(Span(Stage.READ, 3.0, "a.pli", 5))
+    collector.on_span(Span(Stage.SCAN, 2.0, "a.pli", 1))
+    collector.on_span(Span(Stage.READ, 4.0, "b.pli", 1))
+    collector.on_span(Span(Stage.FILE, 10.0, "b.pli", None))
+    collector.on_span(Span(Stage.READ, 1.0, None, 1))
+
+    assert collector.sources == ["a.pli", "b.pli"]
+
+    (read, scan) = collector.summary("a.pli")
+    assert (read.stage, read.n_spans, read.total, read.max, read.mean) == (Stage.READ, 2, 4.0, 3.0, 2.0)
+    assert (scan.stage, scan.n_spans, scan.total) == (Stage.SCAN, 1, 2.0)
+
+    assert [(s.stage, s.n_spans, s.total, s.max) for s in collector.summary()] == \
+        [(Stage.FILE, 1, 10.0, 10.0), (Stage.READ, 4, 9.0, 4.0), (Stage.SCAN, 1, 2.0, 2.0)]
+
+    collector.clear()
+    assert collector.summary() == []
+
+
+def test_timing_collector_formats_summary_with_unaccounted_file_time():
+    collector = TimingCollector()
+    collector.on_span(Span(Stage.FILE, 4.0, "a.pli", None))
+    collector.on_span(Span(Stage.READ, 1.0, "a.pli", 1))
+    collector.on_span(Span(Stage.SCAN, 2.0, "a.pli", 1))
+
+    lines = collector.format_summary().splitlines()
+
+    assert [line.split("|")[1].strip() for line in lines[2:]] == ["file", "read", "scan", "other"]
+    assert lines[3].split("|")[4].strip() == "33.3"
+    assert lines[5].split("|")[3].strip() == "1.000"
+
+
+def test_format_table_aligns_columns():
+    assert format_table(["name", "n"], [["a", "10"], ["bcdef", "2"]]).splitlines() == [
+        "| name  | n  |",
+        "| ----- | -- |",
+        "| a     | 10 |",
+        "| bcdef | 2  |",
+    ]
@@ -0,0 +1,73 @@
+import pytest
+
+import plain_model_inspector.io.polyfile_lazy as polyfile_lazy
+from plain_model_inspector.io.polyfile import ParseErrorLevel, PolyObject, read_polyfile
+from plain_model_inspector.io.polyfile_lazy import LazyPolyObject, read_polyfile_lazy
+from tests.io.test_polyfile_headers import malformed_files
+
+
+content = ("* header\nfirst\n2 3\n1.0 2.0 3.0\n4.0 5.0 6.0\n"
+           "second\n2 3\n1.0 2.0 3.0\n4.0 5.0\n")
+
+
+@pytest.fixture
+def polyfile_path(tmp_path):
+    path = tmp_path / "model.pliz"
+    path.write_text(content)
+    return path
+
+
+def test_lazy_poly_objects_do_not_read_points_until_accessed(polyfile_path, monkeypatch):
+    (lazy_objects, msgs) = read_polyfile_lazy(polyfile_path, has_z_value=True)
+
+    assert msgs == []
+    assert all(isinstance(o, PolyObject) for o in lazy_objects)
+    assert [o.metadata.name for o in lazy_objects] == ["first", "second"]
+    assert not any(o.is_loaded for o in lazy_objects)
+    assert lazy_objects[0].deferred_msgs is None
+
+    assert lazy_objects[0].points[1].z == 6.0
+    assert lazy_objects[0].is_loaded
+    assert lazy_objects[0].deferred_msgs == []
+    assert not lazy_objects[1].is_loaded
+
+    def fail(*args, **kwargs):
+        raise AssertionError("The values should be cached.")
+
+    monkeypatch.setattr(polyfile_lazy, "read_block", fail)
+    assert lazy_objects[0].x.tolist() == [1.0, 4.0]
+
+
+def test_lazy_poly_objects_are_identical_to_read_polyfile(polyfile_path):
+    (objects, msgs) = read_polyfile(polyfile_path, has_z_value=True)
+    (lazy_objects, _) = read_polyfile_lazy(polyfile_path, has_z_value=True)
+
+    assert lazy_objects == objects
+    assert lazy_objects[1].deferred_msgs == msgs
+    assert msgs[0].level == ParseErrorLevel.ERROR
+    assert msgs[0].line == (9, 9)
+
+
+@pytest.mark.parametrize("text", malformed_files)
+def test_lazy_poly_objects_of_malformed_blocks_are_identical_to_read_polyfile(tmp_path, text: str):
+    path = tmp_path / "model.pli"
+    path.write_text(text)
+
+    (objects, msgs) = read_polyfile(path)
+    (lazy_objects, lazy_msgs) = read_polyfile_lazy(path)
+
+    assert lazy_objects == objects
+    for lazy_object in lazy_objects:
+        lazy_msgs.extend(lazy_object.deferred_msgs)
+    assert sorted(lazy_msgs, key=lambda msg: msg.line) == sorted(msgs, key=lambda msg: msg.line)
+
+
+def test_read_polyfile_lazy_skips_invalid_blocks(tmp_path):
+    path = tmp_path / "model.pli"
+    path.write_text("name\n1 2\n1.0 2\n")
+
+    (lazy_objects, msgs) = read_polyfile_lazy(path)
+
+    assert lazy_objects == []
+    assert msgs == read_polyfile(path)[1]
+    assert msgs[0].reason == "Invalid block of data will be ignored."
@@ -0,0 +1,115 @@
+import pickle
+
+import numpy as np
+import pytest
+
+from plain_model_inspector.io.polyfile import ParseErrorLevel, ParseMsg, read_polyfile
+from plain_model_inspector.io.polyfile_msgs import ParseMsgStore, read_polyfile_to_store
+
+
+msgs = [
+    ParseMsg(level=ParseErrorLevel.WARNING, line=(1, 2), column=(1, 1), reason="Unexpected empty lines will be ignored."),
+    ParseMsg(level=ParseErrorLevel.ERROR, line=(5, 5), column=(3, 9), reason="Invalid block of data will be ignored."),
+    ParseMsg(level=ParseErrorLevel.WARNING, line=(7, 8), column=(1, 1), reason="Unexpected empty lines will be ignored."),
+    ParseMsg(level=ParseErrorLevel.FATAL, line=(1, 1), column=(1, 1), reason="File could not be read."),
+]
+
+
+def test_parse_msg_store_iterates_as_parse_msgs():
+    store = ParseMsgStore(msgs)
+
+    assert len(store) == 4
+    assert list(store) == msgs
+    assert store == msgs
+    assert store[1] == msgs[1]
+    assert store[-1] == msgs[-1]
+    assert store[1:3] == msgs[1:3]
+
+    with pytest.raises(IndexError):
+        store[4]
+
+
+def test_parse_msg_store_only_equals_stores_and_lists():
+    store = ParseMsgStore(msgs)
+
+    assert store == ParseMsgStore(msgs)
+    assert store != ParseMsgStore(msgs[:3])
+    assert store != ParseMsgStore(msgs[1:] + msgs[:1])
+    assert store != tuple(msgs)
+    assert ParseMsgStore() != ""
+    assert ParseMsgStore() != ()
+
+
+def test_parse_msg_store_interns_reasons():
+    store = ParseMsgStore(msgs)
+
+    assert store.reasons == ["Unexpected empty lines will be ignored.",
+                             "Invalid block of data will be ignored.",
+                             "File could not be read."]
+    assert store.codes.tolist() == [0, 1, 0, 2]
+    assert store.code("Invalid block of data will be ignored.") == 1
+    assert store.lines.tolist() == [[1, 2], [5, 5], [7, 8], [1, 1]]
+    assert store.columns[1].tolist() == [3, 9]
+
+    with pytest.raises(KeyError):
+        store.code("unknown")
+
+
+def test_parse_msg_store_filters_and_counts_by_level_and_code():
+    store = ParseMsgStore(msgs)
+    empty_lines = store.code("Unexpected empty lines will be ignored.")
+
+    assert store.count_msgs(levels=[ParseErrorLevel.FATAL, ParseErrorLevel.ERROR]) == 2
+    assert store.count_msgs(codes=[empty_lines]) == 2
+    assert store.count_msgs(levels=[ParseErrorLevel.ERROR], codes=[empty_lines]) == 0
+    assert store.mask(levels=[ParseErrorLevel.WARNING]).tolist() == [True, False, True, False]
+    assert store.filter(codes=[empty_lines]) == [msgs[0], msgs[2]]
+
+    assert store.count_by_level() == {ParseErrorLevel.FATAL: 1,
+                                      ParseErrorLevel.ERROR: 1,
+                                      ParseErrorLevel.WARNING: 2,
+                                      ParseErrorLevel.INFO: 0}
+    assert store.count_by_reason()["Unexpected empty lines will be ignored."] == 2
+
+
+def test_parse_msg_store_extends_with_store_remapping_codes():
+    store = ParseMsgStore(msgs[1:2])
+    store.extend(ParseMsgStore(msgs))
+
+    assert store == msgs[1:2] + msgs
+    assert store.codes.tolist() == [0, 1, 0, 1, 2]
+
+
+def test_parse_msg_store_grows_beyond_initial_capacity():
+    store = ParseMsgStore()
+    for i in range(1000):
+        store.add(ParseErrorLevel.INFO, (i, i), (1, 1), "info")
+
+    assert len(store) == 1000
+    assert store[999].line == (999, 999)
+    assert np.array_equal(store.lines[:, 0], np.arange(1000))
+    assert len(store.reasons) == 1
+
+
+def test_parse_msg_store_is_pickled_without_unused_capacity():
+    store = ParseMsgStore(msgs)
+    result = pickle.loads(pickle.dumps(store))
+
+    assert result == msgs
+    assert result._data.shape == (6, 4)
+
+    result.append(msgs[0])
+    assert result[-1] == msgs[0]
+    assert result.codes[-1] == 0
+
+
+@pytest.mark.parametrize("memory_map", [True, False])
+def test_read_polyfile_to_store_is_identical_to_read_polyfile(tmp_path, memory_map: bool):
+    path = tmp_path / "model.pli"
+    path.write_text("\n\nname\n2 2\n1.0 2.0\n3.0 4.0\ninvalid name\n1 2\nnot a point\n")
+
+    (objects, store) = read_polyfile_to_store(path, memory_map=memory_map)
+
+    assert isinstance(store, ParseMsgStore)
+    assert len(store) > 0
+    assert (objects, store) == read_polyfile(path, memory_map=memory_map)
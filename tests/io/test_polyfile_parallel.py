@@ -0,0 +1,97 @@
+import random
+import pytest
+
+from plain_model_inspector.io import polyfile_parallel
+from plain_model_inspector.io.polyfile import read_polyfile
+from plain_model_inspector.io.polyfile_parallel import find_block_boundaries, read_polyfile_parallel
+from tests.io.test_polyfile_fast_path import generate_block
+
+
+def test_find_block_boundaries_splits_before_name_lines(tmp_path):
+    path = tmp_path / "blocks.pli"
+    path.write_bytes(b"first\n2 2\n1.0 2.0\n3.0 4.0\n\n"
+                     b"* header\nsecond\n1 2\n1.0 2.0\n")
+
+    boundaries = find_block_boundaries(path, chunk_size=4)
+
+    assert boundaries == [0, len(b"first\n2 2\n1.0 2.0\n3.0 4.0\n\n"), path.stat().st_size]
+
+
+def test_find_block_boundaries_does_not_split_after_a_dimensions_line(tmp_path):
+    # The serial reader keeps "second" in the block of "first", because 
+    # "first" has not read any point yet.
+    path = tmp_path / "blocks.pli"
+    path.write_bytes(b"first\n1 2\nsecond\n1 2\n1.0 2.0\n")
+
+    assert find_block_boundaries(path, chunk_size=1) == [0, path.stat().st_size]
+
+
+@pytest.mark.parametrize("n_points", [1, 2])
+def test_find_block_boundaries_splits_blocks_with_few_points(tmp_path, n_points: int):
+    path = tmp_path / "few_points.pli"
+    path.write_bytes(b"".join(b"block %d\n%d 2\n" % (i, n_points) + b"1.0 2.0\n" * n_points 
+                              for i in range(100)))
+
+    boundaries = find_block_boundaries(path, chunk_size=128)
+
+    assert len(boundaries) > 10
+    assert read_polyfile_parallel(path, n_workers=2, chunk_size=128) == read_polyfile(path)
+
+
+def test_find_block_boundaries_gives_up_within_search_size(tmp_path, monkeypatch):
+    path = tmp_path / "without_boundaries.pli"
+    path.write_bytes(b"first\n1 2\n" + b"corrupt ### line\n" * 1000)
+    read_sizes = []
+    find_block_start = polyfile_parallel._find_block_start
+
+    def recording_find_block_start(mapped, offset, limit):
+        block_start = find_block_start(mapped, offset, limit)
+        read_sizes.append(mapped.tell() - offset)
+        return block_start
+
+    monkeypatch.setattr(polyfile_parallel, "_find_block_start", recording_find_block_start)
+
+    assert find_block_boundaries(path, chunk_size=1024) == [0, path.stat().st_size]
+    assert len(read_sizes) > 1
+    assert max(read_sizes) < polyfile_parallel._MIN_SEARCH_SIZE + 2 * len(b"corrupt ### line\n")
+
+
+def test_find_block_boundaries_of_empty_file(tmp_path):
+    path = tmp_path / "empty.pli"
+    path.write_bytes(b"")
+
+    assert find_block_boundaries(path) == [0]
+    assert read_polyfile_parallel(path) == ([], [])
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("has_z_value", [False, True])
+def test_read_polyfile_parallel_is_identical_to_read_polyfile(tmp_path, seed: int, has_z_value: bool):
+    rng = random.Random(seed)
+    text = "\n" + "".join(generate_block(rng, i, has_z_value) for i in range(40))
+
+    path = tmp_path / "generated.pli"
+    path.write_bytes(text.encode("utf-8"))
+
+    assert len(find_block_boundaries(path, chunk_size=256)) > 3
+    assert read_polyfile_parallel(path, has_z_value, n_workers=2, chunk_size=256) == \
+           read_polyfile(path, has_z_value)
+
+
+def generate_corrupt_region(rng: random.Random) -> str:
+    lines = [rng.choice(("corrupt ### line\n", "name_like\n", "* comment\n", "1.0\n", "\n", "1 2\n", "3 4 5\n"))
+             for _ in range(rng.randint(1, 12))]
+    return "".join(lines)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_read_polyfile_parallel_recovers_identical_to_read_polyfile(tmp_path, seed: int):
+    rng = random.Random(seed)
+    text = "".join(generate_block(rng, i, False) + (generate_corrupt_region(rng) if rng.random() < 0.5 else "")
+                   for i in range(40))
+
+    path = tmp_path / "corrupt.pli"
+    path.write_bytes(text.encode("utf-8"))
+
+    for chunk_size in (64, 256):
+        assert read_polyfile_parallel(path, n_workers=2, chunk_size=chunk_size) == read_polyfile(path)
@@ -0,0 +1,38 @@
+from plain_model_inspector.cli import main
+
+
+def test_inspect_reports_messages_and_exit_code(tmp_path, capsys):
+    (tmp_path / "boundary.pli").write_text("boundary\n1 2\n1.0 2.0\n")
+    (tmp_path / "invalid.pol").write_text("polygon\n1 2\n1.0 2\n")
+
+    exit_code = main(["inspect", str(tmp_path), "--workers", "1", "--no-cache"])
+    output = capsys.readouterr().out
+
+    assert exit_code == 1
+    assert f"{tmp_path / 'invalid.pol'}:3:5: ERROR: Invalid block of data will be ignored." in output
+    assert "Inspected 2 polyfiles, 1 errors." in output
+
+
+def test_inspect_valid_model_succeeds(tmp_path, capsys):
+    (tmp_path / "boundary.pli").write_text("boundary\n1 2\n1.0 2.0\n")
+
+    assert main(["inspect", str(tmp_path), "--workers", "1", "--no-cache"]) == 0
+
+
+def test_inspect_reuses_cached_results(tmp_path, capsys, monkeypatch):
+    monkeypatch.setenv("PLAIN_MODEL_INSPECTOR_CACHE_DIR", str(tmp_path / "cache"))
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    (model_dir / "invalid.pol").write_text("polygon\n1 2\n1.0 2\n")
+
+    assert main(["inspect", str(model_dir), "--workers", "1"]) == 1
+    cold_output = capsys.readouterr().out
+    assert main(["inspect", str(model_dir), "--workers", "1"]) == 1
+    assert capsys.readouterr().out == cold_output
+
+
+def test_inspect_fail_fast_stops_at_first_error(tmp_path, capsys):
+    (tmp_path / "invalid.pol").write_text("polygon\n1 2\n1.0 2\nother\n1 2\n1.0 2\n")
+
+    assert main(["inspect", str(tmp_path), "--workers", "1", "--no-cache", "--fail-fast"]) == 1
+    assert "Inspected 1 polyfiles, 1 errors." in capsys.readouterr().out